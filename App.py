@@ -1,659 +1,22 @@
 # app.py - CAT Planner Pro with Persistent Database
 import streamlit as st
 import pandas as pd
-import sqlite3
 import json
-from io import BytesIO
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import hashlib
+import functools
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-# =============================================================================
-# DATABASE CONFIGURATION
-# =============================================================================
-
-DB_PATH = "cat_planner.db"
-
-class Database:
-    """Centralized Database Manager for CAT Planner"""
-    
-    def __init__(self, db_path: str = DB_PATH):
-        self.db_path = db_path
-        self.init_database()
-    
-    def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return conn
-    
-    def init_database(self):
-        """Initialize all database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Syllabus table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS syllabus (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                section TEXT NOT NULL,
-                main_topic TEXT NOT NULL,
-                sub_topics TEXT,
-                practice_focus TEXT,
-                confidence INTEGER DEFAULT 50,
-                priority TEXT DEFAULT 'Medium',
-                studied INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Difficulty mapping table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS difficulty (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                section TEXT NOT NULL,
-                topic_category TEXT NOT NULL,
-                level TEXT DEFAULT 'Moderate',
-                studied INTEGER DEFAULT 0,
-                mastery INTEGER DEFAULT 50,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Study plan table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS study_plan (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                week_number INTEGER NOT NULL,
-                week_label TEXT NOT NULL,
-                target TEXT NOT NULL,
-                completed INTEGER DEFAULT 0,
-                start_date TEXT,
-                end_date TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Practice tracker table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS practice_tracker (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                section TEXT NOT NULL,
-                topic TEXT NOT NULL,
-                questions INTEGER DEFAULT 0,
-                correct INTEGER DEFAULT 0,
-                wrong INTEGER DEFAULT 0,
-                accuracy REAL DEFAULT 0,
-                time_taken TEXT,
-                reviewed INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Mock tests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS mock_tests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                test_name TEXT NOT NULL,
-                varc_score REAL DEFAULT 0,
-                varc_percentile REAL DEFAULT 0,
-                dilr_score REAL DEFAULT 0,
-                dilr_percentile REAL DEFAULT 0,
-                qa_score REAL DEFAULT 0,
-                qa_percentile REAL DEFAULT 0,
-                total_score REAL DEFAULT 0,
-                overall_percentile REAL DEFAULT 0,
-                time_taken TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # User settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                key TEXT UNIQUE NOT NULL,
-                value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Daily goals table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                goal_type TEXT NOT NULL,
-                target_value INTEGER DEFAULT 0,
-                achieved_value INTEGER DEFAULT 0,
-                completed INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        
-        # Check if tables are empty and populate with default data
-        cursor.execute("SELECT COUNT(*) FROM syllabus")
-        if cursor.fetchone()[0] == 0:
-            self._populate_default_syllabus(cursor)
-        
-        cursor.execute("SELECT COUNT(*) FROM difficulty")
-        if cursor.fetchone()[0] == 0:
-            self._populate_default_difficulty(cursor)
-        
-        cursor.execute("SELECT COUNT(*) FROM study_plan")
-        if cursor.fetchone()[0] == 0:
-            self._populate_default_plan(cursor)
-        
-        conn.commit()
-        conn.close()
-    
-    def _populate_default_syllabus(self, cursor):
-        """Populate default syllabus data"""
-        varc = [
-            ("VARC", "Reading Comprehension", "Economy, Psychology, Philosophy, Technology, History, Abstract RCs", "Inference, Main idea, Tone, Strengthen/Weaken", 70, "High"),
-            ("VARC", "Para Jumbles", "Mandatory pairs, Pronoun linkage, Chronological order", "4–5 sentence PJs", 60, "Medium"),
-            ("VARC", "Odd One Out", "Theme mismatch, Link-breaking", "TITA OOO questions", 55, "Medium"),
-            ("VARC", "Para Completion", "Logical continuation, Ending-sentence identification", "Final-sentence prediction", 50, "Low"),
-            ("VARC", "Paragraph Summary", "Remove examples, key idea extraction", "20–40 word summaries", 65, "High")
-        ]
-        
-        dilr = [
-            ("DILR", "Arrangements & Ordering", "Linear, Circular, Ranking, Mixed-variable puzzles", "Mixed puzzle sets", 70, "High"),
-            ("DILR", "Selection & Distribution", "Committee selection, People-object assignment", "Constraint-based distribution", 62, "Medium"),
-            ("DILR", "Games & Tournaments", "Round-robin, Knockouts, Points table reasoning", "6-8 variable tournament sets", 45, "High"),
-            ("DILR", "Set Theory", "2-set, 3-set venn, Max/Min overlaps", "Venn + DI integration", 58, "Medium"),
-            ("DILR", "DI Charts & Tables", "Tables, Bar, Pie, Line, Caselets", "Calculation-heavy DI sets", 68, "Medium"),
-            ("DILR", "Logic Puzzles", "Binary logic, Truth–lie, Conditional logic", "Mixed DILR sets", 52, "High")
-        ]
-        
-        qa = [
-            ("QA", "Number System", "Divisibility, LCM–HCF, Remainders, Cyclicity, Base", "Modular arithmetic, Last-digit tricks", 75, "High"),
-            ("QA", "Arithmetic", "Percentages, Ratio, Averages, TSD, Time & Work, Profit–Loss, Mixtures", "Fast methods, LCM approach", 80, "High"),
-            ("QA", "Algebra", "Linear, Quadratic, Inequalities, Modulus, Logs, Exponents", "Wavy curve, root properties", 65, "Medium"),
-            ("QA", "Geometry & Mensuration", "Triangles, Circles, Coordinate Geo, Mensuration", "Area/length relations, formulae", 55, "Medium"),
-            ("QA", "Modern Math", "Permutation & Combination, Probability, Sets", "Restrictions, conditional prob", 48, "High")
-        ]
-        
-        for item in varc + dilr + qa:
-            cursor.execute('''
-                INSERT INTO syllabus (section, main_topic, sub_topics, practice_focus, confidence, priority)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', item)
-    
-    def _populate_default_difficulty(self, cursor):
-        """Populate default difficulty data"""
-        data = [
-            ("VARC", "RC Abstract", "Hard", 0, 45),
-            ("VARC", "RC Inference", "Moderate", 0, 60),
-            ("VARC", "Para Summary", "Easy", 0, 75),
-            ("VARC", "Para Jumbles", "Moderate", 0, 58),
-            ("DILR", "Games/Tournaments", "Hard", 0, 42),
-            ("DILR", "Arrangements", "Moderate", 0, 65),
-            ("DILR", "Tables/Charts", "Easy", 0, 78),
-            ("DILR", "Venn Diagrams", "Moderate", 0, 55),
-            ("QA", "Arithmetic", "Easy", 0, 82),
-            ("QA", "Algebra", "Moderate", 0, 68),
-            ("QA", "Geometry", "Hard", 0, 50),
-            ("QA", "Number System", "Moderate", 0, 70),
-            ("QA", "P&C/Probability", "Hard", 0, 45),
-        ]
-        
-        for item in data:
-            cursor.execute('''
-                INSERT INTO difficulty (section, topic_category, level, studied, mastery)
-                VALUES (?, ?, ?, ?, ?)
-            ''', item)
-    
-    def _populate_default_plan(self, cursor):
-        """Populate default study plan"""
-        base_date = datetime.now()
-        weeks = [
-            (1, "Week 1", "Percentages + 2 RCs/day + 1 DI Set"),
-            (2, "Week 2", "Ratio, Averages + PJ + DI Tables"),
-            (3, "Week 3", "TSD, Time & Work + Summary + Venn"),
-            (4, "Week 4", "Profit-Loss + Moderate RCs + Arrangements"),
-            (5, "Week 5", "Algebra basics + 3 RCs/day"),
-            (6, "Week 6", "Geometry basics + DI charts"),
-            (7, "Week 7", "Advanced Algebra + Hybrid sets"),
-            (8, "Week 8", "Tournaments + Abstract RC"),
-            (9, "Week 9", "P&C + Functions + Hard DI Sets"),
-            (10, "Week 10", "Full mocks (2/week)"),
-            (11, "Week 11", "Mock analysis + weak topic revision"),
-            (12, "Week 12", "Final mocks + strategy tuning"),
-        ]
-        
-        for week_num, label, target in weeks:
-            start = (base_date + timedelta(days=(week_num - 1) * 7)).strftime("%Y-%m-%d")
-            end = (base_date + timedelta(days=(week_num * 7) - 1)).strftime("%Y-%m-%d")
-            cursor.execute('''
-                INSERT INTO study_plan (week_number, week_label, target, start_date, end_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (week_num, label, target, start, end))
-    
-    # =========================
-    # SYLLABUS OPERATIONS
-    # =========================
-    
-    def get_syllabus(self, section: str = None) -> pd.DataFrame:
-        """Get syllabus data"""
-        conn = self.get_connection()
-        if section:
-            df = pd.read_sql_query(
-                "SELECT * FROM syllabus WHERE section = ? ORDER BY id",
-                conn, params=(section,)
-            )
-        else:
-            df = pd.read_sql_query("SELECT * FROM syllabus ORDER BY section, id", conn)
-        conn.close()
-        return df
-    
-    def update_syllabus(self, id: int, **kwargs):
-        """Update syllabus item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [id]
-        
-        cursor.execute(f'''
-            UPDATE syllabus SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?
-        ''', values)
-        
-        conn.commit()
-        conn.close()
-    
-    def add_syllabus_topic(self, section: str, main_topic: str, sub_topics: str = "", 
-                           practice_focus: str = "", confidence: int = 50, priority: str = "Medium"):
-        """Add new syllabus topic"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO syllabus (section, main_topic, sub_topics, practice_focus, confidence, priority)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (section, main_topic, sub_topics, practice_focus, confidence, priority))
-        conn.commit()
-        conn.close()
-    
-    def delete_syllabus_topic(self, id: int):
-        """Delete syllabus topic"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM syllabus WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    def mark_syllabus_studied(self, section: str = None, studied: bool = True):
-        """Mark all syllabus items as studied/not studied"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        if section:
-            cursor.execute("UPDATE syllabus SET studied = ? WHERE section = ?", (int(studied), section))
-        else:
-            cursor.execute("UPDATE syllabus SET studied = ?", (int(studied),))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # DIFFICULTY OPERATIONS
-    # =========================
-    
-    def get_difficulty(self) -> pd.DataFrame:
-        """Get difficulty data"""
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM difficulty ORDER BY section, id", conn)
-        conn.close()
-        return df
-    
-    def update_difficulty(self, id: int, **kwargs):
-        """Update difficulty item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [id]
-        
-        cursor.execute(f'''
-            UPDATE difficulty SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?
-        ''', values)
-        
-        conn.commit()
-        conn.close()
-    
-    def add_difficulty_item(self, section: str, topic_category: str, level: str = "Moderate", mastery: int = 50):
-        """Add difficulty item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO difficulty (section, topic_category, level, mastery)
-            VALUES (?, ?, ?, ?)
-        ''', (section, topic_category, level, mastery))
-        conn.commit()
-        conn.close()
-    
-    def delete_difficulty_item(self, id: int):
-        """Delete difficulty item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM difficulty WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # STUDY PLAN OPERATIONS
-    # =========================
-    
-    def get_study_plan(self) -> pd.DataFrame:
-        """Get study plan data"""
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM study_plan ORDER BY week_number", conn)
-        conn.close()
-        return df
-    
-    def update_study_plan(self, id: int, **kwargs):
-        """Update study plan item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [id]
-        
-        cursor.execute(f'''
-            UPDATE study_plan SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?
-        ''', values)
-        
-        conn.commit()
-        conn.close()
-    
-    def toggle_week_completed(self, id: int):
-        """Toggle week completion status"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE study_plan SET completed = NOT completed WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # PRACTICE TRACKER OPERATIONS
-    # =========================
-    
-    def get_practice_tracker(self, limit: int = None) -> pd.DataFrame:
-        """Get practice tracker data"""
-        conn = self.get_connection()
-        query = "SELECT * FROM practice_tracker ORDER BY date DESC, id DESC"
-        if limit:
-            query += f" LIMIT {limit}"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df
-    
-    def add_practice_session(self, date: str, section: str, topic: str, questions: int, 
-                             correct: int, time_taken: str = "", notes: str = ""):
-        """Add practice session"""
-        wrong = questions - correct
-        accuracy = (correct / questions * 100) if questions > 0 else 0
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy, time_taken, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (date, section, topic, questions, correct, wrong, accuracy, time_taken, notes))
-        conn.commit()
-        conn.close()
-    
-    def update_practice_session(self, id: int, **kwargs):
-        """Update practice session"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Recalculate accuracy if questions or correct changed
-        if 'questions' in kwargs or 'correct' in kwargs:
-            cursor.execute("SELECT questions, correct FROM practice_tracker WHERE id = ?", (id,))
-            row = cursor.fetchone()
-            questions = kwargs.get('questions', row['questions'])
-            correct = kwargs.get('correct', row['correct'])
-            kwargs['wrong'] = questions - correct
-            kwargs['accuracy'] = (correct / questions * 100) if questions > 0 else 0
-        
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [id]
-        
-        cursor.execute(f'''
-            UPDATE practice_tracker SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?
-        ''', values)
-        
-        conn.commit()
-        conn.close()
-    
-    def delete_practice_session(self, id: int):
-        """Delete practice session"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM practice_tracker WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    def toggle_reviewed(self, id: int):
-        """Toggle reviewed status"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE practice_tracker SET reviewed = NOT reviewed WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # MOCK TEST OPERATIONS
-    # =========================
-    
-    def get_mock_tests(self) -> pd.DataFrame:
-        """Get mock tests data"""
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM mock_tests ORDER BY date DESC", conn)
-        conn.close()
-        return df
-    
-    def add_mock_test(self, date: str, test_name: str, varc_score: float, varc_percentile: float,
-                      dilr_score: float, dilr_percentile: float, qa_score: float, qa_percentile: float,
-                      time_taken: str = "", notes: str = ""):
-        """Add mock test"""
-        total_score = varc_score + dilr_score + qa_score
-        overall_percentile = (varc_percentile + dilr_percentile + qa_percentile) / 3
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO mock_tests (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
-                                   qa_score, qa_percentile, total_score, overall_percentile, time_taken, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
-              qa_score, qa_percentile, total_score, overall_percentile, time_taken, notes))
-        conn.commit()
-        conn.close()
-    
-    def delete_mock_test(self, id: int):
-        """Delete mock test"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM mock_tests WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # ANALYTICS & STATS
-    # =========================
-    
-    def get_dashboard_stats(self) -> dict:
-        """Get dashboard statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # Syllabus stats
-        cursor.execute("SELECT COUNT(*) as total, SUM(studied) as studied FROM syllabus")
-        row = cursor.fetchone()
-        stats['total_topics'] = row['total']
-        stats['studied_topics'] = row['studied'] or 0
-        
-        # Section-wise stats
-        cursor.execute('''
-            SELECT section, COUNT(*) as total, SUM(studied) as studied, AVG(confidence) as avg_confidence
-            FROM syllabus GROUP BY section
-        ''')
-        stats['section_stats'] = {row['section']: dict(row) for row in cursor.fetchall()}
-        
-        # Study plan stats
-        cursor.execute("SELECT COUNT(*) as total, SUM(completed) as completed FROM study_plan")
-        row = cursor.fetchone()
-        stats['total_weeks'] = row['total']
-        stats['completed_weeks'] = row['completed'] or 0
-        
-        # Practice tracker stats
-        cursor.execute('''
-            SELECT COUNT(*) as sessions, SUM(questions) as total_questions, 
-                   SUM(correct) as total_correct, AVG(accuracy) as avg_accuracy
-            FROM practice_tracker
-        ''')
-        row = cursor.fetchone()
-        stats['practice_sessions'] = row['sessions'] or 0
-        stats['total_questions'] = row['total_questions'] or 0
-        stats['total_correct'] = row['total_correct'] or 0
-        stats['avg_accuracy'] = row['avg_accuracy'] or 0
-        
-        # Mock test stats
-        cursor.execute('''
-            SELECT COUNT(*) as total, AVG(overall_percentile) as avg_percentile,
-                   MAX(overall_percentile) as max_percentile
-            FROM mock_tests
-        ''')
-        row = cursor.fetchone()
-        stats['total_mocks'] = row['total'] or 0
-        stats['avg_percentile'] = row['avg_percentile'] or 0
-        stats['max_percentile'] = row['max_percentile'] or 0
-        
-        # Low confidence topics
-        cursor.execute('''
-            SELECT section, main_topic, confidence FROM syllabus
-            ORDER BY confidence ASC LIMIT 5
-        ''')
-        stats['weak_topics'] = [dict(row) for row in cursor.fetchall()]
-        
-        # Recent practice
-        cursor.execute('''
-            SELECT date, section, topic, accuracy FROM practice_tracker
-            ORDER BY date DESC, id DESC LIMIT 5
-        ''')
-        stats['recent_practice'] = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        return stats
-    
-    def get_section_analysis(self, section: str) -> dict:
-        """Get detailed section analysis"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        analysis = {}
-        
-        # Topic-wise stats
-        cursor.execute('''
-            SELECT main_topic, confidence, studied, priority FROM syllabus WHERE section = ?
-        ''', (section,))
-        analysis['topics'] = [dict(row) for row in cursor.fetchall()]
-        
-        # Practice stats for section
-        cursor.execute('''
-            SELECT topic, COUNT(*) as sessions, AVG(accuracy) as avg_accuracy, SUM(questions) as total_qs
-            FROM practice_tracker WHERE section = ? GROUP BY topic
-        ''', (section,))
-        analysis['practice_by_topic'] = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        return analysis
-    
-    # =========================
-    # SETTINGS OPERATIONS
-    # =========================
-    
-    def get_setting(self, key: str, default: str = None) -> str:
-        """Get setting value"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        conn.close()
-        return row['value'] if row else default
-    
-    def set_setting(self, key: str, value: str):
-        """Set setting value"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (key, value))
-        conn.commit()
-        conn.close()
-    
-    # =========================
-    # EXPORT/IMPORT
-    # =========================
-    
-    def export_all_data(self) -> dict:
-        """Export all data as dictionary"""
-        return {
-            'syllabus': self.get_syllabus().to_dict('records'),
-            'difficulty': self.get_difficulty().to_dict('records'),
-            'study_plan': self.get_study_plan().to_dict('records'),
-            'practice_tracker': self.get_practice_tracker().to_dict('records'),
-            'mock_tests': self.get_mock_tests().to_dict('records'),
-        }
-    
-    def export_to_excel(self) -> bytes:
-        """Export all data to Excel"""
-        bio = BytesIO()
-        with pd.ExcelWriter(bio, engine='openpyxl') as writer:
-            self.get_syllabus().to_excel(writer, sheet_name='Syllabus', index=False)
-            self.get_difficulty().to_excel(writer, sheet_name='Difficulty', index=False)
-            self.get_study_plan().to_excel(writer, sheet_name='Study Plan', index=False)
-            self.get_practice_tracker().to_excel(writer, sheet_name='Practice Tracker', index=False)
-            self.get_mock_tests().to_excel(writer, sheet_name='Mock Tests', index=False)
-        bio.seek(0)
-        return bio.read()
-    
-    def reset_all_data(self):
-        """Reset all data to defaults"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM syllabus")
-        cursor.execute("DELETE FROM difficulty")
-        cursor.execute("DELETE FROM study_plan")
-        cursor.execute("DELETE FROM practice_tracker")
-        cursor.execute("DELETE FROM mock_tests")
-        cursor.execute("DELETE FROM daily_goals")
-        
-        self._populate_default_syllabus(cursor)
-        self._populate_default_difficulty(cursor)
-        self._populate_default_plan(cursor)
-        
-        conn.commit()
-        conn.close()
-
+from catplanner import DEFAULT_PROFILE, TenantManager
+from catplanner.export import CSV_EXPORTS
+from catplanner.goals import GOAL_TYPES
+from catplanner.metrics import METRICS
+from catplanner.projection import MIN_MOCKS
+from catplanner.review import QUALITY_LABELS
+from catplanner.scheduler import AUTO_REBALANCE_SETTING, PLAN_SETTINGS
+from catplanner.render import get_badge_html, render_heatmap, render_progress_bar, render_styled_table
+from catplanner.tenants import validate_profile
 
 # =============================================================================
 # STREAMLIT APP CONFIGURATION
@@ -668,8 +31,18 @@ st.set_page_config(
 
 # Initialize database
 @st.cache_resource
+def get_tenants():
+    return TenantManager()
+
 def get_database():
-    return Database()
+    """Database of the profile this session is using"""
+    if 'profile' not in st.session_state:
+        profile = st.query_params.get("profile", DEFAULT_PROFILE)
+        try:
+            st.session_state['profile'] = validate_profile(profile)
+        except ValueError:
+            st.session_state['profile'] = DEFAULT_PROFILE
+    return get_tenants().get(st.session_state['profile'])
 
 db = get_database()
 
@@ -872,53 +245,334 @@ st.markdown("""
 # HELPER FUNCTIONS
 # =============================================================================
 
-def get_badge_html(text, badge_type="default"):
-    badge_class = f"badge-{str(badge_type).lower()}"
-    return f'<span class="badge {badge_class}">{text}</span>'
+def render_export_button(exporter, name, title, file_name, mime):
+    """Download button for an export artifact, built only when asked for"""
+    job = exporter.get(name)
+    
+    if job is not None and not job.done:
+        # The build runs in the background; navigating away leaves it running
+        export_progress(name, title)
+        return
+    
+    if job is not None and job.error is None:
+        st.download_button(f"⬇️ Download {title}", data=job.data, file_name=file_name, mime=mime,
+                           use_container_width=True, key=f"download_{name}")
+        return
+    
+    if job is not None:
+        st.error(f"Export failed: {job.error}")
+        if name == "excel":
+            st.info("Install openpyxl: pip install openpyxl")
+    if st.button(f"⚙️ Prepare {title}", use_container_width=True, key=f"prepare_{name}"):
+        exporter.request(name)
+        st.rerun()
+
+def switch_profile():
+    """on_change callback: move this session to another profile's database"""
+    profile = st.session_state['profile_input'].strip() or DEFAULT_PROFILE
+    try:
+        validate_profile(profile)
+    except ValueError as e:
+        st.toast(str(e), icon="⚠️")
+        return
+    get_database().flush_writes()
+    st.session_state['profile'] = profile
+    st.query_params["profile"] = profile
+
+def queue_widget_update(table, id, column, key, cast=None):
+    """on_change callback: queue a widget's new value instead of writing it now"""
+    value = st.session_state[key]
+    get_database().queue_update(table, id, **{column: cast(value) if cast else value})
+
+def flush_writes():
+    """on_click/on_change callback: save this session's queued edits now"""
+    get_database().flush_writes()
+
+def toggle_week(week_id):
+    """on_click callback: flip a study plan week's completed flag"""
+    get_database().toggle_week_completed(week_id)
+
+
+# =============================================================================
+# FRAGMENTS
+# =============================================================================
+# Each fragment reruns on its own when one of its widgets changes and reads
+# only the data it shows; actions that change what other regions show still
+# rerun the whole page.
+#
+# Fragments and callbacks outlive the run that defined them, and the
+# TenantManager may since have evicted and closed that run's ``db``, so they
+# fetch the database with get_database() every time they run.
 
-def render_progress_bar(percentage, color="#667eea"):
-    return f'''
-    <div class="progress-bar-container">
-        <div class="progress-bar-fill" style="width: {min(percentage, 100)}%; background: {color};"></div>
+EXPORT_POLL = "0.5s"
+
+def page_fragment(name, **options):
+    """st.fragment whose own reruns are counted as ``fragment:<name>`` runs in the metrics"""
+    def decorator(func):
+        @st.fragment(**options)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Inside a full script run the calls already count against the page;
+            # only a fragment's own reruns are runs of their own
+            ctx = get_script_run_ctx()
+            if not (ctx and ctx.fragment_ids_this_run):
+                return func(*args, **kwargs)
+            METRICS.begin_run(f"fragment:{name}")
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.end_run()
+        return wrapper
+    return decorator
+
+def sidebar_view(db) -> tuple:
+    """What sidebar_status shows: studied and total topics, and whether edits are unsaved"""
+    stats = db.get_dashboard_stats()
+    return stats['studied_topics'], stats['total_topics'], db.pending_writes() > 0
+
+def refresh_sidebar():
+    """Rerun the whole page if a fragment's writes changed what the sidebar shows
+    
+    Fragments only redraw themselves, so a row edit that queues the first
+    unsaved change (or saves the last one) would otherwise leave the sidebar
+    stale until the next full run.
+    """
+    if st.session_state.get('sidebar_view') != sidebar_view(get_database()):
+        st.rerun()
+
+@page_fragment("sidebar")
+def sidebar_status():
+    """Overall progress and unsaved edits; its Save button reruns only the sidebar"""
+    studied, total, unsaved = st.session_state['sidebar_view'] = sidebar_view(get_database())
+    progress = int((studied / total) * 100) if total > 0 else 0
+    
+    st.markdown(f"""
+    <div class="card">
+        <div style="color: #a0aec0; font-size: 0.75rem; text-transform: uppercase;">Overall Progress</div>
+        <div style="font-size: 2rem; font-weight: 700; color: #4facfe; margin: 8px 0;">{progress}%</div>
+        {render_progress_bar(progress)}
+        <div style="color: #a0aec0; font-size: 0.75rem; margin-top: 8px;">
+            {studied}/{total} topics studied
+        </div>
     </div>
-    '''
+    """, unsafe_allow_html=True)
+    
+    # Edits waiting in the write-behind queue
+    if unsaved:
+        st.caption("✏️ Unsaved changes • saving shortly")
+        st.button("💾 Save Now", use_container_width=True, on_click=flush_writes)
+
+@page_fragment("export_progress", run_every=EXPORT_POLL)
+def export_progress(name, title):
+    """Progress bar of a background export; reruns the page once it finishes
+    
+    Only drawn while the build is pending, so the Settings page polls
+    nothing once every artifact is ready.
+    """
+    job = get_database().exports.get(name)
+    if job is None or job.finished.is_set():
+        st.rerun()
+    st.progress(job.progress, text=f"Preparing {title}…")
+
+@page_fragment("syllabus_row")
+def syllabus_row(section, row):
+    """One topic's confidence and studied widgets; editing them reruns only this row"""
+    # The widget holds the latest value, which may still be queued
+    studied = st.session_state.get(f"studied_{section}_{row['id']}", bool(row['studied']))
+    studied_icon = "✅" if studied else "⬜"
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    
+    with col1:
+        st.markdown(f"""
+        <div style="padding: 10px 0;">
+            <div style="color: #fff; font-weight: 600;">{row['main_topic']} {studied_icon}</div>
+            <div style="color: #a0aec0; font-size: 0.8rem;">{row['sub_topics']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        key = f"conf_{section}_{row['id']}"
+        st.slider(
+            "Confidence", 0, 100, int(row['confidence']),
+            key=key,
+            label_visibility="collapsed",
+            on_change=queue_widget_update, args=("syllabus", row['id'], "confidence", key)
+        )
+    
+    with col3:
+        key = f"studied_{section}_{row['id']}"
+        st.checkbox(
+            "Studied", value=bool(row['studied']),
+            key=key,
+            on_change=queue_widget_update, args=("syllabus", row['id'], "studied", key, int)
+        )
+    
+    refresh_sidebar()
 
-def render_styled_table(df, exclude_cols=None):
-    """Render styled HTML table"""
-    if exclude_cols is None:
-        exclude_cols = ['id', 'created_at', 'updated_at', 'notes']
-    
-    display_df = df.drop(columns=[c for c in exclude_cols if c in df.columns], errors='ignore')
-    
-    html = '<table class="styled-table"><thead><tr>'
-    for col in display_df.columns:
-        html += f'<th>{col.replace("_", " ").title()}</th>'
-    html += '</tr></thead><tbody>'
-    
-    for _, row in display_df.iterrows():
-        html += '<tr>'
-        for col in display_df.columns:
-            val = row[col]
-            cell = str(val)
+@page_fragment("difficulty_row")
+def difficulty_row(row):
+    """One difficulty item's widgets; editing them reruns only this row"""
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    
+    with col1:
+        st.write(f"**{row['section']}** - {row['topic_category']}")
+    
+    with col2:
+        key = f"level_{row['id']}"
+        st.selectbox(
+            "Level", ["Easy", "Moderate", "Hard"],
+            index=["Easy", "Moderate", "Hard"].index(row['level']),
+            key=key,
+            label_visibility="collapsed",
+            on_change=queue_widget_update, args=("difficulty", row['id'], "level", key)
+        )
+    
+    with col3:
+        key = f"mastery_{row['id']}"
+        st.number_input(
+            "Mastery", 0, 100, int(row['mastery']),
+            key=key,
+            label_visibility="collapsed",
+            on_change=queue_widget_update, args=("difficulty", row['id'], "mastery", key)
+        )
+    
+    with col4:
+        key = f"diff_studied_{row['id']}"
+        st.checkbox(
+            "Done", value=bool(row['studied']),
+            key=key,
+            on_change=queue_widget_update, args=("difficulty", row['id'], "studied", key, int)
+        )
+    
+    refresh_sidebar()
+
+@page_fragment("study_plan_weeks")
+def study_plan_weeks():
+    """Progress header and week cards; toggling a week re-reads only study_plan"""
+    db = get_database()
+    df = db.get_study_plan()
+    completed = int(df['completed'].sum())
+    total = len(df)
+    
+    # Progress header
+    st.markdown(f"""
+    <div class="card" style="text-align: center;">
+        <div style="font-size: 3rem; font-weight: 800; color: #667eea;">{completed}/{total}</div>
+        <div style="color: #a0aec0; margin: 10px 0;">Weeks Completed</div>
+        {render_progress_bar(int(completed/total*100) if total > 0 else 0)}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Week cards
+    col1, col2 = st.columns(2)
+    
+    for i, row in df.iterrows():
+        with col1 if i % 2 == 0 else col2:
+            is_completed = bool(row['completed'])
+            completed_class = "completed" if is_completed else ""
+            icon = "✅" if is_completed else "⬜"
             
-            # Format special columns
-            if col in ['studied', 'completed', 'reviewed']:
-                cell = '✅' if val else '⬜'
-            elif col == 'level':
-                cell = get_badge_html(val, val)
-            elif col == 'priority':
-                cell = get_badge_html(val, val)
-            elif col in ['confidence', 'mastery', 'accuracy']:
-                color = '#38ef7d' if val >= 75 else '#f7b733' if val >= 50 else '#ef4444'
-                cell = f'<span style="color:{color}; font-weight:600;">{val:.0f}%</span>'
-            elif 'percentile' in col.lower():
-                cell = f'{val:.1f}%ile'
+            st.markdown(f"""
+            <div class="week-card {completed_class}">
+                <div style="display: flex; justify-content: space-between; align-items: flex-start;">
+                    <div>
+                        <div style="color: #4facfe; font-weight: 700; font-size: 1.1rem;">{row['week_label']}</div>
+                        <div style="color: #a0aec0; font-size: 0.8rem; margin: 5px 0;">
+                            {row['start_date']} → {row['end_date']}
+                        </div>
+                        <div style="color: #e2e8f0; font-size: 0.9rem;">{row['target']}</div>
+                    </div>
+                    <span style="font-size: 1.5rem;">{icon}</span>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if row['notes']:
+                with st.expander("Daily tasks"):
+                    st.text(row['notes'])
             
-            html += f'<td>{cell}</td>'
-        html += '</tr>'
+            # Callbacks write before the fragment reruns, so it shows the new state
+            st.button(f"Toggle Week {row['week_number']}", key=f"toggle_week_{row['id']}", use_container_width=True,
+                      on_click=toggle_week, args=(row['id'],))
+
+@page_fragment("practice_table")
+def practice_sessions_table():
+    """Filtered, keyset-paginated sessions; paging reruns only the table"""
+    db = get_database()
+    st.markdown('<div class="table-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">📋 Practice Sessions</div>', unsafe_allow_html=True)
     
-    html += '</tbody></table>'
-    return html
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        filter_section = st.selectbox("Filter Section", ["All", "QA", "VARC", "DILR"], key="practice_filter_section")
+    with col2:
+        filter_topic = st.text_input("Search Topic", placeholder="e.g., Algebra", key="practice_filter_topic")
+    with col3:
+        page_size = st.selectbox("Rows per page", [25, 50, 100], key="practice_page_size")
+    
+    # Keyset pagination: remember the (date, id) cursor each page started
+    # after; changing a filter goes back to the newest page
+    filters = (filter_section, filter_topic, page_size)
+    if st.session_state.get('practice_filters') != filters:
+        st.session_state['practice_filters'] = filters
+        st.session_state['practice_cursors'] = [None]
+    cursors = st.session_state['practice_cursors']
+    
+    # One extra row tells us whether an older page exists
+    df = db.get_practice_tracker(
+        limit=page_size + 1, before=cursors[-1],
+        section=None if filter_section == "All" else filter_section,
+        topic=filter_topic or None
+    )
+    has_older = len(df) > page_size
+    df = df.head(page_size)
+    
+    if len(df) > 0:
+        st.markdown(render_styled_table(df), unsafe_allow_html=True)
+    else:
+        st.info("No sessions match these filters.")
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Paging callbacks move the cursor before the table reruns
+    older = (df.iloc[-1]['date'], int(df.iloc[-1]['id'])) if has_older else None
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("← Newer", disabled=len(cursors) == 1, use_container_width=True, on_click=cursors.pop)
+    with col2:
+        st.markdown(f'<div style="text-align: center; color: #a0aec0; padding-top: 8px;">Page {len(cursors)}</div>',
+                    unsafe_allow_html=True)
+    with col3:
+        st.button("Older →", disabled=not has_older, use_container_width=True,
+                  on_click=cursors.append, args=(older,))
+    
+    # Delete option
+    with st.expander("🗑️ Delete Sessions"):
+        labels = {
+            int(id): f"ID {id}: {date} - {topic}"
+            for id, date, topic in zip(df['id'], df['date'], df['topic'])
+        }
+        session_to_delete = st.selectbox(
+            "Select session to delete (sessions on this page)",
+            list(labels),
+            format_func=labels.get
+        )
+        if st.button("🗑️ Delete Selected", use_container_width=True, disabled=not labels):
+            db.delete_practice_session(session_to_delete)
+            st.success("Deleted!")
+            st.rerun()
+
+@page_fragment("mock_chart")
+def mock_percentile_chart():
+    """Percentile trend with a choice of series; changing it redraws only the chart"""
+    df = get_database().get_mock_tests()
+    series = {'Overall': 'overall_percentile', 'VARC': 'varc_percentile',
+              'DILR': 'dilr_percentile', 'QA': 'qa_percentile'}
+    shown = st.multiselect("Show", list(series), default=list(series), key="mock_chart_series")
+    chart_df = df.sort_values('date').set_index('date')[[series[name] for name in shown]]
+    st.line_chart(chart_df)
 
 
 # =============================================================================
@@ -934,31 +588,30 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
+    # Each profile has its own database file
+    st.text_input(
+        "👤 Profile", value=st.session_state['profile'], key="profile_input",
+        on_change=switch_profile,
+        help="Each profile keeps its own data. Open ?profile=<name> to go straight to one."
+    )
+    
     st.markdown("---")
     
     page = st.radio(
         "Navigation",
         ["🏠 Dashboard", "📚 Syllabus", "📊 Difficulty", "📅 Study Plan", 
-         "📝 Practice", "📈 Mock Tests", "⚙️ Settings"],
-        label_visibility="collapsed"
+         "📝 Practice", "🔁 Review", "🎯 Goals", "📈 Mock Tests", "⚙️ Settings"],
+        label_visibility="collapsed",
+        on_change=flush_writes
     )
     
+    # Everything from here to the footer counts as this page's run
+    METRICS.begin_run(page)
+    
     st.markdown("---")
     
-    # Quick stats
-    stats = db.get_dashboard_stats()
-    progress = int((stats['studied_topics'] / stats['total_topics']) * 100) if stats['total_topics'] > 0 else 0
-    
-    st.markdown(f"""
-    <div class="card">
-        <div style="color: #a0aec0; font-size: 0.75rem; text-transform: uppercase;">Overall Progress</div>
-        <div style="font-size: 2rem; font-weight: 700; color: #4facfe; margin: 8px 0;">{progress}%</div>
-        {render_progress_bar(progress)}
-        <div style="color: #a0aec0; font-size: 0.75rem; margin-top: 8px;">
-            {stats['studied_topics']}/{stats['total_topics']} topics studied
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Progress and pending edits; row fragments refresh it when they change them
+    sidebar_status()
     
     st.markdown("---")
     
@@ -981,7 +634,7 @@ with st.sidebar:
     st.markdown(f"""
     <div style="color: #4a5568; font-size: 0.7rem; text-align: center;">
         💾 SQLite Database<br>
-        📁 {DB_PATH}
+        📁 {db.db_path}
     </div>
     """, unsafe_allow_html=True)
 
@@ -1002,11 +655,11 @@ if page == "🏠 Dashboard":
         ("📚", "Topics Studied", f"{stats['studied_topics']}/{stats['total_topics']}", 
          f"{int(stats['studied_topics']/stats['total_topics']*100)}%" if stats['total_topics'] > 0 else "0%"),
         ("📅", "Weeks Done", f"{stats['completed_weeks']}/{stats['total_weeks']}", 
-         f"{12 - stats['completed_weeks']} remaining"),
+         f"{stats['total_weeks'] - stats['completed_weeks']} remaining"),
         ("📝", "Practice Sessions", stats['practice_sessions'], 
          f"{stats['total_questions']} questions"),
-        ("🎯", "Avg Accuracy", f"{stats['avg_accuracy']:.1f}%", 
-         f"{stats['total_correct']} correct"),
+        ("🎯", "Accuracy", f"{stats['avg_accuracy']:.1f}%", 
+         f"{stats['total_correct']}/{stats['total_questions']} correct"),
     ]
     
     for col, (icon, label, value, sub) in zip([col1, col2, col3, col4], metrics):
@@ -1034,6 +687,8 @@ if page == "🏠 Dashboard":
             pct = int((data['studied'] / data['total']) * 100) if data['total'] > 0 else 0
             conf = data['avg_confidence'] or 0
             color = section_colors.get(section, "#667eea")
+            practice = stats['practice_by_section'].get(section)
+            practice_note = f" • {practice['accuracy']:.0f}% accuracy over {practice['questions']} questions" if practice else ""
             
             st.markdown(f"""
             <div style="margin-bottom: 20px;">
@@ -1042,7 +697,7 @@ if page == "🏠 Dashboard":
                     <span style="color: {color}; font-weight: 700;">{pct}%</span>
                 </div>
                 <div style="color: #a0aec0; font-size: 0.8rem; margin-bottom: 5px;">
-                    {data['studied']}/{data['total']} topics • {conf:.0f}% avg confidence
+                    {data['studied']}/{data['total']} topics • {conf:.0f}% avg confidence{practice_note}
                 </div>
                 {render_progress_bar(pct, color)}
             </div>
@@ -1088,6 +743,34 @@ if page == "🏠 Dashboard":
                 """, unsafe_allow_html=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Practice trends
+    if stats['practice_sessions']:
+        trends = db.get_practice_trends()
+        streaks = trends['streaks']
+        st.markdown('<div class="card"><div class="card-title">📈 Practice Trends</div>', unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🔥 Current Streak", f"{streaks['current']} days")
+        col2.metric("🏆 Longest Streak", f"{streaks['longest']} days")
+        col3.metric("📆 Active Days (30d)", f"{streaks['active_days_30d']}/30")
+        
+        sections = trends['sections']
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("7-day accuracy by section (%)")
+            st.line_chart(sections.pivot(index='day', columns='section', values='accuracy_7d'))
+        with col2:
+            st.caption("Questions per day")
+            st.bar_chart(sections.pivot(index='day', columns='section', values='questions'))
+        
+        topics = trends['topics']
+        topics = topics[topics['questions_30d'] > 0].sort_values('trend')
+        if not topics.empty:
+            st.caption("Topics, last 30 days (trend = 7-day minus 30-day accuracy)")
+            st.dataframe(topics.round(1), hide_index=True, use_container_width=True)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
 
 
 elif page == "📚 Syllabus":
@@ -1096,49 +779,19 @@ elif page == "📚 Syllabus":
     tabs = st.tabs(["📖 View All", "🗣️ VARC", "🧩 DILR", "🔢 QA", "➕ Add Topic"])
     
     with tabs[0]:
-        df = db.get_syllabus()
+        df = db.with_pending('syllabus', db.get_syllabus())
         st.markdown('<div class="table-container">', unsafe_allow_html=True)
         st.markdown(render_styled_table(df), unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
     for i, section in enumerate(["VARC", "DILR", "QA"], 1):
         with tabs[i]:
-            df = db.get_syllabus(section)
+            df = db.with_pending('syllabus', db.get_syllabus(section))
             
             st.markdown(f'<div class="card"><div class="card-title">{section} Topics</div>', unsafe_allow_html=True)
             
             for _, row in df.iterrows():
-                studied_icon = "✅" if row['studied'] else "⬜"
-                conf_color = '#38ef7d' if row['confidence'] >= 75 else '#f7b733' if row['confidence'] >= 50 else '#ef4444'
-                
-                col1, col2, col3 = st.columns([3, 1, 1])
-                
-                with col1:
-                    st.markdown(f"""
-                    <div style="padding: 10px 0;">
-                        <div style="color: #fff; font-weight: 600;">{row['main_topic']} {studied_icon}</div>
-                        <div style="color: #a0aec0; font-size: 0.8rem;">{row['sub_topics']}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    new_conf = st.slider(
-                        "Confidence", 0, 100, int(row['confidence']),
-                        key=f"conf_{section}_{row['id']}",
-                        label_visibility="collapsed"
-                    )
-                    if new_conf != row['confidence']:
-                        db.update_syllabus(row['id'], confidence=new_conf)
-                        st.rerun()
-                
-                with col3:
-                    studied = st.checkbox(
-                        "Studied", value=bool(row['studied']),
-                        key=f"studied_{section}_{row['id']}"
-                    )
-                    if studied != bool(row['studied']):
-                        db.update_syllabus(row['id'], studied=int(studied))
-                        st.rerun()
+                syllabus_row(section, row)
             
             st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1170,7 +823,7 @@ elif page == "📚 Syllabus":
 elif page == "📊 Difficulty":
     st.markdown('<div class="section-header">📊 Difficulty Mapping</div>', unsafe_allow_html=True)
     
-    df = db.get_difficulty()
+    df = db.with_pending('difficulty', db.get_difficulty())
     
     # Stats cards
     col1, col2, col3 = st.columns(3)
@@ -1198,110 +851,58 @@ elif page == "📊 Difficulty":
     # Edit section
     with st.expander("✏️ Edit Difficulty Data"):
         for _, row in df.iterrows():
-            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-            
-            with col1:
-                st.write(f"**{row['section']}** - {row['topic_category']}")
-            
-            with col2:
-                new_level = st.selectbox(
-                    "Level", ["Easy", "Moderate", "Hard"],
-                    index=["Easy", "Moderate", "Hard"].index(row['level']),
-                    key=f"level_{row['id']}",
-                    label_visibility="collapsed"
-                )
-                if new_level != row['level']:
-                    db.update_difficulty(row['id'], level=new_level)
-                    st.rerun()
-            
-            with col3:
-                new_mastery = st.number_input(
-                    "Mastery", 0, 100, int(row['mastery']),
-                    key=f"mastery_{row['id']}",
-                    label_visibility="collapsed"
-                )
-                if new_mastery != row['mastery']:
-                    db.update_difficulty(row['id'], mastery=new_mastery)
-                    st.rerun()
-            
-            with col4:
-                studied = st.checkbox(
-                    "Done", value=bool(row['studied']),
-                    key=f"diff_studied_{row['id']}"
-                )
-                if studied != bool(row['studied']):
-                    db.update_difficulty(row['id'], studied=int(studied))
-                    st.rerun()
+            difficulty_row(row)
 
 
 elif page == "📅 Study Plan":
-    st.markdown('<div class="section-header">📅 12-Week Study Plan</div>', unsafe_allow_html=True)
+    st.markdown('<div class="section-header">📅 Study Plan</div>', unsafe_allow_html=True)
     
-    df = db.get_study_plan()
-    completed = int(df['completed'].sum())
-    total = len(df)
-    
-    # Progress header
-    st.markdown(f"""
-    <div class="card" style="text-align: center;">
-        <div style="font-size: 3rem; font-weight: 800; color: #667eea;">{completed}/{total}</div>
-        <div style="color: #a0aec0; margin: 10px 0;">Weeks Completed</div>
-        {render_progress_bar(int(completed/total*100) if total > 0 else 0)}
-    </div>
-    """, unsafe_allow_html=True)
+    # Plan settings and rebalancing
+    exam_date, daily_hours = db.get_plan_settings()
+    auto_rebalance = db.get_setting(AUTO_REBALANCE_SETTING, "0") == "1"
+    with st.expander("🧭 Plan Settings"):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_exam_date = st.date_input("Exam date", value=exam_date)
+        with col2:
+            new_daily_hours = st.number_input("Study hours per day", 0.5, 16.0, float(daily_hours), step=0.5)
+        new_auto = st.checkbox("Rebalance automatically when syllabus, practice or mock data changes",
+                               value=auto_rebalance)
+        st.caption("Rebalancing keeps completed weeks and replans the rest from your weakest topics, "
+                   "practice accuracy and mock percentiles.")
+        if st.button("🔄 Save & Rebalance", use_container_width=True):
+            db.set_setting(PLAN_SETTINGS['exam_date'], new_exam_date.isoformat())
+            db.set_setting(PLAN_SETTINGS['daily_hours'], str(new_daily_hours))
+            db.set_setting(AUTO_REBALANCE_SETTING, "1" if new_auto else "0")
+            db.rebalance_study_plan()
+            st.session_state['plan_inputs'] = db.plan_inputs_version()
+            st.rerun()
     
-    st.markdown("<br>", unsafe_allow_html=True)
+    # Replan once per change to the data the plan is built from
+    inputs = db.plan_inputs_version()
+    if auto_rebalance and st.session_state.get('plan_inputs', inputs) != inputs:
+        db.rebalance_study_plan()
+    st.session_state['plan_inputs'] = inputs
     
-    # Week cards
-    col1, col2 = st.columns(2)
-    
-    for i, row in df.iterrows():
-        with col1 if i % 2 == 0 else col2:
-            is_completed = bool(row['completed'])
-            completed_class = "completed" if is_completed else ""
-            icon = "✅" if is_completed else "⬜"
-            
-            st.markdown(f"""
-            <div class="week-card {completed_class}">
-                <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                    <div>
-                        <div style="color: #4facfe; font-weight: 700; font-size: 1.1rem;">{row['week_label']}</div>
-                        <div style="color: #a0aec0; font-size: 0.8rem; margin: 5px 0;">
-                            {row['start_date']} → {row['end_date']}
-                        </div>
-                        <div style="color: #e2e8f0; font-size: 0.9rem;">{row['target']}</div>
-                    </div>
-                    <span style="font-size: 1.5rem;">{icon}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            if st.button(f"Toggle Week {row['week_number']}", key=f"toggle_week_{row['id']}", use_container_width=True):
-                db.toggle_week_completed(row['id'])
-                st.rerun()
+    study_plan_weeks()
 
 
 elif page == "📝 Practice":
     st.markdown('<div class="section-header">📝 Practice Tracker</div>', unsafe_allow_html=True)
     
-    df = db.get_practice_tracker()
-    
     # Stats
-    if len(df) > 0:
-        total_qs = int(df['questions'].sum())
-        total_correct = int(df['correct'].sum())
-        avg_acc = df['accuracy'].mean()
-        reviewed = int(df['reviewed'].sum())
-    else:
-        total_qs = total_correct = reviewed = 0
-        avg_acc = 0
+    stats = db.get_dashboard_stats()
+    total_qs = stats['total_questions']
+    total_correct = stats['total_correct']
+    avg_acc = stats['avg_accuracy']
+    reviewed = stats['reviewed_sessions']
     
     col1, col2, col3, col4 = st.columns(4)
     
     for col, (icon, label, value) in zip([col1, col2, col3, col4], [
         ("📝", "Questions", total_qs),
         ("✅", "Correct", total_correct),
-        ("🎯", "Avg Accuracy", f"{avg_acc:.1f}%"),
+        ("🎯", "Accuracy", f"{avg_acc:.1f}%"),
         ("📖", "Reviewed", reviewed)
     ]):
         with col:
@@ -1342,26 +943,148 @@ elif page == "📝 Practice":
             else:
                 st.error("Please enter a topic")
     
+    # Pace from the parsed time_taken of timed sessions
+    if stats['practice_sessions'] > 0:
+        pace = db.get_practice_pace()
+        st.markdown('<div class="card"><div class="card-title">⏱️ Pace</div>', unsafe_allow_html=True)
+        if pace['timed_sessions']:
+            sections = pace['sections']
+            cols = st.columns(len(sections))
+            for col, row in zip(cols, sections.itertuples()):
+                col.metric(f"{row.section} Questions/Min", f"{row.questions_per_minute:.2f}",
+                           f"{row.seconds_per_question:.0f}s per question", delta_color="off")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.caption("Accuracy (%) by pace band, fastest fifth of sessions first")
+                st.line_chart(pace['bands'].pivot(index='band', columns='section', values='accuracy'))
+            with col2:
+                st.caption("Speed frontier: sessions no faster session beat on accuracy")
+                st.scatter_chart(pace['frontier'], x='seconds_per_question', y='accuracy', color='section')
+            
+            st.caption(f"Topics, over {pace['timed_sessions']} timed sessions")
+            st.dataframe(pace['topics'].sort_values('questions_per_minute').round(2),
+                         hide_index=True, use_container_width=True)
+        else:
+            st.caption("Fill in Time Taken (e.g. 30 min or 1h 15m) when adding sessions to see your pace.")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
     # Sessions table
-    if len(df) > 0:
+    if stats['practice_sessions'] > 0:
+        practice_sessions_table()
+    else:
+        st.info("No practice sessions yet. Add your first one above!")
+
+
+elif page == "🔁 Review":
+    st.markdown('<div class="section-header">🔁 Review Queue</div>', unsafe_allow_html=True)
+    
+    counts = db.get_review_counts()
+    col1, col2 = st.columns(2)
+    for col, (icon, label, value) in zip([col1, col2], [
+        ("⏰", "Due Today", counts['due']),
+        ("📆", "Due in the Next 7 Days", counts['next_7_days']),
+    ]):
+        with col:
+            st.markdown(f"""
+            <div class="stat-mini">
+                <div style="font-size: 1.5rem;">{icon}</div>
+                <div class="stat-mini-value">{value}</div>
+                <div class="stat-mini-label">{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    queue = db.get_review_queue()
+    if len(queue) > 0:
         st.markdown('<div class="table-container">', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">📋 Practice Sessions</div>', unsafe_allow_html=True)
-        st.markdown(render_styled_table(df), unsafe_allow_html=True)
+        st.markdown('<div class="card-title">📋 Due Topics</div>', unsafe_allow_html=True)
+        st.caption("Each practice session grades its topic (SM-2) from its accuracy; "
+                   "well-practised topics come back at growing intervals, weak ones tomorrow.")
+        st.markdown(render_styled_table(queue.rename(columns={'last_accuracy': 'accuracy'})), unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Delete option
-        with st.expander("🗑️ Delete Sessions"):
-            session_to_delete = st.selectbox(
-                "Select session to delete",
-                df['id'].tolist(),
-                format_func=lambda x: f"ID {x}: {df[df['id']==x]['date'].values[0]} - {df[df['id']==x]['topic'].values[0]}"
-            )
-            if st.button("🗑️ Delete Selected", use_container_width=True):
-                db.delete_practice_session(session_to_delete)
-                st.success("Deleted!")
-                st.rerun()
+        labels = {(section, topic): f"{section} • {topic}" for section, topic in zip(queue['section'], queue['topic'])}
+        selected = st.multiselect("Topics reviewed", list(labels), default=list(labels), format_func=labels.get)
+        grade = st.selectbox(
+            "How did it go?", [None] + sorted(QUALITY_LABELS, reverse=True),
+            format_func=lambda q: "Grade from last accuracy" if q is None else f"{q} - {QUALITY_LABELS[q]}"
+        )
+        if st.button("✅ Mark Reviewed", use_container_width=True, disabled=not selected):
+            flagged = db.mark_topics_reviewed(selected, quality=grade)
+            st.success(f"Rescheduled {len(selected)} topic{'s' if len(selected) != 1 else ''}, "
+                       f"{flagged} session{'s' if flagged != 1 else ''} marked reviewed")
+            st.rerun()
     else:
-        st.info("No practice sessions yet. Add your first one above!")
+        st.info("Nothing due for review today. Practice sessions schedule their topics automatically.")
+
+
+elif page == "🎯 Goals":
+    st.markdown('<div class="section-header">🎯 Daily Goals</div>', unsafe_allow_html=True)
+    
+    targets = db.get_goal_targets()
+    history = db.get_goal_history()
+    streak = history['goal_streak']
+    
+    col1, col2, col3 = st.columns(3)
+    for col, (icon, label, value) in zip([col1, col2, col3], [
+        ("🔥", "Goal Streak", f"{streak['current']} days"),
+        ("🏆", "Longest Goal Streak", f"{streak['longest']} days"),
+        ("✅", "Days All Goals Met", history['days_met']),
+    ]):
+        with col:
+            st.markdown(f"""
+            <div class="stat-mini">
+                <div style="font-size: 1.5rem;">{icon}</div>
+                <div class="stat-mini-value">{value}</div>
+                <div class="stat-mini-label">{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    with st.expander("⚙️ Goal Targets", expanded=not targets):
+        st.caption("Daily targets; 0 turns a goal off. Progress counts every practice session logged for the day.")
+        cols = st.columns(len(GOAL_TYPES))
+        new_targets = {}
+        for col, (goal_type, label) in zip(cols, GOAL_TYPES.items()):
+            with col:
+                new_targets[goal_type] = st.number_input(label, min_value=0, max_value=1000,
+                                                         value=targets.get(goal_type, 0), key=f"goal_{goal_type}")
+        if st.button("💾 Save Goals", use_container_width=True):
+            for goal_type, target in new_targets.items():
+                if target != targets.get(goal_type, 0):
+                    db.set_goal_target(goal_type, target)
+            st.success("Goals saved!")
+            st.rerun()
+    
+    progress = db.get_goal_progress()
+    if progress:
+        st.markdown('<div class="card"><div class="card-title">📅 Today</div>', unsafe_allow_html=True)
+        for goal in progress:
+            pct = min(goal['achieved'] / goal['target'] * 100, 100)
+            color = "#48bb78" if goal['completed'] else "#4facfe"
+            st.markdown(f"""
+            <div style="margin-bottom: 15px;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span style="color: #fff; font-weight: 600;">{goal['label']}</span>
+                    <span style="color: {color}; font-weight: 700;">{goal['achieved']}/{goal['target']}{' ✅' if goal['completed'] else ''}</span>
+                </div>
+                {render_progress_bar(pct, color)}
+            </div>
+            """, unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.info("No daily goals set yet. Set a target above to start tracking.")
+    
+    st.markdown(f"""
+    <div class="card">
+        <div class="card-title">🗓️ Practice Heatmap</div>
+        <div style="color: #a0aec0; font-size: 0.8rem;">Questions per day, {history['start']} to {history['end']}</div>
+        {render_heatmap(history)}
+    </div>
+    """, unsafe_allow_html=True)
 
 
 elif page == "📈 Mock Tests":
@@ -1453,11 +1176,38 @@ elif page == "📈 Mock Tests":
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown('<div class="card"><div class="card-title">📈 Percentile Trend</div>', unsafe_allow_html=True)
             
-            chart_df = df.sort_values('date')[['date', 'varc_percentile', 'dilr_percentile', 'qa_percentile', 'overall_percentile']]
-            chart_df = chart_df.set_index('date')
-            st.line_chart(chart_df)
+            mock_percentile_chart()
             
             st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Next mock projection
+        projected = db.get_mock_projection()
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<div class="card"><div class="card-title">🔮 Next Mock Projection</div>', unsafe_allow_html=True)
+        if projected['sections']:
+            st.caption(f"Least-squares fit over your {projected['n_mocks']} mocks, projected to around "
+                       f"{projected['next_date']}; ranges are {projected['confidence']:.0%} prediction intervals.")
+            cols = st.columns(len(projected['sections']))
+            for col, (section, fit) in zip(cols, projected['sections'].items()):
+                low, high = fit['percentile_interval']
+                score_low, score_high = fit['score_interval']
+                col.metric(f"{section} Percentile", f"{fit['percentile']:.1f}", f"{fit['score_per_week']:+.1f} marks/week")
+                col.caption(f"{low:.1f} – {high:.1f} percentile  \nScore {fit['score']:.0f} ({score_low:.0f} – {score_high:.0f})")
+        else:
+            st.info(f"Add at least {MIN_MOCKS} mock tests to see a projection.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Score against time taken
+        timed = db.get_mock_pace()
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<div class="card"><div class="card-title">⏱️ Mock Pace</div>', unsafe_allow_html=True)
+        if len(timed) > 0:
+            st.caption("Total score against minutes taken; frontier mocks beat every faster mock.")
+            st.scatter_chart(timed, x='minutes', y='total_score', color='on_frontier')
+            st.dataframe(timed.round(2), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Fill in Time Taken (e.g. 2h 45m) when adding mocks to compare score against time.")
+        st.markdown('</div>', unsafe_allow_html=True)
     else:
         st.info("No mock tests yet. Add your first one above!")
 
@@ -1470,43 +1220,51 @@ elif page == "⚙️ Settings":
     with col1:
         st.markdown('<div class="card"><div class="card-title">💾 Export Data</div>', unsafe_allow_html=True)
         
-        try:
-            excel_data = db.export_to_excel()
-            st.download_button(
-                "⬇️ Download Excel (All Data)",
-                data=excel_data,
-                file_name=f"CAT_Planner_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
-        except Exception as e:
-            st.error(f"Excel export failed: {e}")
-            st.info("Install openpyxl: pip install openpyxl")
+        exporter = db.exports
+        render_export_button(
+            exporter, "excel", "Excel (All Data)",
+            f"CAT_Planner_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        render_export_button(
+            exporter, "bundle", "ZIP (All Tables as CSV)",
+            f"CAT_Planner_{datetime.now().strftime('%Y%m%d')}.zip", "application/zip"
+        )
         
         # Individual CSVs
         st.markdown("<br>", unsafe_allow_html=True)
         st.write("**Individual CSV Exports:**")
         
-        tables = {
-            "Syllabus": db.get_syllabus(),
-            "Difficulty": db.get_difficulty(),
-            "Study Plan": db.get_study_plan(),
-            "Practice": db.get_practice_tracker(),
-            "Mock Tests": db.get_mock_tests()
-        }
-        
-        for name, df in tables.items():
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                f"📄 {name}.csv",
-                data=csv,
-                file_name=f"{name.lower().replace(' ', '_')}.csv",
-                mime="text/csv",
-                use_container_width=True,
-                key=f"csv_{name}"
+        for name in CSV_EXPORTS:
+            render_export_button(
+                exporter, f"csv:{name}", f"{name}.csv",
+                f"{name.lower().replace(' ', '_')}.csv", "text/csv"
             )
         
         st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Import a backup
+        st.markdown('<div class="card"><div class="card-title">📥 Import Data</div>', unsafe_allow_html=True)
+        
+        uploaded = st.file_uploader("Backup file", type=["xlsx", "csv", "json", "zip"],
+                                    help="An Excel or ZIP export, a CSV download or a JSON backup")
+        on_conflict = st.radio("Rows whose id already exists", ["skip", "replace", "merge"],
+                               format_func=str.title, horizontal=True)
+        
+        if uploaded is not None and st.button("📥 Import", use_container_width=True):
+            try:
+                report = db.import_data(uploaded, on_conflict=on_conflict)
+            except ValueError as e:
+                st.error(f"Import failed: {e}")
+            else:
+                for table, result in report.items():
+                    st.write(f"**{table.replace('_', ' ').title()}:** {result['inserted']} added, "
+                             f"{result['updated']} updated, {result['skipped']} skipped, "
+                             f"{result['rejected']} rejected")
+                    for row, message in result['errors']:
+                        st.caption(f"Row {row}: {message}")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="card"><div class="card-title">🔧 Database Management</div>', unsafe_allow_html=True)
@@ -1526,6 +1284,26 @@ elif page == "⚙️ Settings":
         </div>
         """, unsafe_allow_html=True)
         
+        cache = db.cache.status()
+        st.markdown(f"""
+        <div style="background: rgba(255,255,255,0.03); border-radius: 10px; padding: 15px; margin-bottom: 15px;">
+            <div style="color: #a0aec0; font-size: 0.8rem;">Query Cache</div>
+            <div style="margin-top: 10px; color: #e2e8f0; font-size: 0.9rem;">
+                • Hits / misses: {cache['hits']} / {cache['misses']} ({cache['hit_ratio']:.0%} hit rate)<br>
+                • Entries: {cache['entries']} ({cache['bytes'] / 1024:.0f} KB of {cache['max_bytes'] / 1024 / 1024:.0f} MB)<br>
+                • Evictions: {cache['evictions']} • Invalidations: {cache['invalidations']}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("🔁 Verify Statistics", use_container_width=True):
+            mismatches = db.check_stats_consistency()
+            if mismatches:
+                db.rebuild_stats()
+                st.warning(f"Rebuilt statistics ({len(mismatches)} out of sync)")
+            else:
+                st.success("Statistics are consistent")
+        
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Danger zone
@@ -1538,7 +1316,7 @@ elif page == "⚙️ Settings":
         
         if st.button("🗑️ Reset All Data", use_container_width=True, type="primary"):
             st.warning("Are you sure? This will delete all your data!")
-            
+        
         if st.button("⚠️ Confirm Reset", use_container_width=True):
             db.reset_all_data()
             st.success("All data has been reset to defaults!")
@@ -1552,13 +1330,59 @@ elif page == "⚙️ Settings":
     <div class="card">
         <div class="card-title">ℹ️ Database Information</div>
         <div style="color: #a0aec0; font-size: 0.9rem;">
-            <p><strong>Location:</strong> {Path(DB_PATH).absolute()}</p>
-            <p><strong>Type:</strong> SQLite 3</p>
+            <p><strong>Profile:</strong> {st.session_state['profile']}</p>
+            <p><strong>Location:</strong> {Path(db.db_path).absolute()}</p>
+            <p><strong>Type:</strong> SQLite 3 ({db.pool.config['journal_mode']} journal, synchronous={db.pool.config['synchronous']})</p>
+            <p><strong>Schema version:</strong> {db.schema_version()}</p>
             <p>Your data is stored locally in this SQLite database file. 
             Back up this file to preserve your data across reinstalls.</p>
         </div>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Performance panel, hidden unless the app is opened with ?perf=1
+    if st.query_params.get("perf") == "1":
+        st.markdown("<br>", unsafe_allow_html=True)
+        with st.expander("⚡ Performance", expanded=True):
+            runs = METRICS.runs()
+            if runs:
+                st.write("**Recent page runs:**")
+                st.dataframe(pd.DataFrame([{
+                    'Page': run['page'],
+                    'Total ms': round(run['ms'], 1),
+                    'Query ms': round(run.get('query_ms', 0.0), 1),
+                    'Queries': sum(n for name, n in run['calls'].items() if name.startswith('Database.')),
+                    'HTML KB': round(run['bytes'] / 1024, 1),
+                    'Repeated': ", ".join(f"{name.split('.')[-1]} ×{n}" for name, n in run['calls'].items()
+                                          if n > 1 and name.startswith('Database.')),
+                } for run in runs]), hide_index=True, use_container_width=True)
+            
+            timings = METRICS.timings()
+            if timings:
+                st.write("**Calls (all sessions):**")
+                st.dataframe(pd.DataFrame(timings).round(2), hide_index=True, use_container_width=True)
+                
+                choice = st.selectbox("Latency histogram", [f"{t['kind']}: {t['name']}" for t in timings])
+                kind, _, name = choice.partition(": ")
+                histogram = METRICS.histogram(kind, name)
+                most = max(histogram.values()) or 1
+                for bucket, count in histogram.items():
+                    if count:
+                        st.markdown(f"""
+                        <div style="display: flex; align-items: center; gap: 10px; color: #a0aec0; font-size: 0.8rem;">
+                            <div style="width: 80px;">{bucket}</div>
+                            <div style="flex: 1;">{render_progress_bar(count / most * 100)}</div>
+                            <div style="width: 60px; text-align: right;">{count}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+            else:
+                st.info("No calls recorded yet")
+            
+            if METRICS.trace_path:
+                st.caption(f"Writing a JSONL trace to {Path(METRICS.trace_path).absolute()}")
+            if st.button("🧹 Reset Metrics", use_container_width=True):
+                METRICS.reset()
+                st.rerun()
 
 
 # =============================================================================
@@ -1576,3 +1400,7 @@ st.markdown("""
     </div>
 </div>
 """, unsafe_allow_html=True)
+
+# Runs that end in st.rerun() or st.stop() never get here; the next
+# begin_run on this thread ends them
+METRICS.end_run()
@@ -0,0 +1,124 @@
+# check_backends.py - run one workload on every storage backend and compare
+#
+# The same sequence of writes, deferred edits, concurrent inserts and a ZIP
+# export/restore runs against the built-in pool on a file, a SQLAlchemy engine
+# on a file URL and a SQLAlchemy engine on an in-memory URL. Exits non-zero if
+# any backend ends with different data or inconsistent stats (the pytest
+# suite runs the same comparison in tests/test_database.py). Run from the
+# repo root:
+#
+#     python -m benchmarks.check_backends --rows 2000
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.check_query_plans import seed
+from catplanner import Database
+from catplanner.database import USER_TABLES
+from catplanner.export import write_bundle
+
+
+def workload(db, rows, threads):
+    """Exercise every write path; returns a snapshot of the resulting tables"""
+    seed(db, rows)
+    
+    syllabus = db.get_syllabus()
+    for i, id in enumerate(syllabus['id'].head(20)):
+        db.update_syllabus(int(id), confidence=i % 5 + 1, studied=i % 2, notes=f"note {i}")
+    difficulty = db.get_difficulty()
+    for i, id in enumerate(difficulty['id'].head(10)):
+        for mastery in range(0, 100, 25):
+            db.queue_update('difficulty', int(id), mastery=mastery + i, level="Hard")
+    db.flush_writes()
+    plan = db.get_study_plan()
+    db.update_study_plan(int(plan['id'].iloc[0]), notes="first week", completed=1)
+    db.delete_syllabus_topic(int(syllabus['id'].iloc[-1]))
+    
+    practice = db.get_practice_tracker(limit=5)
+    for id in practice['id']:
+        db.update_practice_session(int(id), correct=10, questions=20)
+    
+    def insert(worker):
+        for i in range(25):
+            db.add_practice_session("2026-01-01", "QA", f"Worker {worker}", 20, i % 21)
+    pool = [threading.Thread(target=insert, args=(w,)) for w in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    
+    db.add_mock_test("2026-02-01", "Backend Mock", 30, 90, 25, 85, 40, 95, 95, 93)
+    
+    # Export everything, wipe it and restore it through the importer
+    backup = io.BytesIO()
+    write_bundle(db, backup, tables=USER_TABLES)
+    db.reset_all_data()
+    report = db.import_data(io.BytesIO(backup.getvalue()), fmt='zip', on_conflict='replace')
+    for table, result in report.items():
+        if result['rejected']:
+            raise AssertionError(f"restore rejected {table} rows: {result['errors']}")
+    
+    return snapshot(db)
+
+
+def snapshot(db):
+    """Sorted table contents without ids and timestamps
+    
+    Concurrent inserts interleave differently on every run, so which row gets
+    which id (and when) is not part of the comparison.
+    """
+    tables = {}
+    with db.get_connection() as conn:
+        for table in USER_TABLES:
+            columns = [row['name'] for row in conn.execute(f"PRAGMA table_info({table})")
+                       if row['name'] not in ('id', 'created_at', 'updated_at')]
+            tables[table] = conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+    return {table: sorted((tuple(row) for row in rows), key=repr) for table, rows in tables.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare storage backends on one workload")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    
+    failures = 0
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            'pool (file)': os.path.join(tmp, "pool.db"),
+            'sqlalchemy (file)': "sqlite:///" + os.path.join(tmp, "engine.db"),
+            'sqlalchemy (memory)': "sqlite://",
+        }
+        for name, target in backends.items():
+            start = time.perf_counter()
+            db = Database(target)
+            try:
+                results[name] = workload(db, args.rows, args.threads)
+                problems = db.check_stats_consistency()
+                status = db.pool.status()
+            finally:
+                db.close()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<20} {elapsed:>7.2f}s  created={status['created']} busy_retries={status['busy_retries']}")
+            for problem in problems:
+                print(f"    STATS MISMATCH: {problem}")
+                failures += 1
+    
+    reference_name, reference = next(iter(results.items()))
+    for name, tables in results.items():
+        for table in USER_TABLES:
+            if tables[table] != reference[table]:
+                print(f"DIFFERENT: {table} on {name} ({len(tables[table])} rows) "
+                      f"vs {reference_name} ({len(reference[table])} rows)")
+                failures += 1
+    print(f"{failures} backend difference(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
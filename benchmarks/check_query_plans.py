@@ -0,0 +1,73 @@
+# check_query_plans.py - fail when a Database query regresses to a full scan
+#
+# Seeds a throwaway database with a realistic amount of history, traces every
+# read method and runs EXPLAIN QUERY PLAN on the SQL it issued. Exits non-zero
+# if a query scans a table outside catplanner.database.plan_problems' allowances
+# or sorts in a temp B-tree.
+#
+#     python -m benchmarks.check_query_plans --rows 5000
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from catplanner import Database
+
+
+def seed(db, rows):
+    """Insert synthetic practice sessions and mock tests"""
+    rng = random.Random(42)
+    start = date.today() - timedelta(days=365)
+    practice = []
+    for _ in range(rows):
+        questions = rng.randint(5, 40)
+        correct = rng.randint(0, questions)
+        practice.append((
+            str(start + timedelta(days=rng.randint(0, 365))),
+            rng.choice(["VARC", "DILR", "QA"]),
+            rng.choice(["Arithmetic", "Algebra", "RC", "Para Jumbles", "Arrangements"]),
+            questions, correct, questions - correct, correct / questions * 100,
+        ))
+    mocks = [
+        (str(start + timedelta(days=7 * i)), f"Mock {i}", rng.uniform(60, 99))
+        for i in range(max(rows // 50, 10))
+    ]
+    with db.get_connection() as conn:
+        conn.executemany('''
+            INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', practice)
+        conn.executemany('''
+            INSERT INTO mock_tests (date, test_name, overall_percentile) VALUES (?, ?, ?)
+        ''', mocks)
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check query plans of Database read methods")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--verbose", action="store_true", help="print every traced plan")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "plans.db"))
+        seed(db, args.rows)
+        if args.verbose:
+            for entry in db.explain_query_plans():
+                print(entry['sql'])
+                for detail in entry['plan']:
+                    print(f"    {detail}")
+        problems = db.check_query_plans()
+        db.close()
+    
+    for problem in problems:
+        print(f"FULL SCAN: {problem['problem']}\n    {problem['sql']}")
+    print(f"{len(problems)} query plan regression(s)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# cli_startup.py - cold start time of the headless command line
+#
+# Runs `python -m catplanner stats` in fresh interpreters against a seeded
+# database and fails if the median wall time is over the target, or if the
+# command loaded a module it shouldn't need (Streamlit, pandas, SQLAlchemy,
+# openpyxl). Run from the repo root:
+#
+#     python -m benchmarks.cli_startup --runs 10 --target-ms 150
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.check_query_plans import seed
+from catplanner import Database
+
+# Loading any of these means a lazy import regressed
+HEAVY_MODULES = ('streamlit', 'pandas', 'numpy', 'sqlalchemy', 'openpyxl')
+
+PROBE = '''
+import sys
+from catplanner.cli import main
+code = main(sys.argv[1:])
+sys.stdout.flush()
+print("LOADED", *[m for m in {heavy!r} if m in sys.modules], file=sys.stderr)
+sys.exit(code)
+'''
+
+
+def cold_runs(args, runs):
+    """Wall times of ``runs`` fresh ``python -m catplanner ...`` processes"""
+    env = {**os.environ, 'PYTHONPATH': os.getcwd()}
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "catplanner", *args], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def loaded_modules(args) -> list:
+    """Heavy modules present in sys.modules after running a command"""
+    env = {**os.environ, 'PYTHONPATH': os.getcwd()}
+    result = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), *args], env=env,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    line = next(l for l in result.stderr.splitlines() if l.startswith("LOADED"))
+    return line.split()[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start of `python -m catplanner stats`")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=5000, help="practice rows seeded first")
+    parser.add_argument("--target-ms", type=float, default=150.0, help="fail if the median is slower")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cli.db")
+        db = Database(path)
+        seed(db, args.rows)
+        db.close()
+        
+        command = ["--db", path, "stats"]
+        baseline = cold_runs(["--help"], args.runs)
+        samples = cold_runs(command, args.runs)
+        loaded = loaded_modules(command)
+    
+    median_ms = statistics.median(samples) * 1000
+    print(f"python -m catplanner --help: {statistics.median(baseline) * 1000:7.1f}ms median")
+    print(f"python -m catplanner stats:  {median_ms:7.1f}ms median, {max(samples) * 1000:.1f}ms max "
+          f"({args.runs} runs, target {args.target_ms:.0f}ms)")
+    failures = 0
+    if loaded:
+        print(f"HEAVY IMPORTS: stats loaded {', '.join(loaded)}")
+        failures += 1
+    if median_ms > args.target_ms:
+        print(f"TOO SLOW: {median_ms:.1f}ms > {args.target_ms:.0f}ms")
+        failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# export_memory.py - peak RSS of the DataFrame exports vs. the streaming pipeline
+#
+# Seeds a throwaway database per row count, then runs every export mode in a
+# fresh child process so each peak is measured on its own. Reports the RSS
+# growth over the child's baseline (imports + open database). Run from the
+# repo root:
+#
+#     python -m benchmarks.export_memory --rows 1000 10000 100000
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.check_query_plans import seed
+from catplanner import Database
+from catplanner.export import EXCEL_TABLES, write_bundle, write_table
+
+
+def _dataframe_csv(db, out):
+    for table in EXCEL_TABLES:
+        getter = 'get_practice_tracker' if table == 'practice_tracker' else f"get_{table}"
+        out.write(getattr(db, getter)().to_csv(index=False).encode('utf-8'))
+
+
+MODES = {
+    'excel': lambda db, out: out.write(db.export_to_excel()),
+    'json': lambda db, out: out.write(json.dumps(db.export_all_data(), default=str).encode('utf-8')),
+    'dataframe-csv': _dataframe_csv,
+    'stream-csv': lambda db, out: [write_table(db, t, out, 'csv') for t in EXCEL_TABLES],
+    'stream-jsonl': lambda db, out: [write_table(db, t, out, 'jsonl') for t in EXCEL_TABLES],
+    'stream-parquet': lambda db, out: [write_table(db, t, out, 'parquet') for t in EXCEL_TABLES],
+    'stream-zip': lambda db, out: write_bundle(db, out),
+}
+
+
+def _max_rss_kb() -> int:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def child(mode, db_path):
+    """Run one export and print its memory and timing as JSON"""
+    db = Database(db_path)
+    baseline = _max_rss_kb()
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as out:
+        MODES[mode](db, out)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'baseline_kb': baseline, 'peak_kb': _max_rss_kb(), 'seconds': elapsed}))
+
+
+def measure(mode, db_path) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.export_memory", "--child", mode, "--db", db_path],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak RSS of export paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args.child, args.db)
+        return
+    
+    print(f"{'rows':>8} {'mode':>15} {'peak +RSS':>10} {'time':>9}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "export.db")
+            db = Database(db_path)
+            seed(db, rows)
+            db.close()
+            for mode in args.modes:
+                result = measure(mode, db_path)
+                if 'error' in result:
+                    print(f"{rows:>8} {mode:>15}  {result['error']}")
+                    continue
+                growth = (result['peak_kb'] - result['baseline_kb']) / 1024
+                print(f"{rows:>8} {mode:>15} {growth:>8.1f}MB {result['seconds'] * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# render_table.py - columnar render_styled_table vs. the old iterrows renderer
+#
+# Builds synthetic practice histories, checks both renderers emit identical
+# HTML and prints their timings. Run from the repo root:
+#
+#     python -m benchmarks.render_table --rows 100 10000 100000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from catplanner.render import get_badge_html, render_styled_table
+
+
+def legacy_render_styled_table(df, exclude_cols=None):
+    """The row-by-row renderer render_styled_table replaced"""
+    if exclude_cols is None:
+        exclude_cols = ['id', 'created_at', 'updated_at', 'notes']
+    
+    display_df = df.drop(columns=[c for c in exclude_cols if c in df.columns], errors='ignore')
+    
+    html = '<table class="styled-table"><thead><tr>'
+    for col in display_df.columns:
+        html += f'<th>{col.replace("_", " ").title()}</th>'
+    html += '</tr></thead><tbody>'
+    
+    for _, row in display_df.iterrows():
+        html += '<tr>'
+        for col in display_df.columns:
+            val = row[col]
+            cell = str(val)
+            
+            if col in ['studied', 'completed', 'reviewed']:
+                cell = '✅' if val else '⬜'
+            elif col == 'level':
+                cell = get_badge_html(val, val)
+            elif col == 'priority':
+                cell = get_badge_html(val, val)
+            elif col in ['confidence', 'mastery', 'accuracy']:
+                color = '#38ef7d' if val >= 75 else '#f7b733' if val >= 50 else '#ef4444'
+                cell = f'<span style="color:{color}; font-weight:600;">{val:.0f}%</span>'
+            elif 'percentile' in col.lower():
+                cell = f'{val:.1f}%ile'
+            
+            html += f'<td>{cell}</td>'
+        html += '</tr>'
+    
+    html += '</tbody></table>'
+    return html
+
+
+def synthetic_practice(rows: int) -> pd.DataFrame:
+    """A practice_tracker-shaped frame with badge and percentile columns mixed in"""
+    rng = np.random.default_rng(7)
+    questions = rng.integers(1, 40, rows)
+    correct = rng.integers(0, questions + 1)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'date': pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d").to_numpy(dtype=object),
+        'section': rng.choice(np.array(["VARC", "DILR", "QA"], dtype=object), rows),
+        'topic': rng.choice(np.array(["Arithmetic", "Algebra", "RC", "Para Jumbles"], dtype=object), rows),
+        'questions': questions,
+        'correct': correct,
+        'wrong': questions - correct,
+        'accuracy': correct / questions * 100,
+        'priority': rng.choice(np.array(["High", "Medium", "Low"], dtype=object), rows),
+        'overall_percentile': rng.uniform(40, 100, rows),
+        'time_taken': rng.choice(np.array(["30 min", "45 min", "", None], dtype=object), rows),
+        'reviewed': rng.integers(0, 2, rows),
+        'notes': "",
+    })
+
+
+def timed(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, html
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark render_styled_table")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=100_000,
+                        help="skip the legacy renderer above this size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'rows':>8} {'columnar':>10} {'legacy':>10} {'speedup':>8} {'html':>10}")
+    for rows in args.rows:
+        df = synthetic_practice(rows)
+        new_time, new_html = timed(render_styled_table, df, args.repeat)
+        if rows <= args.legacy_max_rows:
+            old_time, old_html = timed(legacy_render_styled_table, df, 1)
+            if old_html != new_html:
+                raise SystemExit(f"Renderers disagree at {rows} rows")
+            legacy = f"{old_time * 1000:>8.1f}ms"
+            speedup = f"{old_time / new_time:>7.1f}x"
+        else:
+            legacy, speedup = f"{'-':>10}", f"{'-':>8}"
+        print(f"{rows:>8} {new_time * 1000:>8.1f}ms {legacy} {speedup} {len(new_html) / 1024:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# stress_sessions.py - reader/writer throughput under concurrent sessions
+#
+# Simulates N browser sessions hitting one database file: readers render the
+# dashboard stats, writers move syllabus sliders. Run from the repo root:
+#
+#     python -m benchmarks.stress_sessions --sessions 16 --duration 10
+#     python -m benchmarks.stress_sessions --journal-modes WAL DELETE
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from catplanner import Database
+
+
+def run_session(db, ids, deadline, write_ratio, results, lock):
+    """One simulated session: loop reads and writes until the deadline"""
+    reads, writes, errors = [], [], 0
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                db.update_syllabus(rng.choice(ids), confidence=rng.randint(0, 100))
+                writes.append(time.perf_counter() - start)
+            else:
+                db.get_dashboard_stats()
+                reads.append(time.perf_counter() - start)
+        except sqlite3.OperationalError:
+            errors += 1
+    with lock:
+        results['reads'].extend(reads)
+        results['writes'].extend(writes)
+        results['errors'] += errors
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1] if len(samples) > 1 else samples[0]
+
+
+def run(journal_mode, sessions, duration, write_ratio):
+    """Run one stress round against a fresh database file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "stress.db"), pool_size=sessions,
+                      storage_config={'journal_mode': journal_mode})
+        ids = db.get_syllabus()['id'].tolist()
+        results = {'reads': [], 'writes': [], 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=run_session, args=(db, ids, deadline, write_ratio, results, lock))
+            for _ in range(sessions)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        retries = db.pool.stats['busy_retries']
+        db.close()
+    
+    reads, writes = results['reads'], results['writes']
+    return {
+        'journal_mode': journal_mode,
+        'sessions': sessions,
+        'reads_per_s': len(reads) / duration,
+        'writes_per_s': len(writes) / duration,
+        'read_p95_ms': percentile(reads, 95) * 1000,
+        'write_p95_ms': percentile(writes, 95) * 1000,
+        'busy_retries': retries,
+        'errors': results['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reader/writer throughput under concurrent sessions")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--journal-modes", nargs="+", default=["WAL", "DELETE"])
+    args = parser.parse_args()
+    
+    print(f"{'mode':<8} {'sessions':>8} {'reads/s':>10} {'writes/s':>10} "
+          f"{'read p95':>10} {'write p95':>10} {'retries':>8} {'errors':>7}")
+    for mode in args.journal_modes:
+        r = run(mode.upper(), args.sessions, args.duration, args.write_ratio)
+        print(f"{r['journal_mode']:<8} {r['sessions']:>8} {r['reads_per_s']:>10.0f} {r['writes_per_s']:>10.0f} "
+              f"{r['read_p95_ms']:>8.1f}ms {r['write_p95_ms']:>8.1f}ms {r['busy_retries']:>8} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+# suite.py - time every public Database method and the HTML builders at scale
+#
+# Seeds a fresh database per scale (practice rows plus a few hundred mock
+# tests), times each case and writes the results as JSON. Pass --compare with
+# an earlier results file to flag cases whose median got slower. Run from the
+# repo root:
+#
+#     python -m benchmarks.suite --scales 10 1000 100000 1000000
+#     python -m benchmarks.suite --scales 1000 --compare benchmarks/results/suite-old.json
+import argparse
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from catplanner import Database
+from catplanner.render import render_styled_table
+from catplanner.scheduler import build_schedule, build_units
+
+SECTIONS = ["VARC", "DILR", "QA"]
+TOPICS = ["Arithmetic", "Algebra", "RC", "Para Jumbles", "Arrangements", "Geometry"]
+SEED_CHUNK_ROWS = 50_000
+
+# Public methods that are plumbing rather than work worth timing
+UNTIMED_METHODS = {'close', 'get_connection'}
+
+# =============================================================================
+# SEEDING
+# =============================================================================
+
+
+def _practice_rows(rng, count, start):
+    for _ in range(count):
+        questions = rng.randint(5, 40)
+        correct = rng.randint(0, questions)
+        minutes = rng.randint(5, 60)
+        yield (
+            str(start + timedelta(days=rng.randint(0, 730))), rng.choice(SECTIONS), rng.choice(TOPICS),
+            questions, correct, questions - correct, correct / questions * 100, f"{minutes} min", minutes * 60,
+        )
+
+
+def seed(db, practice_rows: int, mock_rows: int):
+    """Insert synthetic history in chunks so a million rows fit in memory"""
+    rng = random.Random(42)
+    start = date.today() - timedelta(days=730)
+    rows = _practice_rows(rng, practice_rows, start)
+    with db.get_connection() as conn:
+        while True:
+            chunk = [row for _, row in zip(range(SEED_CHUNK_ROWS), rows)]
+            if not chunk:
+                break
+            conn.executemany('''
+                INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy,
+                                              time_taken, time_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', chunk)
+            conn.commit()
+        mocks = []
+        for i in range(mock_rows):
+            scores = [rng.uniform(10, 60) for _ in SECTIONS]
+            percentiles = [rng.uniform(50, 99.9) for _ in SECTIONS]
+            minutes = rng.randint(100, 120)
+            mocks.append((str(start + timedelta(days=2 * i)), f"Mock {i + 1}",
+                          scores[0], percentiles[0], scores[1], percentiles[1], scores[2], percentiles[2],
+                          sum(scores), sum(percentiles) / 3, f"{minutes // 60}h {minutes % 60}m", minutes * 60))
+        conn.executemany('''
+            INSERT INTO mock_tests (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
+                                    qa_score, qa_percentile, total_score, overall_percentile, time_taken, time_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', mocks)
+        conn.execute("ANALYZE")
+        conn.commit()
+    db.cache.clear()
+
+# =============================================================================
+# CASES
+# =============================================================================
+
+
+def _last_id(db, table):
+    with db.get_connection() as conn:
+        return conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+
+
+def _csv_backup(db, rows=1000) -> bytes:
+    """Recent practice rows as CSV without ids, so every import inserts"""
+    df = db.get_practice_tracker(limit=rows).drop(columns=['id', 'created_at', 'updated_at'])
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def case(name, call, setup=None, max_rows=None, repeat=None) -> dict:
+    """A timed ``call``; ``setup`` runs untimed before each repetition"""
+    return {'name': name, 'call': call, 'setup': setup, 'max_rows': max_rows, 'repeat': repeat}
+
+
+def _large_schedule():
+    """Plan a syllabus of 100 topics x 6 sub-topics over a year"""
+    topics = [{'section': SECTIONS[i % 3], 'main_topic': f"Topic {i}",
+               'sub_topics': ", ".join(f"Sub {i}.{j}" for j in range(6)),
+               'confidence': 20 + (i * 7) % 70, 'priority': ("High", "Medium", "Low")[i % 3], 'studied': i % 4 == 0}
+              for i in range(100)]
+    start = date.today()
+    return build_schedule(build_units(topics), start, start + timedelta(weeks=52))
+
+
+def read_cases(db, args):
+    """Cases that leave the data unchanged"""
+    latest = db.get_practice_tracker(limit=1)
+    cursor = (latest['date'].iloc[0], int(latest['id'].iloc[0])) if not latest.empty else None
+    page = db.get_practice_tracker(limit=25)
+    return [
+        case('get_syllabus', lambda: db.get_syllabus()),
+        case('get_syllabus(section)', lambda: db.get_syllabus("QA")),
+        case('get_difficulty', lambda: db.get_difficulty()),
+        case('get_study_plan', lambda: db.get_study_plan()),
+        case('get_practice_tracker', lambda: db.get_practice_tracker()),
+        case('get_practice_tracker(limit=25)', lambda: db.get_practice_tracker(limit=25)),
+        case('get_practice_tracker(page 2)', lambda: db.get_practice_tracker(limit=25, before=cursor)),
+        case('get_practice_tracker(section, topic)',
+             lambda: db.get_practice_tracker(limit=25, section="QA", topic="Algebra")),
+        case('get_mock_tests', lambda: db.get_mock_tests()),
+        case('get_mock_projection', lambda: (db.cache.clear(), db.get_mock_projection())),
+        case('get_mock_pace', lambda: (db.cache.clear(), db.get_mock_pace())),
+        case('get_mock_projection [cached]', lambda: db.get_mock_projection(), setup=db.get_mock_projection),
+        case('get_dashboard_stats', lambda: db.get_dashboard_stats()),
+        case('get_section_analysis', lambda: db.get_section_analysis("QA")),
+        case('get_practice_trends', lambda: db.get_practice_trends()),
+        case('get_practice_pace', lambda: (db.cache.clear(), db.get_practice_pace())),
+        case('get_practice_pace [cached]', lambda: db.get_practice_pace(), setup=db.get_practice_pace),
+        case('get_review_queue', lambda: db.get_review_queue()),
+        case('get_review_counts', lambda: db.get_review_counts()),
+        case('get_goal_targets', lambda: db.get_goal_targets()),
+        case('get_goal_progress', lambda: db.get_goal_progress()),
+        case('get_goal_history', lambda: db.get_goal_history()),
+        case('get_plan_settings', lambda: db.get_plan_settings()),
+        case('plan_inputs_version', lambda: db.plan_inputs_version()),
+        case('build_schedule(600 sub-topics, 52 weeks)', lambda: _large_schedule()),
+        case('get_setting', lambda: db.get_setting("theme")),
+        case('get_settings', lambda: db.get_settings()),
+        case('schema_version', lambda: db.schema_version()),
+        case('check_stats_consistency', lambda: db.check_stats_consistency()),
+        case('explain_query_plans', lambda: db.explain_query_plans()),
+        case('check_query_plans', lambda: db.check_query_plans()),
+        case('pending_writes', lambda: db.pending_writes()),
+        case('with_pending', lambda: db.with_pending('syllabus', page)),
+        case('export_all_data', lambda: db.export_all_data(), max_rows=args.export_max_rows),
+        case('export_to_excel', lambda: db.export_to_excel(), max_rows=args.export_max_rows),
+        case('render_styled_table(25 rows)', lambda: render_styled_table(page)),
+        case('render_styled_table(all practice)',
+             lambda: render_styled_table(db.get_practice_tracker()), max_rows=args.export_max_rows),
+        case('render_styled_table(mock tests)', lambda: render_styled_table(db.get_mock_tests())),
+    ]
+
+
+def write_cases(db, args):
+    """Cases that change the data; each setup step is untimed"""
+    ids = {table: _last_id(db, table) for table in ('syllabus', 'difficulty', 'study_plan', 'practice_tracker')}
+    backup = _csv_backup(db)
+    today = str(date.today())
+    return [
+        case('init_database', lambda: db.init_database()),
+        case('reload_storage_config', lambda: db.reload_storage_config()),
+        case('set_setting', lambda: db.set_setting("benchmark", "1")),
+        case('update_syllabus', lambda: db.update_syllabus(ids['syllabus'], confidence=70, notes="bench")),
+        case('update_difficulty', lambda: db.update_difficulty(ids['difficulty'], mastery=60)),
+        case('update_study_plan', lambda: db.update_study_plan(ids['study_plan'], notes="bench")),
+        case('update_practice_session',
+             lambda: db.update_practice_session(ids['practice_tracker'], questions=30, correct=20)),
+        case('queue_update', lambda: db.queue_update('syllabus', ids['syllabus'], confidence=40)),
+        case('flush_writes', lambda: db.flush_writes(),
+             setup=lambda: db.queue_update('syllabus', ids['syllabus'], confidence=45)),
+        case('toggle_week_completed', lambda: db.toggle_week_completed(ids['study_plan'])),
+        # Replaces the unfinished weeks, so after the study_plan id cases
+        case('rebalance_study_plan', lambda: db.rebalance_study_plan()),
+        case('toggle_reviewed', lambda: db.toggle_reviewed(ids['practice_tracker'])),
+        case('mark_syllabus_studied', lambda: db.mark_syllabus_studied("QA", True)),
+        case('add_syllabus_topic', lambda: db.add_syllabus_topic("QA", "Benchmark Topic")),
+        case('delete_syllabus_topic', lambda: db.delete_syllabus_topic(_last_id(db, 'syllabus')),
+             setup=lambda: db.add_syllabus_topic("QA", "Benchmark Topic")),
+        case('add_difficulty_item', lambda: db.add_difficulty_item("QA", "Benchmark")),
+        case('delete_difficulty_item', lambda: db.delete_difficulty_item(_last_id(db, 'difficulty')),
+             setup=lambda: db.add_difficulty_item("QA", "Benchmark")),
+        case('add_practice_session', lambda: db.add_practice_session(today, "QA", "Algebra", 20, 15)),
+        case('delete_practice_session', lambda: db.delete_practice_session(_last_id(db, 'practice_tracker')),
+             setup=lambda: db.add_practice_session(today, "QA", "Algebra", 20, 15)),
+        case('mark_topics_reviewed', lambda: db.mark_topics_reviewed([("QA", "Algebra"), ("VARC", "RC")])),
+        case('set_goal_target', lambda: db.set_goal_target('questions', 60)),
+        case('add_mock_test', lambda: db.add_mock_test(today, "Benchmark Mock", 30, 90, 25, 85, 40, 95)),
+        case('delete_mock_test', lambda: db.delete_mock_test(_last_id(db, 'mock_tests')),
+             setup=lambda: db.add_mock_test(today, "Benchmark Mock", 30, 90, 25, 85, 40, 95)),
+        case('import_data(csv, 1000 rows)',
+             lambda: db.import_data(io.BytesIO(backup), fmt='csv', table='practice_tracker')),
+        case('rebuild_stats', lambda: db.rebuild_stats()),
+        # Last, and only once: it wipes the seeded history
+        case('reset_all_data', lambda: db.reset_all_data(), repeat=1),
+    ]
+
+# =============================================================================
+# TIMING
+# =============================================================================
+
+
+def time_case(db, call, setup, repeat, budget):
+    """Run ``call`` up to ``repeat`` times (at least once) within ``budget`` seconds"""
+    samples = []
+    spent = time.perf_counter()
+    while len(samples) < repeat:
+        if setup is not None:
+            setup()
+        else:
+            db.cache.clear()
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+        if time.perf_counter() - spent > budget:
+            break
+    return {
+        'n': len(samples),
+        'min_ms': min(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'max_ms': max(samples) * 1000,
+    }
+
+
+def run_scale(rows, args, tmp):
+    db = Database(os.path.join(tmp, f"suite-{rows}.db"))
+    try:
+        start = time.perf_counter()
+        seed(db, rows, args.mocks)
+        results = {'seed': {'n': 1, 'median_ms': (time.perf_counter() - start) * 1000}}
+        for c in read_cases(db, args) + write_cases(db, args):
+            name = c['name']
+            if c['max_rows'] is not None and rows > c['max_rows']:
+                results[name] = {'skipped': f"over --export-max-rows ({c['max_rows']})"}
+            else:
+                results[name] = time_case(db, c['call'], c['setup'], c['repeat'] or args.repeat, args.budget)
+            print(f"{rows:>9} {name:<40} {format_result(results[name])}", flush=True)
+        return results
+    finally:
+        db.close()
+
+
+def format_result(result) -> str:
+    if 'skipped' in result:
+        return f"skipped: {result['skipped']}"
+    return f"{result['median_ms']:>10.2f}ms  (n={result['n']})"
+
+
+def untimed_methods(case_names) -> list:
+    public = {name for name, member in inspect.getmembers(Database)
+              if not name.startswith('_') and callable(member)}
+    timed = {name.split('(')[0].split(' ')[0] for name in case_names}
+    return sorted(public - timed - UNTIMED_METHODS)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline_path, threshold, min_delta_ms) -> int:
+    """Print cases slower than ``threshold`` times the baseline median; returns the count
+    
+    Differences under ``min_delta_ms`` are timer noise on sub-millisecond
+    cases and are ignored.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)['scales']
+    regressions = 0
+    for scale, cases in results.items():
+        for name, result in cases.items():
+            before = baseline.get(scale, {}).get(name, {})
+            if 'median_ms' not in result or 'median_ms' not in before:
+                continue
+            ratio = result['median_ms'] / max(before['median_ms'], 1e-6)
+            if ratio > threshold and result['median_ms'] - before['median_ms'] > min_delta_ms:
+                regressions += 1
+                print(f"SLOWER: {name} at {scale} rows: {before['median_ms']:.2f}ms -> "
+                      f"{result['median_ms']:.2f}ms ({ratio:.2f}x)")
+    print(f"{regressions} regression(s) against {baseline_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Database methods and HTML builders")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 1000, 100_000, 1_000_000],
+                        help="practice rows to seed, one database per scale")
+    parser.add_argument("--mocks", type=int, default=300, help="mock tests seeded at every scale")
+    parser.add_argument("--repeat", type=int, default=5, help="maximum runs per case")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds after which a case stops repeating")
+    parser.add_argument("--export-max-rows", type=int, default=100_000,
+                        help="skip whole-table exports and renders above this many rows")
+    parser.add_argument("--output", help="JSON results file (default benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported by --compare")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.scales:
+            results[str(rows)] = run_scale(rows, args, tmp)
+    
+    case_names = next(iter(results.values()), {})
+    for name in untimed_methods(case_names):
+        print(f"NOT TIMED: Database.{name} has no benchmark case")
+    
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({'environment': environment(), 'mocks': args.mocks, 'scales': results}, f, indent=2)
+    print(f"Wrote {output}")
+    
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold, args.min_delta_ms) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
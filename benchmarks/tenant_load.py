@@ -0,0 +1,114 @@
+# tenant_load.py - page latency from 1 to 500 concurrent profiles
+#
+# Each simulated user fetches their own profile database from a TenantManager
+# with get(), as App.py does at the start of every run, fragment and callback
+# (no lease), runs the queries of a Practice page render (occasionally logging
+# a session), then thinks for a while. More users than --max-open forces LRU
+# eviction of databases idle for over --idle-grace seconds, and reopening,
+# which is part of what gets measured. Page runs that hit a database closed
+# under them are counted as errors. Run from the repo root:
+#
+#     python -m benchmarks.tenant_load --users 1 10 100 500 --duration 10
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date
+
+from benchmarks.stress_sessions import percentile
+from catplanner import TenantManager
+from catplanner.tenants import DEFAULT_IDLE_GRACE
+
+
+def page_run(db, rng, write_ratio):
+    """The reads (and sometimes the write) behind one page render"""
+    db.get_dashboard_stats()
+    db.get_syllabus(rng.choice(["VARC", "DILR", "QA"]))
+    db.get_practice_tracker(limit=25)
+    if rng.random() < write_ratio:
+        questions = rng.randint(5, 30)
+        db.add_practice_session(str(date.today()), "QA", "Arithmetic", questions, rng.randint(0, questions))
+
+
+def duration_left(deadline) -> float:
+    return max(0.0, deadline - time.perf_counter())
+
+
+def run_user(manager, profile, deadline, think, write_ratio, samples, errors, lock):
+    rng = random.Random(profile)
+    latencies = []
+    failed = 0
+    # Stagger the first request so users don't arrive in lockstep
+    time.sleep(rng.uniform(0, min(think, duration_left(deadline))))
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            page_run(manager.get(profile), rng, write_ratio)
+            latencies.append(time.perf_counter() - start)
+        except RuntimeError:
+            # Evicted and closed mid-run: only possible with a short idle grace
+            failed += 1
+        time.sleep(min(rng.expovariate(1 / think), duration_left(deadline)))
+    with lock:
+        samples.extend(latencies)
+        errors.append(failed)
+
+
+def run(users, duration, think, write_ratio, max_open, idle_grace):
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = TenantManager(profiles_dir=tmp, max_open=max_open, idle_grace=idle_grace, pool_size=2)
+        profiles = [f"user{i:03d}" for i in range(users)]
+        # Create the files up front so the run measures steady state, not first-time seeding
+        for profile in profiles:
+            manager.get(profile)
+        
+        samples = []
+        errors = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=run_user,
+                             args=(manager, p, deadline, think, write_ratio, samples, errors, lock))
+            for p in profiles
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        status = manager.status()
+        manager.close()
+    
+    return {
+        'users': users,
+        'pages_per_s': len(samples) / duration,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'open': status['open'],
+        'evicted': status['evicted'],
+        'errors': sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of per-profile databases under concurrent users")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=10.0, help="mean seconds between a user's page runs")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--max-open", type=int, default=64, help="TenantManager bound on open databases")
+    parser.add_argument("--idle-grace", type=float, default=DEFAULT_IDLE_GRACE,
+                        help="seconds a database must sit unused before it can be evicted")
+    args = parser.parse_args()
+    
+    print(f"{'users':>6} {'pages/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'open':>5} {'evicted':>8} {'errors':>7}")
+    for users in args.users:
+        r = run(users, args.duration, args.think, args.write_ratio, args.max_open, args.idle_grace)
+        print(f"{r['users']:>6} {r['pages_per_s']:>8.1f} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms "
+              f"{r['p99_ms']:>6.1f}ms {r['open']:>5} {r['evicted']:>8} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""CAT Planner data layer"""
+from .database import DB_PATH, Database
+from .storage import ConnectionPool
+from .tenants import DEFAULT_PROFILE, TenantManager
+
+__all__ = ['DB_PATH', 'Database', 'ConnectionPool', 'DEFAULT_PROFILE', 'TenantManager']
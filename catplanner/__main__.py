@@ -0,0 +1,6 @@
+# __main__.py - ``python -m catplanner``
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,345 @@
+# analytics.py - dashboard and section statistics for CAT Planner
+#
+# The stats are plain sqlite3 queries returning dicts and lists, so they can
+# be read (e.g. by the command line) without loading pandas; only the trend
+# windows build DataFrames.
+from datetime import date, timedelta
+
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# =============================================================================
+# STATS SUMMARY
+# =============================================================================
+
+# Full recount of the aggregates kept in stats_summary by triggers
+STATS_SUMMARY_QUERY = '''
+    SELECT 'syllabus:' || section AS scope, COUNT(*) AS row_count, COALESCE(SUM(studied), 0) AS flag_sum,
+           COALESCE(SUM(confidence), 0) AS value_sum, 0 AS questions_sum, 0 AS correct_sum
+    FROM syllabus GROUP BY section
+    UNION ALL
+    SELECT 'study_plan', COUNT(*), COALESCE(SUM(completed), 0), 0, 0, 0 FROM study_plan
+    UNION ALL
+    SELECT 'practice_tracker', COUNT(*), COALESCE(SUM(reviewed), 0), COALESCE(SUM(accuracy), 0),
+           COALESCE(SUM(questions), 0), COALESCE(SUM(correct), 0)
+    FROM practice_tracker
+    UNION ALL
+    SELECT 'mock_tests', COUNT(*), 0, COALESCE(SUM(overall_percentile), 0), 0, 0 FROM mock_tests
+'''
+
+SUMMARY_COLUMNS = ('row_count', 'flag_sum', 'value_sum', 'questions_sum', 'correct_sum')
+
+# Practice rollups kept by triggers: table -> grouping column -> expression
+PRACTICE_ROLLUPS = {
+    'practice_daily': {'day': "substr(date, 1, 10)", 'section': "section", 'topic': "topic"},
+    'practice_topics': {'section': "section", 'topic': "topic"},
+}
+
+ROLLUP_COLUMNS = ('sessions', 'questions', 'correct', 'reviewed')
+
+
+def rollup_query(table: str) -> str:
+    """Full recount of a practice rollup from practice_tracker"""
+    keys = PRACTICE_ROLLUPS[table]
+    groups = ", ".join(keys.values())
+    selected = ", ".join(f"{expr} AS {name}" for name, expr in keys.items())
+    return f'''
+        SELECT {selected}, COUNT(*) AS sessions,
+               COALESCE(SUM(questions), 0) AS questions, COALESCE(SUM(correct), 0) AS correct,
+               COALESCE(SUM(reviewed), 0) AS reviewed
+        FROM practice_tracker GROUP BY {groups}
+    '''
+
+
+def weighted_accuracy(correct, questions) -> float:
+    """Accuracy (%) over all questions, so long sessions count for more"""
+    return correct / questions * 100 if questions else 0
+
+
+def rebuild_stats(conn):
+    """Recompute stats_summary and the practice rollups from the base tables (caller commits)"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM stats_summary")
+    cursor.execute(f'''
+        INSERT INTO stats_summary (scope, row_count, flag_sum, value_sum, questions_sum, correct_sum)
+        {STATS_SUMMARY_QUERY}
+    ''')
+    for table, keys in PRACTICE_ROLLUPS.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table} ({', '.join(keys)}, {', '.join(ROLLUP_COLUMNS)}) {rollup_query(table)}")
+
+
+def clear_tables(conn, tables):
+    """Empty ``tables`` without firing their per-row triggers (caller commits)
+    
+    The triggers are dropped for the DELETEs, which lets SQLite truncate
+    instead of visiting every row, recreated from their stored SQL, and
+    stats_summary and the practice rollups recounted. Rollups the triggers
+    feed outside those (daily_goals, review_schedule) are the caller's.
+    """
+    cursor = conn.cursor()
+    marks = ', '.join('?' * len(tables))
+    triggers = cursor.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({marks})", tuple(tables)
+    ).fetchall()
+    for name, _ in triggers:
+        cursor.execute(f"DROP TRIGGER {name}")
+    for table in tables:
+        cursor.execute(f"DELETE FROM {table}")
+    for _, sql in triggers:
+        cursor.execute(sql)
+    rebuild_stats(conn)
+
+
+def stats_mismatches(conn) -> list:
+    """Compare stats_summary and the practice rollups against a full recount; returns mismatched scopes"""
+    cursor = conn.cursor()
+    cursor.execute(STATS_SUMMARY_QUERY)
+    expected = {row['scope']: dict(row) for row in cursor.fetchall()}
+    cursor.execute("SELECT * FROM stats_summary")
+    actual = {row['scope']: dict(row) for row in cursor.fetchall()}
+    
+    mismatches = []
+    for scope in sorted(set(expected) | set(actual)):
+        want = expected.get(scope, {'scope': scope, **dict.fromkeys(SUMMARY_COLUMNS, 0)})
+        got = actual.get(scope)
+        if got is None:
+            if want['row_count']:
+                mismatches.append({'scope': scope, 'expected': want, 'actual': None})
+            continue
+        if any(abs((got[k] or 0) - (want[k] or 0)) > 1e-6 * max(1, abs(want[k] or 0))
+               for k in SUMMARY_COLUMNS):
+            mismatches.append({'scope': scope, 'expected': want, 'actual': got})
+    
+    for table, keys in PRACTICE_ROLLUPS.items():
+        def by_scope(rows):
+            return {f"{table}:" + "/".join(str(r[k]) for k in keys): dict(r) for r in rows}
+        
+        cursor.execute(rollup_query(table))
+        expected = by_scope(cursor.fetchall())
+        cursor.execute(f"SELECT * FROM {table} WHERE sessions != 0")
+        actual = by_scope(cursor.fetchall())
+        for scope in sorted(set(expected) | set(actual)):
+            want, got = expected.get(scope), actual.get(scope)
+            if want is None or got is None or any(want[k] != got[k] for k in ROLLUP_COLUMNS):
+                mismatches.append({'scope': scope, 'expected': want, 'actual': got})
+    return mismatches
+
+# =============================================================================
+# DASHBOARD
+# =============================================================================
+
+
+def dashboard_stats(conn) -> dict:
+    """Dashboard statistics from the trigger-maintained stats_summary"""
+    cursor = conn.cursor()
+    
+    stats = {}
+    
+    cursor.execute("SELECT * FROM stats_summary WHERE row_count > 0")
+    summary = {row['scope']: row for row in cursor.fetchall()}
+    empty = dict.fromkeys(SUMMARY_COLUMNS, 0)
+    
+    # Syllabus and section-wise stats
+    stats['section_stats'] = {}
+    for scope in sorted(summary):
+        if scope.startswith('syllabus:'):
+            row = summary[scope]
+            section = scope.split(':', 1)[1]
+            stats['section_stats'][section] = {
+                'section': section,
+                'total': row['row_count'],
+                'studied': row['flag_sum'],
+                'avg_confidence': row['value_sum'] / row['row_count'],
+            }
+    stats['total_topics'] = sum(s['total'] for s in stats['section_stats'].values())
+    stats['studied_topics'] = sum(s['studied'] for s in stats['section_stats'].values())
+    
+    # Study plan stats
+    row = summary.get('study_plan', empty)
+    stats['total_weeks'] = row['row_count']
+    stats['completed_weeks'] = row['flag_sum']
+    
+    # Practice tracker stats
+    row = summary.get('practice_tracker', empty)
+    stats['practice_sessions'] = row['row_count']
+    stats['total_questions'] = row['questions_sum']
+    stats['total_correct'] = row['correct_sum']
+    stats['avg_accuracy'] = weighted_accuracy(row['correct_sum'], row['questions_sum'])
+    stats['avg_session_accuracy'] = row['value_sum'] / row['row_count'] if row['row_count'] else 0
+    stats['reviewed_sessions'] = row['flag_sum']
+    
+    # Per-section practice (one row per topic in practice_topics)
+    cursor.execute('''
+        SELECT section, SUM(sessions) AS sessions, SUM(questions) AS questions,
+               SUM(correct) AS correct, SUM(reviewed) AS reviewed
+        FROM practice_topics GROUP BY section
+    ''')
+    stats['practice_by_section'] = {
+        row['section']: {**dict(row), 'accuracy': weighted_accuracy(row['correct'], row['questions'])}
+        for row in cursor.fetchall()
+    }
+    
+    # Mock test stats (MAX is an index seek on idx_mock_tests_percentile)
+    row = summary.get('mock_tests', empty)
+    stats['total_mocks'] = row['row_count']
+    stats['avg_percentile'] = row['value_sum'] / row['row_count'] if row['row_count'] else 0
+    cursor.execute("SELECT MAX(overall_percentile) FROM mock_tests")
+    stats['max_percentile'] = cursor.fetchone()[0] or 0
+    
+    # Low confidence topics
+    cursor.execute('''
+        SELECT section, main_topic, confidence FROM syllabus
+        ORDER BY confidence ASC LIMIT 5
+    ''')
+    stats['weak_topics'] = [dict(row) for row in cursor.fetchall()]
+    
+    # Recent practice
+    cursor.execute('''
+        SELECT date, section, topic, accuracy FROM practice_tracker
+        ORDER BY date DESC, id DESC LIMIT 5
+    ''')
+    stats['recent_practice'] = [dict(row) for row in cursor.fetchall()]
+    
+    return stats
+
+
+def section_analysis(conn, section: str) -> dict:
+    """Topic confidence and practice totals for one section"""
+    cursor = conn.cursor()
+    
+    analysis = {}
+    
+    # Topic-wise stats
+    cursor.execute('''
+        SELECT main_topic, confidence, studied, priority FROM syllabus WHERE section = ?
+    ''', (section,))
+    analysis['topics'] = [dict(row) for row in cursor.fetchall()]
+    
+    # Practice stats for section, question-weighted from practice_topics
+    cursor.execute('''
+        SELECT topic, sessions, questions AS total_qs, correct, reviewed
+        FROM practice_topics WHERE section = ?
+    ''', (section,))
+    analysis['practice_by_topic'] = [
+        {**dict(row), 'avg_accuracy': weighted_accuracy(row['correct'], row['total_qs'])}
+        for row in cursor.fetchall()
+    ]
+    
+    return analysis
+
+# =============================================================================
+# PRACTICE TRENDS
+# =============================================================================
+
+ROLLING_WINDOWS = (7, 30)
+DEFAULT_TREND_DAYS = 90
+
+
+def _window_sums(values, window: int):
+    """Trailing ``window``-row sums down axis 0 (via one cumulative sum)"""
+    totals = np.cumsum(values, axis=0)
+    shifted = np.zeros_like(totals)
+    shifted[window:] = totals[:-window]
+    return totals - shifted
+
+
+def _accuracy(correct, questions):
+    """Question-weighted accuracy (%), NaN where nothing was attempted"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(questions > 0, correct / questions * 100, np.nan)
+
+
+def streak_runs(days, today: date) -> dict:
+    """Current and longest run of consecutive days in the sorted ISO ``days``"""
+    if not len(days):
+        return {'current': 0, 'longest': 0, 'last_day': None}
+    ordinals = np.array([date.fromisoformat(d).toordinal() for d in days])
+    # A new run starts wherever the gap to the previous day isn't exactly one
+    starts = np.flatnonzero(np.diff(ordinals, prepend=ordinals[0] - 2) != 1)
+    lengths = np.diff(np.append(starts, len(ordinals)))
+    # The current streak survives until a full day is missed
+    current = int(lengths[-1]) if today.toordinal() - ordinals[-1] <= 1 else 0
+    return {'current': current, 'longest': int(lengths.max()), 'last_day': days[-1]}
+
+
+def practice_trends(conn, days: int = DEFAULT_TREND_DAYS, today: date = None) -> dict:
+    """Rolling accuracy, question volume and streaks from practice_daily
+    
+    ``sections`` has one row per (day, section) over the last ``days`` days
+    with that day's totals and the trailing 7/30-day questions and
+    question-weighted accuracy; ``topics`` has the same windows ending today
+    per (section, topic) practised in the longest window. Both are summed in
+    SQL, so work is bounded by days x sections plus the topic rows of the
+    last month, not by sessions.
+    """
+    today = today or date.today()
+    longest = max(ROLLING_WINDOWS)
+    first = today - timedelta(days=days + longest - 2)
+    # Plain tuples straight into arrays
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    
+    # Dense (day x section) grid so every window covers calendar days; the
+    # GROUP BY follows practice_daily's (day, section, topic) key
+    daily = cursor.execute('''
+        SELECT day, section, SUM(sessions), SUM(questions), SUM(correct) FROM practice_daily
+        WHERE day >= ? AND day <= ? AND sessions > 0
+        GROUP BY day, section
+    ''', (first.isoformat(), today.isoformat())).fetchall()
+    calendar = pd.date_range(first, today, freq='D').strftime('%Y-%m-%d')
+    sections = sorted({row[1] for row in daily})
+    if sections:
+        day_index = {day: i for i, day in enumerate(calendar)}
+        section_index = {section: i for i, section in enumerate(sections)}
+        grid = np.zeros((3, len(calendar), len(sections)), dtype='int64')
+        for day, section, *totals in daily:
+            grid[:, day_index[day], section_index[section]] = totals
+        sessions, questions, correct = grid
+        keep = slice(len(calendar) - days, None)
+        columns = {'sessions': sessions, 'questions': questions, 'correct': correct}
+        for window in ROLLING_WINDOWS:
+            q, c = _window_sums(questions, window), _window_sums(correct, window)
+            columns[f'questions_{window}d'] = q
+            columns[f'accuracy_{window}d'] = _accuracy(c, q)
+        section_trends = pd.DataFrame({name: values[keep].ravel() for name, values in columns.items()})
+        section_trends.insert(0, 'section', np.tile(sections, days))
+        section_trends.insert(0, 'day', np.repeat(calendar[keep], len(sections)))
+    else:
+        section_trends = pd.DataFrame(
+            columns=['day', 'section', 'sessions', 'questions', 'correct'] +
+                    [f'{k}_{w}d' for w in ROLLING_WINDOWS for k in ('questions', 'accuracy')])
+    
+    # Windows ending today per topic: practice_topics drives the join so the
+    # topic index hands over each topic's recent days already grouped
+    starts = [(today - timedelta(days=window - 1)).isoformat() for window in ROLLING_WINDOWS]
+    sums = ', '.join(f'SUM(CASE WHEN d.day >= ? THEN d.{column} ELSE 0 END)'
+                     for _ in ROLLING_WINDOWS for column in ('questions', 'correct'))
+    rows = cursor.execute(f'''
+        SELECT p.section, p.topic, {sums}
+        FROM practice_topics p
+        CROSS JOIN practice_daily d
+            ON d.section = p.section AND d.topic = p.topic AND d.day >= ? AND d.day <= ?
+        WHERE d.sessions > 0
+        GROUP BY p.section, p.topic
+    ''', [start for start in starts for _ in range(2)] + [min(starts), today.isoformat()]).fetchall()
+    topics = pd.DataFrame(rows, columns=['section', 'topic'] + [f'{k}_{w}d' for w in ROLLING_WINDOWS
+                                                                for k in ('questions', 'correct')])
+    for window in ROLLING_WINDOWS:
+        questions = topics[f'questions_{window}d']
+        accuracy = _accuracy(topics.pop(f'correct_{window}d').to_numpy(float), questions.to_numpy(float))
+        topics.insert(topics.columns.get_loc(questions.name) + 1, f'accuracy_{window}d', accuracy)
+    short, long = (f'accuracy_{w}d' for w in ROLLING_WINDOWS)
+    topics['trend'] = topics[short] - topics[long]
+    
+    # Streaks look at the whole history (one distinct-day index scan)
+    practiced = [r[0] for r in conn.execute(
+        "SELECT DISTINCT day FROM practice_daily WHERE sessions > 0 AND day <= ? ORDER BY day",
+        (today.isoformat(),))]
+    streaks = streak_runs(practiced, today)
+    month_start = (today - timedelta(days=29)).isoformat()
+    streaks['active_days_30d'] = sum(1 for d in practiced[-30:] if d >= month_start)
+    
+    return {'sections': section_trends, 'topics': topics, 'streaks': streaks}
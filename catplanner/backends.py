@@ -0,0 +1,129 @@
+# backends.py - SQLAlchemy-managed connection pools for CAT Planner
+import atexit
+import sqlite3
+import threading
+import uuid
+
+from .storage import ConnectionPool, apply_pragmas
+
+# =============================================================================
+# SQLALCHEMY BACKEND
+# =============================================================================
+
+DEFAULT_MAX_OVERFLOW = 4
+DEFAULT_POOL_TIMEOUT = 30.0
+
+# Dialects whose DBAPI connections behave like sqlite3's (the data layer uses
+# sqlite3.Row, PRAGMAs and BEGIN IMMEDIATE directly)
+SUPPORTED_DIALECTS = ('sqlite',)
+
+
+def is_database_url(target: str) -> bool:
+    """True for ``dialect://...`` URLs, False for plain file paths"""
+    return '://' in str(target)
+
+
+def create_pool(target: str, size: int = None, config: dict = None) -> ConnectionPool:
+    """Pool for a file path (built-in pool) or a database URL (SQLAlchemy)"""
+    if is_database_url(target):
+        return SQLAlchemyBackend(target, size=size, config=config)
+    return ConnectionPool(target, size=size, config=config)
+
+
+class SQLAlchemyBackend(ConnectionPool):
+    """ConnectionPool backed by a SQLAlchemy engine and its QueuePool
+    
+    Checkout, overflow, timeouts and pre-ping are handled by SQLAlchemy; the
+    per-thread nesting, busy retries and checkpoints of ConnectionPool are
+    kept, so Database runs unchanged on either. Raw DBAPI connections are
+    handed out because the data layer drives transactions itself.
+    
+    ``sqlite://`` (no path) opens a private in-memory database that lives as
+    long as the backend and is shared by all of its connections.
+    """
+    
+    def __init__(self, url: str, size: int = None, config: dict = None,
+                 max_overflow: int = DEFAULT_MAX_OVERFLOW, pool_timeout: float = DEFAULT_POOL_TIMEOUT):
+        # Imported here: file paths never need SQLAlchemy
+        import sqlalchemy
+        from sqlalchemy.pool import QueuePool
+        
+        url = sqlalchemy.engine.make_url(url)
+        if url.get_backend_name() not in SUPPORTED_DIALECTS:
+            raise ValueError(f"Unsupported database backend: {url.get_backend_name()} "
+                             f"(supported: {', '.join(SUPPORTED_DIALECTS)})")
+        
+        super().__init__(url.render_as_string(hide_password=True), size=size, config=config)
+        self._keeper = None
+        if url.database in (None, '', ':memory:'):
+            # A named shared-cache database survives across pooled connections
+            # for as long as one of them (the keeper) stays open
+            name = f"file:catplanner-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            url = url.set(database=name, query={'uri': 'true'})
+            self._keeper = sqlite3.connect(name, uri=True, check_same_thread=False)
+            self.config = {**self.config, 'journal_mode': 'MEMORY'}
+        
+        self._fairies = {}
+        self._fairy_lock = threading.Lock()
+        self.engine = sqlalchemy.create_engine(
+            url, poolclass=QueuePool, pool_size=self.size, max_overflow=max_overflow,
+            pool_timeout=pool_timeout, pool_pre_ping=True,
+            connect_args={'check_same_thread': False},
+        )
+        sqlalchemy.event.listen(self.engine, 'connect', self._on_connect)
+    
+    def _on_connect(self, conn, record):
+        # Leave transactions to the data layer, as with the built-in pool
+        conn.isolation_level = ''
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, self.config)
+        self.stats['created'] += 1
+    
+    def _checkout(self) -> sqlite3.Connection:
+        """Check a connection out of the engine's QueuePool"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+        fairy = self.engine.raw_connection()
+        conn = fairy.dbapi_connection
+        with self._fairy_lock:
+            self._fairies[id(conn)] = fairy
+        return conn
+    
+    def _checkin(self, conn: sqlite3.Connection):
+        """Hand a connection back to the QueuePool"""
+        with self._fairy_lock:
+            fairy = self._fairies.pop(id(conn), None)
+        if fairy is not None:
+            fairy.close()
+    
+    def configure(self, config: dict):
+        """Switch to new tuning; pooled connections reconnect with it"""
+        if self._keeper is not None:
+            config = {**config, 'journal_mode': 'MEMORY'}
+        with self._lock:
+            self.config = config
+        self.engine.dispose()
+    
+    def status(self) -> dict:
+        """Pool counters for display"""
+        pool = self.engine.pool
+        return {'size': self.size, 'idle': pool.checkedin(), 'overflow': max(pool.overflow(), 0), **self.stats}
+    
+    def close(self):
+        """Checkpoint, dispose of the engine and refuse further checkouts"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        if self.config['journal_mode'] == 'WAL':
+            try:
+                with self.engine.connect() as conn:
+                    conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception:
+                pass
+        self.engine.dispose()
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
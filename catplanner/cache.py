@@ -0,0 +1,153 @@
+# cache.py - read-through cache for Database getters
+import copy
+import functools
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# =============================================================================
+# QUERY CACHE
+# =============================================================================
+
+DEFAULT_CACHE_ENTRIES = 64
+DEFAULT_CACHE_MB = 64
+
+
+def _size_of(value) -> int:
+    """Approximate memory held by a cached value"""
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """LRU cache of query results invalidated by per-table generation counters
+    
+    Each entry remembers the generation of every table it was read from. A
+    write bumps the generation of the tables it touched, which drops the
+    matching entries; an entry whose snapshot no longer matches (a read that
+    raced a write) is treated as a miss.
+    """
+    
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        self.max_entries = max_entries or int(os.environ.get("CATPLANNER_CACHE_ENTRIES", DEFAULT_CACHE_ENTRIES))
+        self.max_bytes = max_bytes or int(os.environ.get("CATPLANNER_CACHE_MB", DEFAULT_CACHE_MB)) * 1024 * 1024
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def generation(self, table: str) -> int:
+        """Current generation of a table"""
+        return self._generations.get(table, 0)
+    
+    def snapshot(self, tables) -> tuple:
+        """Generations of the given tables, taken before a read"""
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in tables)
+    
+    def get(self, key, tables):
+        """Return (True, value) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            current = tuple(self._generations.get(t, 0) for t in tables)
+            if entry is None or entry[0] != current:
+                self.stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return True, entry[1]
+    
+    def put(self, key, tables, snapshot: tuple, value):
+        """Store a value read while the tables were at ``snapshot``"""
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if snapshot != tuple(self._generations.get(t, 0) for t in tables):
+                return
+            self._drop(key)
+            self._entries[key] = (snapshot, value, size, tuple(tables))
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+    
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+    
+    def invalidate(self, *tables):
+        """Bump table generations and drop entries read from them"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [k for k, entry in self._entries.items() if set(entry[3]) & set(tables)]
+            for key in stale:
+                self._drop(key)
+            self.stats['invalidations'] += 1
+    
+    def clear(self):
+        """Drop every entry (generations keep counting)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def status(self) -> dict:
+        """Counters for display"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            }
+
+
+def _copy(value):
+    """Hand out copies so callers can't mutate a cached DataFrame"""
+    if hasattr(value, 'memory_usage'):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+def cached(*tables):
+    """Serve a Database getter from ``self.cache``, keyed by method and arguments"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            hit, value = self.cache.get(key, tables)
+            if hit:
+                return _copy(value)
+            snapshot = self.cache.snapshot(tables)
+            value = method(self, *args, **kwargs)
+            self.cache.put(key, tables, snapshot, value)
+            return _copy(value)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Bump the cache generation of ``tables`` after a Database write
+    
+    Deferred updates queued for the same tables are flushed first, so the
+    write lands on top of them rather than being overwritten later.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            writes = getattr(self, 'writes', None)
+            if writes is not None:
+                writes.flush(tables)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.cache.invalidate(*tables)
+        return wrapper
+    return decorator
@@ -0,0 +1,140 @@
+# cli.py - headless command line for CAT Planner data
+#
+#     python -m catplanner stats
+#     python -m catplanner export --format zip -o backup.zip
+#     python -m catplanner export --format csv --table practice_tracker > practice.csv
+#     python -m catplanner import backup.zip --on-conflict merge
+#
+# Only the data layer is imported: no Streamlit, and pandas/SQLAlchemy load
+# only for the commands that need them.
+import argparse
+import json
+import os
+import sys
+
+from .backends import is_database_url
+from .database import DB_PATH, USER_TABLES, Database
+
+# =============================================================================
+# COMMANDS
+# =============================================================================
+
+
+def cmd_stats(db, args) -> int:
+    stats = db.get_dashboard_stats()
+    if args.json:
+        print(json.dumps(stats, indent=2, default=str))
+        return 0
+    
+    print(f"Topics studied:   {stats['studied_topics']}/{stats['total_topics']}")
+    for section, s in stats['section_stats'].items():
+        print(f"  {section:<6} {s['studied']}/{s['total']} studied, {s['avg_confidence']:.0f}% avg confidence")
+    print(f"Weeks completed:  {stats['completed_weeks']}/{stats['total_weeks']}")
+    print(f"Practice:         {stats['practice_sessions']} sessions, {stats['total_questions']} questions, "
+          f"{stats['avg_accuracy']:.1f}% accuracy")
+    for section, s in stats['practice_by_section'].items():
+        print(f"  {section:<6} {s['sessions']} sessions, {s['questions']} questions, {s['accuracy']:.1f}% accuracy")
+    print(f"Mock tests:       {stats['total_mocks']} taken, {stats['avg_percentile']:.1f} avg / "
+          f"{stats['max_percentile']:.1f} best percentile")
+    return 0
+
+
+def cmd_export(db, args) -> int:
+    from .export import EXPORT_FORMATS, write_bundle, write_table
+    
+    binary = args.format in ('xlsx', 'zip', 'parquet')
+    if args.output in (None, '-') and binary:
+        raise ValueError(f"{args.format} exports need --output")
+    dest = sys.stdout.buffer if args.output in (None, '-') else args.output
+    
+    if args.format == 'xlsx':
+        with open(dest, 'wb') as out:
+            out.write(db.export_to_excel())
+    elif args.format == 'zip':
+        write_bundle(db, dest, tables=args.table or USER_TABLES, fmt=args.bundle_format)
+    elif args.format in EXPORT_FORMATS:
+        if not args.table or len(args.table) != 1:
+            raise ValueError(f"{args.format} exports one table: pass --table")
+        write_table(db, args.table[0], dest, fmt=args.format)
+    
+    if dest is not sys.stdout.buffer:
+        print(f"Wrote {dest}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(db, args) -> int:
+    report = db.import_data(args.file, fmt=args.format, table=args.table,
+                            on_conflict=args.on_conflict, strict=args.strict)
+    rejected = 0
+    for table, result in report.items():
+        print(f"{table}: {result['inserted']} added, {result['updated']} updated, "
+              f"{result['skipped']} skipped, {result['rejected']} rejected")
+        for row, message in result['errors']:
+            print(f"  row {row}: {message}")
+        rejected += result['rejected']
+    return 1 if rejected else 0
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="catplanner", description="CAT Planner data from the command line")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--db", help=f"database file or URL (default {DB_PATH})")
+    target.add_argument("--profile", help="use a profile's database instead")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    stats = commands.add_parser("stats", help="print dashboard statistics")
+    stats.add_argument("--json", action="store_true", help="print the raw statistics as JSON")
+    stats.set_defaults(func=cmd_stats, creates=False)
+    
+    export = commands.add_parser("export", help="export tables")
+    export.add_argument("--format", choices=["csv", "jsonl", "parquet", "xlsx", "zip"], default="zip")
+    export.add_argument("--table", nargs="+", choices=USER_TABLES,
+                        help="table to export (zip: tables to bundle, default all)")
+    export.add_argument("--bundle-format", choices=["csv", "jsonl", "parquet"], default="csv",
+                        help="member format inside a zip")
+    export.add_argument("-o", "--output", help="output file ('-' or omitted: stdout for csv/jsonl)")
+    export.set_defaults(func=cmd_export, creates=False)
+    
+    imp = commands.add_parser("import", help="import an Excel/CSV/JSON/ZIP backup")
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=["xlsx", "csv", "json", "zip"], help="default: from the extension")
+    imp.add_argument("--table", choices=USER_TABLES, help="target of a single-table CSV or JSON file")
+    imp.add_argument("--on-conflict", choices=["skip", "replace", "merge"], default="skip")
+    imp.add_argument("--strict", action="store_true", help="import nothing if any row is invalid")
+    imp.set_defaults(func=cmd_import, creates=True)
+    return parser
+
+
+def resolve_target(args) -> str:
+    """Database path or URL named by --db/--profile"""
+    if args.profile:
+        from .tenants import TenantManager
+        return TenantManager().path_for(args.profile)
+    return args.db or DB_PATH
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        target = resolve_target(args)
+        # Reading commands shouldn't quietly create (and seed) a new file
+        if not is_database_url(target):
+            if not args.creates and not os.path.exists(target):
+                raise ValueError(f"No database at {target}")
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        db = Database(target)
+        try:
+            return args.func(db, args)
+        finally:
+            db.close()
+    except BrokenPipeError:
+        # Output piped into e.g. `head`; silence the flush at exit too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, OSError) as e:
+        print(f"catplanner: error: {e}", file=sys.stderr)
+        return 2
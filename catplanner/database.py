@@ -0,0 +1,826 @@
+# database.py - CAT Planner persistent storage
+from __future__ import annotations
+
+import os
+import re
+from io import BytesIO
+from datetime import date, datetime, timedelta
+
+from . import analytics, goals, pace, projection, review, scheduler
+from .backends import create_pool
+from .cache import QueryCache, cached, invalidates
+from .durations import parse_duration
+from .lazy import LazyModule
+from .metrics import instrument_methods
+from .migrations import get_schema_version, migrate
+from .schema import bind_update
+from .storage import load_storage_config, retry_on_busy, SETTINGS_PREFIX
+from .writequeue import WriteBehindQueue
+
+# DataFrames are only built by the getters; importing the data layer stays cheap
+pd = LazyModule("pandas")
+
+# =============================================================================
+# DATABASE CONFIGURATION
+# =============================================================================
+
+# A file path, or a SQLAlchemy URL such as "sqlite:///cat_planner.db"
+DB_PATH = os.environ.get("CATPLANNER_DATABASE_URL", "cat_planner.db")
+
+# Tables small enough to scan whole (reference data, mocks, settings and
+# per-topic rollups, a few hundred rows at most). Any other scan, and a temp
+# B-tree sort on any table, is a query plan problem.
+FULL_READ_TABLES = ('syllabus', 'difficulty', 'study_plan', 'mock_tests', 'settings', 'stats_summary',
+                    'practice_topics')
+
+# A table after FROM/JOIN and its alias, if any
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+(\w+)"
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|ORDER|GROUP|LIMIT|CROSS|LEFT|INNER|UNION)\b)(\w+))?",
+    re.IGNORECASE
+)
+
+
+def plan_problems(sql: str, plan: list, full_read_tables=FULL_READ_TABLES) -> list:
+    """Plan lines of one statement that scan a table or sort in a temp B-tree
+    
+    A SCAN passes only when it reads a covering index, stops after a LIMIT
+    with no WHERE clause to skip rows (any ORDER BY has to come from an
+    index, or a temp B-tree shows up), or reads one of ``full_read_tables``.
+    SEARCH lines always pass.
+    """
+    tables = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        tables[table] = tables[alias or table] = table
+    upper = f" {sql.upper()} "
+    bounded = " LIMIT " in upper and " WHERE " not in upper
+    problems = []
+    for detail in plan:
+        scan = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        if detail.startswith("USE TEMP B-TREE"):
+            problems.append(detail)
+        elif scan and scan.group(1) in tables:
+            if bounded or "COVERING INDEX" in detail:
+                continue
+            if tables[scan.group(1)] not in full_read_tables:
+                problems.append(detail)
+    return problems
+
+# Tables holding user data
+USER_TABLES = ('syllabus', 'difficulty', 'study_plan', 'practice_tracker', 'mock_tests', 'daily_goals')
+
+@instrument_methods('get_connection', 'close')
+class Database:
+    """Centralized Database Manager for CAT Planner"""
+    
+    def __init__(self, db_path: str = DB_PATH, pool_size: int = None, storage_config: dict = None):
+        self.db_path = db_path
+        self.storage_overrides = storage_config or {}
+        self.cache = QueryCache()
+        self.pool = create_pool(db_path, size=pool_size,
+                                config=load_storage_config(overrides=self.storage_overrides))
+        self.init_database()
+        self.reload_storage_config()
+        self.writes = WriteBehindQueue(self)
+        self._exports = None
+    
+    def get_connection(self):
+        """Check out a pooled connection (use as a context manager)"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Write pending updates and close all pooled connections"""
+        self.writes.close()
+        self.pool.close()
+    
+    @property
+    def exports(self):
+        """Background export builder shared by every session on this database"""
+        if self._exports is None:
+            from .export import ExportManager
+            self._exports = ExportManager(self)
+        return self._exports
+    
+    def reload_storage_config(self):
+        """Re-read storage tuning from the settings table and environment"""
+        config = load_storage_config(self.get_settings(SETTINGS_PREFIX), self.storage_overrides)
+        self.pool.configure(config)
+        return config
+    
+    def init_database(self):
+        """Bring the schema up to date, seeding defaults on first run"""
+        with self.get_connection() as conn:
+            self.applied_migrations = migrate(conn, seed=self._populate_defaults)
+    
+    def schema_version(self) -> int:
+        """Current schema version"""
+        with self.get_connection() as conn:
+            return get_schema_version(conn)
+    
+    # =========================
+    # DEFERRED WRITES
+    # =========================
+    
+    def queue_update(self, table: str, id: int, **kwargs):
+        """Queue a row update to be written with the next batch"""
+        self.writes.enqueue(table, id, **kwargs)
+    
+    def flush_writes(self) -> int:
+        """Write all queued updates now; returns the number of rows written"""
+        return self.writes.flush()
+    
+    def pending_writes(self) -> int:
+        """Number of rows with queued, unsaved updates"""
+        return self.writes.pending()
+    
+    def with_pending(self, table: str, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with queued updates to ``table`` applied"""
+        return self.writes.overlay(table, df)
+    
+    def _populate_defaults(self, cursor):
+        """Populate default data into empty tables"""
+        cursor.execute("SELECT COUNT(*) FROM syllabus")
+        if cursor.fetchone()[0] == 0:
+            self._populate_default_syllabus(cursor)
+        
+        cursor.execute("SELECT COUNT(*) FROM difficulty")
+        if cursor.fetchone()[0] == 0:
+            self._populate_default_difficulty(cursor)
+        
+        cursor.execute("SELECT COUNT(*) FROM study_plan")
+        if cursor.fetchone()[0] == 0:
+            self._populate_default_plan(cursor)
+    
+    def _populate_default_syllabus(self, cursor):
+        """Populate default syllabus data"""
+        varc = [
+            ("VARC", "Reading Comprehension", "Economy, Psychology, Philosophy, Technology, History, Abstract RCs", "Inference, Main idea, Tone, Strengthen/Weaken", 70, "High"),
+            ("VARC", "Para Jumbles", "Mandatory pairs, Pronoun linkage, Chronological order", "4–5 sentence PJs", 60, "Medium"),
+            ("VARC", "Odd One Out", "Theme mismatch, Link-breaking", "TITA OOO questions", 55, "Medium"),
+            ("VARC", "Para Completion", "Logical continuation, Ending-sentence identification", "Final-sentence prediction", 50, "Low"),
+            ("VARC", "Paragraph Summary", "Remove examples, key idea extraction", "20–40 word summaries", 65, "High")
+        ]
+        
+        dilr = [
+            ("DILR", "Arrangements & Ordering", "Linear, Circular, Ranking, Mixed-variable puzzles", "Mixed puzzle sets", 70, "High"),
+            ("DILR", "Selection & Distribution", "Committee selection, People-object assignment", "Constraint-based distribution", 62, "Medium"),
+            ("DILR", "Games & Tournaments", "Round-robin, Knockouts, Points table reasoning", "6-8 variable tournament sets", 45, "High"),
+            ("DILR", "Set Theory", "2-set, 3-set venn, Max/Min overlaps", "Venn + DI integration", 58, "Medium"),
+            ("DILR", "DI Charts & Tables", "Tables, Bar, Pie, Line, Caselets", "Calculation-heavy DI sets", 68, "Medium"),
+            ("DILR", "Logic Puzzles", "Binary logic, Truth–lie, Conditional logic", "Mixed DILR sets", 52, "High")
+        ]
+        
+        qa = [
+            ("QA", "Number System", "Divisibility, LCM–HCF, Remainders, Cyclicity, Base", "Modular arithmetic, Last-digit tricks", 75, "High"),
+            ("QA", "Arithmetic", "Percentages, Ratio, Averages, TSD, Time & Work, Profit–Loss, Mixtures", "Fast methods, LCM approach", 80, "High"),
+            ("QA", "Algebra", "Linear, Quadratic, Inequalities, Modulus, Logs, Exponents", "Wavy curve, root properties", 65, "Medium"),
+            ("QA", "Geometry & Mensuration", "Triangles, Circles, Coordinate Geo, Mensuration", "Area/length relations, formulae", 55, "Medium"),
+            ("QA", "Modern Math", "Permutation & Combination, Probability, Sets", "Restrictions, conditional prob", 48, "High")
+        ]
+        
+        for item in varc + dilr + qa:
+            cursor.execute('''
+                INSERT INTO syllabus (section, main_topic, sub_topics, practice_focus, confidence, priority)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', item)
+    
+    def _populate_default_difficulty(self, cursor):
+        """Populate default difficulty data"""
+        data = [
+            ("VARC", "RC Abstract", "Hard", 0, 45),
+            ("VARC", "RC Inference", "Moderate", 0, 60),
+            ("VARC", "Para Summary", "Easy", 0, 75),
+            ("VARC", "Para Jumbles", "Moderate", 0, 58),
+            ("DILR", "Games/Tournaments", "Hard", 0, 42),
+            ("DILR", "Arrangements", "Moderate", 0, 65),
+            ("DILR", "Tables/Charts", "Easy", 0, 78),
+            ("DILR", "Venn Diagrams", "Moderate", 0, 55),
+            ("QA", "Arithmetic", "Easy", 0, 82),
+            ("QA", "Algebra", "Moderate", 0, 68),
+            ("QA", "Geometry", "Hard", 0, 50),
+            ("QA", "Number System", "Moderate", 0, 70),
+            ("QA", "P&C/Probability", "Hard", 0, 45),
+        ]
+        
+        for item in data:
+            cursor.execute('''
+                INSERT INTO difficulty (section, topic_category, level, studied, mastery)
+                VALUES (?, ?, ?, ?, ?)
+            ''', item)
+    
+    def _populate_default_plan(self, cursor):
+        """Populate default study plan"""
+        base_date = datetime.now()
+        weeks = [
+            (1, "Week 1", "Percentages + 2 RCs/day + 1 DI Set"),
+            (2, "Week 2", "Ratio, Averages + PJ + DI Tables"),
+            (3, "Week 3", "TSD, Time & Work + Summary + Venn"),
+            (4, "Week 4", "Profit-Loss + Moderate RCs + Arrangements"),
+            (5, "Week 5", "Algebra basics + 3 RCs/day"),
+            (6, "Week 6", "Geometry basics + DI charts"),
+            (7, "Week 7", "Advanced Algebra + Hybrid sets"),
+            (8, "Week 8", "Tournaments + Abstract RC"),
+            (9, "Week 9", "P&C + Functions + Hard DI Sets"),
+            (10, "Week 10", "Full mocks (2/week)"),
+            (11, "Week 11", "Mock analysis + weak topic revision"),
+            (12, "Week 12", "Final mocks + strategy tuning"),
+        ]
+        
+        for week_num, label, target in weeks:
+            start = (base_date + timedelta(days=(week_num - 1) * 7)).strftime("%Y-%m-%d")
+            end = (base_date + timedelta(days=(week_num * 7) - 1)).strftime("%Y-%m-%d")
+            cursor.execute('''
+                INSERT INTO study_plan (week_number, week_label, target, start_date, end_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (week_num, label, target, start, end))
+    
+    # =========================
+    # SYLLABUS OPERATIONS
+    # =========================
+    
+    @cached('syllabus')
+    def get_syllabus(self, section: str = None) -> pd.DataFrame:
+        """Get syllabus data"""
+        with self.get_connection() as conn:
+            if section:
+                df = pd.read_sql_query(
+                    "SELECT * FROM syllabus WHERE section = ? ORDER BY id",
+                    conn, params=(section,)
+                )
+            else:
+                df = pd.read_sql_query("SELECT * FROM syllabus ORDER BY section, id", conn)
+        return df
+    
+    @invalidates('syllabus')
+    @retry_on_busy
+    def update_syllabus(self, id: int, **kwargs):
+        """Update syllabus item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(*bind_update('syllabus', id, kwargs))
+            
+            conn.commit()
+    
+    @invalidates('syllabus')
+    @retry_on_busy
+    def add_syllabus_topic(self, section: str, main_topic: str, sub_topics: str = "", 
+                           practice_focus: str = "", confidence: int = 50, priority: str = "Medium"):
+        """Add new syllabus topic"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO syllabus (section, main_topic, sub_topics, practice_focus, confidence, priority)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (section, main_topic, sub_topics, practice_focus, confidence, priority))
+            conn.commit()
+    
+    @invalidates('syllabus')
+    @retry_on_busy
+    def delete_syllabus_topic(self, id: int):
+        """Delete syllabus topic"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM syllabus WHERE id = ?", (id,))
+            conn.commit()
+    
+    @invalidates('syllabus')
+    @retry_on_busy
+    def mark_syllabus_studied(self, section: str = None, studied: bool = True):
+        """Mark all syllabus items as studied/not studied"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if section:
+                cursor.execute("UPDATE syllabus SET studied = ? WHERE section = ?", (int(studied), section))
+            else:
+                cursor.execute("UPDATE syllabus SET studied = ?", (int(studied),))
+            conn.commit()
+    
+    # =========================
+    # DIFFICULTY OPERATIONS
+    # =========================
+    
+    @cached('difficulty')
+    def get_difficulty(self) -> pd.DataFrame:
+        """Get difficulty data"""
+        with self.get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM difficulty ORDER BY section, id", conn)
+        return df
+    
+    @invalidates('difficulty')
+    @retry_on_busy
+    def update_difficulty(self, id: int, **kwargs):
+        """Update difficulty item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(*bind_update('difficulty', id, kwargs))
+            
+            conn.commit()
+    
+    @invalidates('difficulty')
+    @retry_on_busy
+    def add_difficulty_item(self, section: str, topic_category: str, level: str = "Moderate", mastery: int = 50):
+        """Add difficulty item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO difficulty (section, topic_category, level, mastery)
+                VALUES (?, ?, ?, ?)
+            ''', (section, topic_category, level, mastery))
+            conn.commit()
+    
+    @invalidates('difficulty')
+    @retry_on_busy
+    def delete_difficulty_item(self, id: int):
+        """Delete difficulty item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM difficulty WHERE id = ?", (id,))
+            conn.commit()
+    
+    # =========================
+    # STUDY PLAN OPERATIONS
+    # =========================
+    
+    @cached('study_plan')
+    def get_study_plan(self) -> pd.DataFrame:
+        """Get study plan data"""
+        with self.get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM study_plan ORDER BY week_number", conn)
+        return df
+    
+    @invalidates('study_plan')
+    @retry_on_busy
+    def update_study_plan(self, id: int, **kwargs):
+        """Update study plan item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(*bind_update('study_plan', id, kwargs))
+            
+            conn.commit()
+    
+    @invalidates('study_plan')
+    @retry_on_busy
+    def rebalance_study_plan(self, today: date = None) -> list:
+        """Regenerate the unfinished weeks from current performance, exam date and daily hours"""
+        with self.get_connection() as conn:
+            weeks = scheduler.rebalance(conn, today)
+            conn.commit()
+        return weeks
+    
+    def get_plan_settings(self, today: date = None) -> tuple:
+        """(exam date, daily study hours) the planner uses"""
+        with self.get_connection() as conn:
+            return scheduler.plan_settings(conn, today or date.today())
+    
+    def plan_inputs_version(self) -> tuple:
+        """Changes whenever data the study plan is built from is written"""
+        return tuple(self.cache.generation(table) for table in scheduler.PLAN_INPUT_TABLES)
+    
+    @invalidates('study_plan')
+    @retry_on_busy
+    def toggle_week_completed(self, id: int):
+        """Toggle week completion status"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE study_plan SET completed = NOT completed WHERE id = ?", (id,))
+            conn.commit()
+    
+    # =========================
+    # PRACTICE TRACKER OPERATIONS
+    # =========================
+    
+    @cached('practice_tracker')
+    def get_practice_tracker(self, limit: int = None, before: tuple = None,
+                             section: str = None, topic: str = None) -> pd.DataFrame:
+        """Get practice tracker data, newest first
+        
+        Pass the (date, id) of the last row seen as ``before`` to fetch the
+        next page; each page is an index range scan, whatever the history size.
+        """
+        if topic:
+            return self._practice_by_topic(limit, before, section, topic)
+        clauses, params = [], []
+        if section:
+            clauses.append("section = ?")
+            params.append(section)
+        if before:
+            clauses.append("(date, id) < (?, ?)")
+            params.extend(before)
+        
+        query = "SELECT * FROM practice_tracker"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY date DESC, id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+        return df
+    
+    def _practice_by_topic(self, limit, before, section, topic) -> pd.DataFrame:
+        """get_practice_tracker for a topic search
+        
+        A substring can't use an index, so it is matched against the topics in
+        practice_topics and each match is read as its own index range on
+        (section, topic, date); the newest ``limit`` rows of those are kept.
+        """
+        escaped = topic.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = "SELECT section, topic FROM practice_topics WHERE topic LIKE ? ESCAPE '\\'"
+        params = [f"%{escaped}%"]
+        if section:
+            query += " AND section = ?"
+            params.append(section)
+        page = "SELECT * FROM practice_tracker WHERE section = ? AND topic = ?"
+        if before:
+            page += " AND (date, id) < (?, ?)"
+        page += " ORDER BY date DESC, id DESC"
+        if limit:
+            page += " LIMIT ?"
+        
+        bounds = [*(before or ()), *([int(limit)] if limit else [])]
+        
+        with self.get_connection() as conn:
+            matches = conn.execute(query, params).fetchall()
+            if not matches:
+                return pd.read_sql_query("SELECT * FROM practice_tracker LIMIT 0", conn)
+            frames = [pd.read_sql_query(page, conn, params=[*match, *bounds]) for match in matches]
+        df = pd.concat(frames, ignore_index=True).sort_values(['date', 'id'], ascending=False)
+        return (df.head(int(limit)) if limit else df).reset_index(drop=True)
+    
+    @invalidates('practice_tracker')
+    @retry_on_busy
+    def add_practice_session(self, date: str, section: str, topic: str, questions: int, 
+                             correct: int, time_taken: str = "", notes: str = ""):
+        """Add practice session"""
+        wrong = questions - correct
+        accuracy = (correct / questions * 100) if questions > 0 else 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Before the insert, so the goal triggers count this session once
+            goals.ensure_day(cursor, date)
+            cursor.execute('''
+                INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy,
+                                              time_taken, time_seconds, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (date, section, topic, questions, correct, wrong, accuracy,
+                  time_taken, parse_duration(time_taken), notes))
+            # Practising a topic counts as a review of it
+            review.record_practice(cursor, date, section, topic, accuracy)
+            conn.commit()
+    
+    @invalidates('practice_tracker')
+    @retry_on_busy
+    def update_practice_session(self, id: int, **kwargs):
+        """Update practice session"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Recalculate accuracy if questions or correct changed
+            if 'questions' in kwargs or 'correct' in kwargs:
+                cursor.execute("SELECT questions, correct FROM practice_tracker WHERE id = ?", (id,))
+                row = cursor.fetchone()
+                questions = kwargs.get('questions', row['questions'])
+                correct = kwargs.get('correct', row['correct'])
+                kwargs['wrong'] = questions - correct
+                kwargs['accuracy'] = (correct / questions * 100) if questions > 0 else 0
+            
+            if 'time_taken' in kwargs:
+                kwargs['time_seconds'] = parse_duration(kwargs['time_taken'])
+            if 'date' in kwargs:
+                goals.ensure_day(cursor, kwargs['date'])
+            cursor.execute(*bind_update('practice_tracker', id, kwargs))
+            if 'section' in kwargs or 'topic' in kwargs:
+                review.sync_topics(cursor)
+            
+            conn.commit()
+    
+    @invalidates('practice_tracker')
+    @retry_on_busy
+    def delete_practice_session(self, id: int):
+        """Delete practice session"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM practice_tracker WHERE id = ?", (id,))
+            conn.commit()
+    
+    @invalidates('practice_tracker')
+    @retry_on_busy
+    def toggle_reviewed(self, id: int):
+        """Toggle reviewed status"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE practice_tracker SET reviewed = NOT reviewed WHERE id = ?", (id,))
+            conn.commit()
+    
+    # =========================
+    # DAILY GOALS
+    # =========================
+    
+    def get_goal_targets(self) -> dict:
+        """Active daily goals: goal type -> target"""
+        with self.get_connection() as conn:
+            return goals.goal_targets(conn)
+    
+    @retry_on_busy
+    def set_goal_target(self, goal_type: str, target: int):
+        """Set a daily goal target (0 turns the goal off)"""
+        with self.get_connection() as conn:
+            goals.set_target(conn.cursor(), goal_type, target)
+            conn.commit()
+    
+    def get_goal_progress(self, day: str = None) -> list:
+        """Achieved vs target for each active goal on ``day`` (default today)"""
+        with self.get_connection() as conn:
+            return goals.day_progress(conn, day or date.today().isoformat())
+    
+    def get_goal_history(self, weeks: int = goals.HEATMAP_WEEKS) -> dict:
+        """Daily question totals for the heatmap and goal-completion streaks"""
+        with self.get_connection() as conn:
+            return goals.goal_history(conn, weeks=weeks)
+    
+    # =========================
+    # REVIEW QUEUE
+    # =========================
+    
+    def get_review_queue(self, limit: int = 50, today: date = None) -> pd.DataFrame:
+        """Topics due for review by ``today``, most overdue first"""
+        day = (today or date.today()).isoformat()
+        with self.get_connection() as conn:
+            return pd.read_sql_query(review.REVIEW_QUEUE_QUERY, conn, params=(day, limit))
+    
+    def get_review_counts(self, today: date = None) -> dict:
+        """Number of topics due now and over the next 7 days"""
+        with self.get_connection() as conn:
+            return review.review_counts(conn, today)
+    
+    @invalidates('practice_tracker')
+    @retry_on_busy
+    def mark_topics_reviewed(self, topics, quality: int = None, today: date = None) -> int:
+        """Review several (section, topic) pairs in one transaction
+        
+        Reschedules each topic (graded by ``quality``, or from its last
+        accuracy) and flags its sessions reviewed; returns sessions flagged.
+        """
+        with self.get_connection() as conn:
+            flagged = review.mark_reviewed(conn.cursor(), topics, quality, today)
+            conn.commit()
+        return flagged
+    
+    # =========================
+    # MOCK TEST OPERATIONS
+    # =========================
+    
+    @cached('mock_tests')
+    def get_mock_tests(self) -> pd.DataFrame:
+        """Get mock tests data"""
+        with self.get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM mock_tests ORDER BY date DESC", conn)
+        return df
+    
+    @cached('mock_tests')
+    def get_mock_pace(self) -> pd.DataFrame:
+        """Timed mocks with score per minute and the speed frontier"""
+        with self.get_connection() as conn:
+            return pace.mock_pace(conn)
+    
+    @cached('mock_tests')
+    def get_mock_projection(self) -> dict:
+        """Projected next-mock scores and percentiles with 95% intervals
+        
+        The fit is cached until a mock test is added, edited or deleted.
+        """
+        with self.get_connection() as conn:
+            return projection.mock_projection(conn)
+    
+    @invalidates('mock_tests')
+    @retry_on_busy
+    def add_mock_test(self, date: str, test_name: str, varc_score: float, varc_percentile: float,
+                      dilr_score: float, dilr_percentile: float, qa_score: float, qa_percentile: float,
+                      time_taken: str = "", notes: str = ""):
+        """Add mock test"""
+        total_score = varc_score + dilr_score + qa_score
+        overall_percentile = (varc_percentile + dilr_percentile + qa_percentile) / 3
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO mock_tests (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
+                                       qa_score, qa_percentile, total_score, overall_percentile,
+                                       time_taken, time_seconds, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
+                  qa_score, qa_percentile, total_score, overall_percentile,
+                  time_taken, parse_duration(time_taken), notes))
+            conn.commit()
+    
+    @invalidates('mock_tests')
+    @retry_on_busy
+    def delete_mock_test(self, id: int):
+        """Delete mock test"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM mock_tests WHERE id = ?", (id,))
+            conn.commit()
+    
+    # =========================
+    # ANALYTICS & STATS
+    # =========================
+    
+    def get_dashboard_stats(self) -> dict:
+        """Get dashboard statistics from the trigger-maintained stats_summary"""
+        with self.get_connection() as conn:
+            return analytics.dashboard_stats(conn)
+    
+    @retry_on_busy
+    def rebuild_stats(self):
+        """Recompute stats_summary from the base tables"""
+        with self.get_connection() as conn:
+            analytics.rebuild_stats(conn)
+            conn.commit()
+    
+    def check_stats_consistency(self) -> list:
+        """Compare stats_summary against a full recount; returns mismatched scopes"""
+        with self.get_connection() as conn:
+            return analytics.stats_mismatches(conn)
+    
+    def get_section_analysis(self, section: str) -> dict:
+        """Get detailed section analysis"""
+        with self.get_connection() as conn:
+            return analytics.section_analysis(conn, section)
+    
+    def get_practice_trends(self, days: int = analytics.DEFAULT_TREND_DAYS) -> dict:
+        """Rolling 7/30-day accuracy, question volume and streaks over the last ``days`` days"""
+        with self.get_connection() as conn:
+            return analytics.practice_trends(conn, days)
+    
+    @cached('practice_tracker')
+    def get_practice_pace(self) -> dict:
+        """Questions per minute per section and topic, accuracy by pace band and the speed frontier"""
+        with self.get_connection() as conn:
+            return pace.practice_pace(conn)
+    
+    # =========================
+    # QUERY PLAN CHECKS
+    # =========================
+    
+    def _read_workload(self):
+        """Call every read method the pages use once so its SQL can be traced
+        
+        Unpaged get_practice_tracker() is left out: only backups call it, and
+        they read the whole table by design.
+        """
+        self.get_syllabus()
+        self.get_syllabus("QA")
+        self.get_difficulty()
+        self.get_study_plan()
+        self.get_practice_tracker(limit=20)
+        self.get_practice_tracker(limit=20, before=("9999-12-31", 0))
+        self.get_practice_tracker(limit=20, section="QA", before=("9999-12-31", 0))
+        self.get_practice_tracker(limit=20, topic="Arith")
+        self.get_mock_tests()
+        self.get_mock_projection()
+        self.get_mock_pace()
+        self.get_dashboard_stats()
+        self.get_section_analysis("QA")
+        self.get_practice_trends()
+        self.get_practice_pace()
+        self.get_review_queue()
+        self.get_review_counts()
+        self.get_goal_targets()
+        self.get_goal_progress()
+        self.get_goal_history()
+        self.get_setting("exam_date")
+        self.get_settings(SETTINGS_PREFIX)
+    
+    def explain_query_plans(self) -> list:
+        """Trace the SQL issued by the read methods and return its EXPLAIN QUERY PLAN"""
+        statements = []
+        self.cache.clear()
+        with self.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                self._read_workload()
+            finally:
+                conn.set_trace_callback(None)
+            
+            plans = []
+            for sql in dict.fromkeys(statements):
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                plans.append({'sql': " ".join(sql.split()), 'plan': [row['detail'] for row in rows]})
+        return plans
+    
+    def check_query_plans(self, full_read_tables=FULL_READ_TABLES) -> list:
+        """Return traced queries that scan a table or sort in a temp B-tree (see plan_problems)"""
+        return [{**entry, 'problem': detail}
+                for entry in self.explain_query_plans()
+                for detail in plan_problems(entry['sql'], entry['plan'], full_read_tables)]
+    
+    # =========================
+    # SETTINGS OPERATIONS
+    # =========================
+    
+    def get_setting(self, key: str, default: str = None) -> str:
+        """Get setting value"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
+            row = cursor.fetchone()
+        return row['value'] if row else default
+    
+    def get_settings(self, prefix: str = "") -> dict:
+        """Get all settings whose key starts with prefix"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT key, value FROM settings WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            rows = cursor.fetchall()
+        return {row['key']: row['value'] for row in rows}
+    
+    @retry_on_busy
+    def set_setting(self, key: str, value: str):
+        """Set setting value"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (key, value))
+            conn.commit()
+    
+    # =========================
+    # EXPORT/IMPORT
+    # =========================
+    
+    def export_all_data(self) -> dict:
+        """Export all data as dictionary"""
+        return {
+            'syllabus': self.get_syllabus().to_dict('records'),
+            'difficulty': self.get_difficulty().to_dict('records'),
+            'study_plan': self.get_study_plan().to_dict('records'),
+            'practice_tracker': self.get_practice_tracker().to_dict('records'),
+            'mock_tests': self.get_mock_tests().to_dict('records'),
+        }
+    
+    def export_to_excel(self, progress=None) -> bytes:
+        """Export all data to Excel; ``progress(fraction)`` is called after each sheet"""
+        sheets = [
+            ('Syllabus', self.get_syllabus),
+            ('Difficulty', self.get_difficulty),
+            ('Study Plan', self.get_study_plan),
+            ('Practice Tracker', self.get_practice_tracker),
+            ('Mock Tests', self.get_mock_tests),
+        ]
+        bio = BytesIO()
+        with pd.ExcelWriter(bio, engine='openpyxl') as writer:
+            for done, (sheet_name, getter) in enumerate(sheets, 1):
+                getter().to_excel(writer, sheet_name=sheet_name, index=False)
+                if progress:
+                    progress(done / len(sheets))
+        bio.seek(0)
+        return bio.read()
+    
+    @invalidates(*USER_TABLES)
+    @retry_on_busy
+    def import_data(self, source, fmt: str = None, table: str = None,
+                    on_conflict: str = 'skip', strict: bool = False) -> dict:
+        """Bulk import an Excel/CSV/JSON/ZIP backup in one transaction
+        
+        ``on_conflict`` decides what happens to rows whose id already exists:
+        ``skip`` keeps the stored row, ``replace`` overwrites it and ``merge``
+        writes only the non-blank imported cells. Returns per-table counts.
+        """
+        from .importer import frame_days, import_frames, read_backup
+        frames = source if isinstance(source, dict) else read_backup(source, fmt=fmt, table=table)
+        
+        def after_load(cursor):
+            # Imported topics join the review queue
+            review.sync_topics(cursor)
+            # and imported practice days get their goal rows, counted from the new sessions
+            for day in frame_days(frames.get('practice_tracker')):
+                goals.ensure_day(cursor, day)
+        
+        with self.get_connection() as conn:
+            return import_frames(conn, frames, on_conflict=on_conflict, strict=strict, after_load=after_load)
+    
+    @invalidates(*USER_TABLES)
+    @retry_on_busy
+    def reset_all_data(self):
+        """Reset all data to defaults"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Per-row triggers would unwind every session from the rollups
+            analytics.clear_tables(conn, USER_TABLES + ('review_schedule',))
+            
+            self._populate_default_syllabus(cursor)
+            self._populate_default_difficulty(cursor)
+            self._populate_default_plan(cursor)
+            
+            conn.commit()
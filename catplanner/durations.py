@@ -0,0 +1,84 @@
+# durations.py - free-text durations for CAT Planner
+#
+# time_taken is whatever the user typed ("30 min", "2h 45m", "1:30"). It is
+# parsed once, on write, into an integer time_seconds column so pace can be
+# computed in SQL; the text is kept as entered.
+import re
+from functools import lru_cache
+
+DURATION_TABLES = ('practice_tracker', 'mock_tests')
+
+_UNIT_SECONDS = {'h': 3600, 'm': 60, 's': 1}
+
+# "2h 45m", "1.5 hours", "45 mins", "90s" ...
+_PART = re.compile(r"(\d+(?:\.\d+)?)\s*(h(?:(?:ou)?rs?)?|m(?:in(?:ute)?s?)?|s(?:ec(?:ond)?s?)?)(?![a-z])")
+# "1:30" (h:mm) or "1:30:15" (h:mm:ss)
+_CLOCK = re.compile(r"(\d+):([0-5]\d)(?::([0-5]\d))?")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+# Distinct strings per backfill chunk (three parameters each)
+BACKFILL_CHUNK = 250
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(text) -> int:
+    """Seconds in a free-text duration, None if it has none
+    
+    A bare number is minutes, as the input placeholders suggest.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return round(text * 60) if text == text and text > 0 else None
+    text = str(text).strip().lower()
+    if not text:
+        return None
+    clock = _CLOCK.fullmatch(text)
+    if clock:
+        hours, minutes, seconds = (int(g or 0) for g in clock.groups())
+        return hours * 3600 + minutes * 60 + seconds or None
+    parts = _PART.findall(text)
+    if parts:
+        return round(sum(float(value) * _UNIT_SECONDS[unit[0]] for value, unit in parts)) or None
+    number = _NUMBER.fullmatch(text)
+    if number:
+        return round(float(text) * 60) or None
+    return None
+
+
+def format_duration(seconds) -> str:
+    """Compact label for a number of seconds, e.g. 2h 45m or 30 min"""
+    if not seconds:
+        return ""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+    if minutes:
+        return f"{minutes} min" if not secs else f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+
+def backfill(cursor, table: str) -> int:
+    """Set time_seconds wherever it disagrees with time_taken (caller commits)
+    
+    Each distinct string is parsed once in Python and applied with one
+    CASE UPDATE per chunk, so the table is scanned a handful of times
+    rather than once per string. Returns the number of rows changed.
+    """
+    rows = cursor.execute(f"SELECT DISTINCT time_taken, time_seconds FROM {table}").fetchall()
+    fixes = {text: parse_duration(text) for text, seconds in rows if parse_duration(text) != seconds}
+    fixes.pop(None, None)
+    changed = 0
+    items = list(fixes.items())
+    for i in range(0, len(items), BACKFILL_CHUNK):
+        chunk = items[i:i + BACKFILL_CHUNK]
+        cases = " ".join("WHEN ? THEN ?" for _ in chunk)
+        marks = ", ".join("?" for _ in chunk)
+        cursor.execute(
+            f"UPDATE {table} SET time_seconds = CASE time_taken {cases} END WHERE time_taken IN ({marks})",
+            [value for pair in chunk for value in pair] + [text for text, _ in chunk]
+        )
+        changed += cursor.rowcount
+    return changed
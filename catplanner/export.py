@@ -0,0 +1,289 @@
+# export.py - on-demand export artifacts for CAT Planner
+import contextlib
+import csv
+import io
+import json
+import tempfile
+import threading
+import time
+import zipfile
+
+from .database import USER_TABLES
+
+# =============================================================================
+# STREAMING EXPORT
+# =============================================================================
+
+EXCEL_TABLES = ('syllabus', 'difficulty', 'study_plan', 'practice_tracker', 'mock_tests')
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+EXPORT_CHUNK_ROWS = 5000
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def iter_chunks(db, table: str, chunk_size: int = EXPORT_CHUNK_ROWS, progress=None):
+    """Yield ``(columns, rows)`` for a table, ``chunk_size`` rows at a time
+    
+    Rows come straight off a cursor in primary-key order, so memory stays
+    bounded by one chunk however long the history is. The read runs in a
+    single transaction and sees one consistent snapshot of the table.
+    """
+    if table not in USER_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    with db.get_connection() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if progress else 0
+        cursor = conn.execute(f"SELECT * FROM {table} ORDER BY id")
+        columns = [d[0] for d in cursor.description]
+        done = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            done += len(rows)
+            yield columns, [tuple(row) for row in rows]
+            if progress:
+                progress(done / total)
+        if done == 0:
+            yield columns, []
+
+
+def _csv_chunks(db, table, chunk_size, progress):
+    header = True
+    for columns, rows in iter_chunks(db, table, chunk_size, progress):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if header:
+            writer.writerow(columns)
+            header = False
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _jsonl_chunks(db, table, chunk_size, progress):
+    for columns, rows in iter_chunks(db, table, chunk_size, progress):
+        if rows:
+            yield ''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_schema(pa, db, table):
+    """Arrow schema from the declared SQLite column types"""
+    fields = []
+    with db.get_connection() as conn:
+        for _, name, decl, *_ in conn.execute(f"PRAGMA table_info({table})"):
+            decl = (decl or '').upper()
+            if 'INT' in decl or 'BOOL' in decl:
+                fields.append(pa.field(name, pa.int64()))
+            elif any(t in decl for t in ('REAL', 'FLOA', 'DOUB')):
+                fields.append(pa.field(name, pa.float64()))
+            else:
+                fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _write_parquet(db, table, fileobj, chunk_size, progress):
+    pa, pq = _require_pyarrow()
+    schema = _arrow_schema(pa, db, table)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for _, rows in iter_chunks(db, table, chunk_size, progress):
+            arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*rows), schema)] if rows else \
+                [pa.array([], type=field.type) for field in schema]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+def _parquet_chunks(db, table, chunk_size, progress):
+    # Parquet writes its footer last, so spool it and stream the file back out
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        _write_parquet(db, table, spool, chunk_size, progress)
+        spool.seek(0)
+        while block := spool.read(1024 * 1024):
+            yield block
+
+
+_CHUNK_WRITERS = {'csv': _csv_chunks, 'jsonl': _jsonl_chunks, 'parquet': _parquet_chunks}
+
+
+def stream_table(db, table: str, fmt: str = 'csv', chunk_size: int = EXPORT_CHUNK_ROWS, progress=None):
+    """Generator of encoded ``fmt`` bytes for one table"""
+    if fmt not in _CHUNK_WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return _CHUNK_WRITERS[fmt](db, table, chunk_size, progress)
+
+
+def _open_dest(dest):
+    if hasattr(dest, 'write'):
+        return contextlib.nullcontext(dest)
+    return open(dest, 'wb')
+
+
+def write_table(db, table: str, dest, fmt: str = 'csv', chunk_size: int = EXPORT_CHUNK_ROWS, progress=None):
+    """Write one table to a path or binary file object"""
+    with _open_dest(dest) as out:
+        for block in stream_table(db, table, fmt, chunk_size, progress):
+            out.write(block)
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands back what was written since the last drain"""
+    
+    def __init__(self):
+        self._parts = []
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _bundle(out, db, tables, fmt, chunk_size, progress):
+    """Write a ZIP with one ``<table>.<fmt>`` member per table; yields after every chunk"""
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for done, table in enumerate(tables):
+            with bundle.open(f"{table}.{fmt}", 'w', force_zip64=True) as member:
+                for block in stream_table(db, table, fmt, chunk_size):
+                    member.write(block)
+                    yield
+            if progress:
+                progress((done + 1) / len(tables))
+    yield
+
+
+def stream_bundle(db, tables=EXCEL_TABLES, fmt: str = 'csv', chunk_size: int = EXPORT_CHUNK_ROWS, progress=None):
+    """Generator of ZIP bytes bundling several tables"""
+    sink = _ChunkSink()
+    for _ in _bundle(sink, db, tables, fmt, chunk_size, progress):
+        data = sink.drain()
+        if data:
+            yield data
+
+
+def write_bundle(db, dest, tables=EXCEL_TABLES, fmt: str = 'csv', chunk_size: int = EXPORT_CHUNK_ROWS, progress=None):
+    """Write a ZIP bundle of several tables to a path or binary file object"""
+    with _open_dest(dest) as out:
+        for _ in _bundle(out, db, tables, fmt, chunk_size, progress):
+            pass
+
+
+# =============================================================================
+# EXPORT ARTIFACTS
+# =============================================================================
+
+# CSV download name -> table
+CSV_EXPORTS = {
+    "Syllabus": 'syllabus',
+    "Difficulty": 'difficulty',
+    "Study Plan": 'study_plan',
+    "Practice": 'practice_tracker',
+    "Mock Tests": 'mock_tests',
+}
+
+
+def _build_excel(db, progress):
+    return db.export_to_excel(progress=progress)
+
+
+def _build_bundle(db, progress):
+    bio = io.BytesIO()
+    write_bundle(db, bio, progress=progress)
+    return bio.getvalue()
+
+
+def _csv_builder(table):
+    def build(db, progress):
+        bio = io.BytesIO()
+        write_table(db, table, bio, progress=progress)
+        return bio.getvalue()
+    return build
+
+
+# Artifact name -> (tables it reads, builder(db, progress) -> bytes)
+ARTIFACTS = {
+    'excel': (EXCEL_TABLES, _build_excel),
+    'bundle': (EXCEL_TABLES, _build_bundle),
+    **{f"csv:{name}": ((table,), _csv_builder(table)) for name, table in CSV_EXPORTS.items()},
+}
+
+
+class ExportJob:
+    """One artifact build; ``key`` is the table generations it was started at"""
+    
+    def __init__(self, name: str, key: tuple):
+        self.name = name
+        self.key = key
+        self.progress = 0.0
+        self.data = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.finished = threading.Event()
+    
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+
+class ExportManager:
+    """Builds export artifacts on request in background threads
+    
+    Finished artifacts are kept until a write bumps the generation of one of
+    the tables they were built from, so repeat downloads cost nothing and
+    opening the Settings page builds nothing at all.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, name: str) -> tuple:
+        tables, _ = ARTIFACTS[name]
+        return tuple(self.db.cache.generation(t) for t in tables)
+    
+    def get(self, name: str):
+        """The current job for an artifact, or None if it was never built or is stale"""
+        job = self._jobs.get(name)
+        if job is None or job.key != self._key(name):
+            return None
+        return job
+    
+    def request(self, name: str) -> ExportJob:
+        """Start building an artifact unless a current build exists"""
+        if name not in ARTIFACTS:
+            raise KeyError(f"Unknown export artifact: {name}")
+        with self._lock:
+            job = self.get(name)
+            if job is not None and job.error is None:
+                return job
+            job = ExportJob(name, self._key(name))
+            self._jobs[name] = job
+        threading.Thread(target=self._run, args=(job,), name=f"export-{name}", daemon=True).start()
+        return job
+    
+    def _run(self, job: ExportJob):
+        _, build = ARTIFACTS[job.name]
+        
+        def progress(fraction):
+            job.progress = fraction
+        
+        try:
+            job.data = build(self.db, progress)
+            job.progress = 1.0
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished_at = time.time()
+            job.finished.set()
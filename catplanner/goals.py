@@ -0,0 +1,134 @@
+# goals.py - daily goals for CAT Planner
+#
+# Goal targets live in settings as goal.<type>. Each day with practice gets
+# one daily_goals row per active goal, created (and counted once) by the
+# first session of the day; from then on triggers on practice_tracker add
+# each session's contribution to achieved_value, so progress is never
+# recounted from the practice history.
+from datetime import date, timedelta
+
+from .analytics import streak_runs
+
+GOAL_SETTING_PREFIX = "goal."
+
+GOAL_TYPES = {
+    'questions': "Questions",
+    'sessions': "Practice sessions",
+    'rc_sets': "RC sets",
+    'minutes': "Minutes practised",
+}
+
+# What one practice row contributes to each goal ({row} is NEW, OLD or a
+# table). The goal triggers are built from these, so this is the only copy.
+GOAL_EXPRESSIONS = {
+    'questions': "COALESCE({row}.questions, 0)",
+    'sessions': "1",
+    # RC as a case-sensitive word ("RC Inference", "Abstract RCs"); LIKE
+    # ignores case and would count "Percentages" and "Circles & Triangles"
+    'rc_sets': "((' ' || {row}.topic || ' ') GLOB '*[^A-Za-z]RC[^A-Za-z]*'"
+               " OR (' ' || {row}.topic || ' ') GLOB '*[^A-Za-z]RCs[^A-Za-z]*'"
+               " OR {row}.topic LIKE '%Reading Comprehension%')",
+    # Parsed from time_taken on write; rounded to the nearest minute per session
+    'minutes': "(COALESCE({row}.time_seconds, 0) + 30) / 60",
+}
+# practice_tracker columns the expressions read
+GOAL_WATCHED_COLUMNS = "date, section, topic, questions, time_seconds"
+
+HEATMAP_WEEKS = 26
+
+
+def _next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def goal_targets(conn) -> dict:
+    """Active goals: goal type -> daily target"""
+    rows = conn.execute("SELECT key, value FROM settings WHERE substr(key, 1, ?) = ?",
+                        (len(GOAL_SETTING_PREFIX), GOAL_SETTING_PREFIX)).fetchall()
+    targets = {}
+    for row in rows:
+        goal_type = row['key'][len(GOAL_SETTING_PREFIX):]
+        try:
+            target = int(row['value'])
+        except (TypeError, ValueError):
+            continue
+        if goal_type in GOAL_TYPES and target > 0:
+            targets[goal_type] = target
+    return targets
+
+
+def ensure_day(cursor, day: str):
+    """Create the day's rows for active goals that don't have one yet
+    
+    A new row starts from a recount of that day's sessions (an index range
+    on practice_tracker.date); after that the triggers keep it current.
+    Call before inserting a session so the trigger adds it exactly once.
+    """
+    day = day[:10]
+    targets = goal_targets(cursor.connection)
+    if not targets:
+        return
+    existing = {row[0] for row in cursor.execute("SELECT goal_type FROM daily_goals WHERE date = ?", (day,))}
+    missing = [t for t in targets if t not in existing]
+    if not missing:
+        return
+    sums = ", ".join(f"COALESCE(SUM({GOAL_EXPRESSIONS[t].format(row='practice_tracker')}), 0)" for t in missing)
+    achieved = cursor.execute(
+        f"SELECT {sums} FROM practice_tracker WHERE date >= ? AND date < ?", (day, _next_day(day))
+    ).fetchone()
+    cursor.executemany('''
+        INSERT INTO daily_goals (date, goal_type, target_value, achieved_value, completed)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(day, t, targets[t], value, int(value >= targets[t])) for t, value in zip(missing, achieved)])
+
+
+def set_target(cursor, goal_type: str, target: int, today: date = None):
+    """Set (0 turns off) a daily goal; today's row follows the new target"""
+    if goal_type not in GOAL_TYPES:
+        raise ValueError(f"Unknown goal type: {goal_type}")
+    day = (today or date.today()).isoformat()
+    cursor.execute('''
+        INSERT OR REPLACE INTO settings (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ''', (GOAL_SETTING_PREFIX + goal_type, str(int(target))))
+    if target > 0:
+        cursor.execute('''
+            UPDATE daily_goals SET target_value = ?, completed = achieved_value >= ?
+            WHERE date = ? AND goal_type = ?
+        ''', (target, target, day, goal_type))
+        ensure_day(cursor, day)
+    else:
+        cursor.execute("DELETE FROM daily_goals WHERE date = ? AND goal_type = ?", (day, goal_type))
+
+
+def day_progress(conn, day: str) -> list:
+    """Progress on each active goal for ``day`` (0 achieved before any practice)"""
+    targets = goal_targets(conn)
+    rows = {row['goal_type']: row for row in conn.execute(
+        "SELECT goal_type, target_value, achieved_value FROM daily_goals WHERE date = ?", (day,))}
+    progress = []
+    for goal_type, target in targets.items():
+        achieved = rows[goal_type]['achieved_value'] if goal_type in rows else 0
+        progress.append({'goal_type': goal_type, 'label': GOAL_TYPES[goal_type], 'target': target,
+                         'achieved': achieved, 'completed': achieved >= target})
+    return progress
+
+
+def goal_history(conn, today: date = None, weeks: int = HEATMAP_WEEKS) -> dict:
+    """Per-day question totals for a heatmap and goal-completion streaks
+    
+    Totals come from practice_daily and completion from daily_goals, both
+    read by day-range; nothing rescans practice_tracker.
+    """
+    today = today or date.today()
+    # Heatmap columns are whole weeks starting on Monday
+    first = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    totals = {row['day']: row['questions'] for row in conn.execute('''
+        SELECT day, SUM(questions) AS questions FROM practice_daily
+        WHERE day >= ? AND day <= ? AND sessions > 0 GROUP BY day
+    ''', (first.isoformat(), today.isoformat()))}
+    met = [row['date'] for row in conn.execute('''
+        SELECT date FROM daily_goals WHERE date <= ?
+        GROUP BY date HAVING MIN(completed) = 1 ORDER BY date
+    ''', (today.isoformat(),))]
+    return {'start': first.isoformat(), 'end': today.isoformat(), 'questions': totals,
+            'goal_streak': streak_runs(met, today), 'days_met': len(met)}
@@ -0,0 +1,374 @@
+# importer.py - bulk import of Excel/CSV/JSON backups
+import io
+import json
+import os
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .durations import DURATION_TABLES, parse_duration
+
+# =============================================================================
+# BACKUP READERS
+# =============================================================================
+
+IMPORT_TABLES = ('syllabus', 'difficulty', 'study_plan', 'practice_tracker', 'mock_tests', 'daily_goals')
+CONFLICT_POLICIES = ('skip', 'replace', 'merge')
+IMPORT_FORMATS = ('xlsx', 'csv', 'json', 'zip')
+
+# Sheet names written by Database.export_to_excel and file names of the CSV downloads
+TABLE_ALIASES = {
+    'syllabus': 'syllabus',
+    'difficulty': 'difficulty',
+    'study plan': 'study_plan',
+    'practice tracker': 'practice_tracker',
+    'practice': 'practice_tracker',
+    'mock tests': 'mock_tests',
+    'daily goals': 'daily_goals',
+}
+
+DATE_COLUMNS = ('date', 'start_date', 'end_date')
+MAX_REPORTED_ERRORS = 20
+
+
+def table_for_name(name: str) -> str:
+    """Map a sheet or file name ("Practice Tracker", "practice.csv") to a table"""
+    stem = os.path.splitext(os.path.basename(str(name)))[0].strip().lower().replace('_', ' ')
+    table = TABLE_ALIASES.get(stem)
+    if table is None:
+        raise ValueError(f"Can't tell which table '{name}' holds")
+    return table
+
+
+def _source_name(source) -> str:
+    return getattr(source, 'name', source if isinstance(source, (str, os.PathLike)) else '')
+
+
+def _read_json(source) -> dict:
+    if hasattr(source, 'read'):
+        data = json.load(source)
+    else:
+        with open(source, encoding='utf-8') as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        return {table_for_name(_source_name(source)): pd.DataFrame(data)}
+    return {table_for_name(name): pd.DataFrame(records) for name, records in data.items()}
+
+
+def _read_parquet(source) -> pd.DataFrame:
+    try:
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet import needs pyarrow: pip install pyarrow") from e
+    return pyarrow.parquet.read_table(source).to_pandas()
+
+
+def _read_zip(source) -> dict:
+    frames = {}
+    with zipfile.ZipFile(source) as bundle:
+        for member in bundle.namelist():
+            ext = os.path.splitext(member)[1].lower()
+            with bundle.open(member) as f:
+                if ext == '.csv':
+                    frames[table_for_name(member)] = pd.read_csv(f, dtype=str, keep_default_na=False)
+                elif ext == '.jsonl':
+                    frames[table_for_name(member)] = pd.read_json(f, lines=True, dtype=False)
+                elif ext == '.json':
+                    frames.update(_read_json(io.BytesIO(f.read())))
+                elif ext == '.parquet':
+                    frames[table_for_name(member)] = _read_parquet(io.BytesIO(f.read()))
+    return frames
+
+
+def read_backup(source, fmt: str = None, table: str = None) -> dict:
+    """Read a backup into ``{table: DataFrame}``
+    
+    ``source`` is a path or file object (e.g. a Streamlit upload). The format
+    comes from the file extension unless ``fmt`` is given; ``table`` names the
+    target of a single-table CSV or JSON list whose file name doesn't.
+    """
+    fmt = (fmt or os.path.splitext(_source_name(source))[1].lstrip('.')).lower()
+    if fmt == 'xls':
+        fmt = 'xlsx'
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt or 'unknown'}")
+    
+    if fmt == 'xlsx':
+        sheets = pd.read_excel(source, sheet_name=None, dtype=object)
+        frames = {table_for_name(name): df for name, df in sheets.items()}
+    elif fmt == 'csv':
+        frames = {table or table_for_name(_source_name(source)): pd.read_csv(source, dtype=str, keep_default_na=False)}
+    elif fmt == 'json':
+        frames = _read_json(source)
+        if table is not None and len(frames) == 1:
+            frames = {table: next(iter(frames.values()))}
+    else:
+        frames = _read_zip(source)
+    return frames
+
+
+# =============================================================================
+# VALIDATION & COERCION
+# =============================================================================
+
+def table_columns(conn, table: str) -> dict:
+    """``{column: (affinity, notnull, default)}`` from the live schema"""
+    columns = {}
+    for _, name, decl, notnull, default, _ in conn.execute(f"PRAGMA table_info({table})"):
+        decl = (decl or '').upper()
+        if 'INT' in decl:
+            affinity = 'int'
+        elif any(t in decl for t in ('REAL', 'FLOA', 'DOUB')):
+            affinity = 'float'
+        else:
+            affinity = 'text'
+        columns[name] = (affinity, bool(notnull), default)
+    return columns
+
+
+def _default_value(default, affinity):
+    """Python value for a column's DEFAULT clause"""
+    if default is None:
+        return None
+    if default.upper() == 'CURRENT_TIMESTAMP':
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    value = default.strip("'")
+    if affinity == 'int':
+        return int(value)
+    if affinity == 'float':
+        return float(value)
+    return value
+
+
+def _column_name(name) -> str:
+    """Header as a column name: "Time Taken" -> time_taken"""
+    return str(name).strip().lower().replace(' ', '_')
+
+
+def _blank(series) -> pd.Series:
+    """True where a cell is missing or an empty string"""
+    return series.isna() | series.astype(str).str.strip().eq('')
+
+
+def _derive(table, df):
+    """Fill columns the Database methods compute instead of taking as input"""
+    if table == 'practice_tracker' and {'questions', 'correct'} <= set(df.columns):
+        if 'wrong' not in df.columns:
+            df['wrong'] = np.nan
+        df['wrong'] = df['wrong'].fillna(df['questions'] - df['correct'])
+        if 'accuracy' not in df.columns:
+            df['accuracy'] = np.nan
+        known = df['questions'].notna() & df['correct'].notna()
+        accuracy = (df['correct'] / df['questions'].where(df['questions'] > 0) * 100).fillna(0).where(known)
+        df['accuracy'] = df['accuracy'].fillna(accuracy)
+    elif table == 'mock_tests':
+        scores = [c for c in ('varc_score', 'dilr_score', 'qa_score') if c in df.columns]
+        percentiles = [c for c in ('varc_percentile', 'dilr_percentile', 'qa_percentile') if c in df.columns]
+        if len(scores) == 3:
+            df['total_score'] = df.get('total_score', pd.Series(np.nan, index=df.index)).fillna(df[scores].sum(axis=1))
+        if len(percentiles) == 3:
+            df['overall_percentile'] = df.get('overall_percentile', pd.Series(np.nan, index=df.index)).fillna(
+                df[percentiles].mean(axis=1))
+    if table in DURATION_TABLES and 'time_taken' in df.columns:
+        seconds = df['time_taken'].map(parse_duration, na_action='ignore').astype('Int64')
+        df['time_seconds'] = df.get('time_seconds', pd.Series(pd.NA, index=df.index, dtype='Int64')).fillna(seconds)
+    return df
+
+
+def coerce_frame(table: str, df: pd.DataFrame, columns: dict, existing_ids=None):
+    """Validate and coerce a frame to the table's schema
+    
+    Returns ``(clean, rejected)``: the rows that can be written, with SQLite
+    compatible dtypes, and a Series of error messages indexed by the source
+    row number of every row that can't. Rows whose id is in ``existing_ids``
+    are partial updates (``merge``) and may leave required columns blank.
+    """
+    df = df.copy()
+    df.columns = [_column_name(c) for c in df.columns]
+    df = df.loc[:, [c for c in df.columns if c in columns]]
+    df = df.loc[:, ~df.columns.duplicated()]
+    
+    if existing_ids is not None and 'id' in df.columns:
+        partial = pd.to_numeric(df['id'], errors='coerce').isin(existing_ids)
+    else:
+        partial = pd.Series(False, index=df.index)
+    
+    errors = pd.Series('', index=df.index, dtype=object)
+    
+    def reject(mask, message):
+        errors[mask & errors.eq('')] = message
+    
+    missing = [c for c, (_, notnull, default) in columns.items()
+               if notnull and default is None and c != 'id' and c not in df.columns]
+    # An empty JSON Lines member has no header to check
+    if missing and existing_ids is None and len(df):
+        raise ValueError(f"{table}: missing required column(s) {', '.join(missing)}")
+    for col in missing:
+        reject(~partial, f"{col} is required")
+    
+    for col in df.columns:
+        affinity, notnull, default = columns[col]
+        blank = _blank(df[col])
+        if affinity in ('int', 'float'):
+            raw = df[col]
+            if raw.dtype == object:
+                raw = raw.replace({True: 1, False: 0, 'True': 1, 'False': 0, 'TRUE': 1, 'FALSE': 0})
+            invalid = pd.to_numeric(raw.where(~blank), errors='coerce').isna() & ~blank
+            reject(invalid, f"{col} is not a number")
+            # to_numeric rounds some decimals differently from float(); parse the valid cells exactly
+            values = raw.where(~blank & ~invalid).astype(float)
+            if affinity == 'int':
+                fractional = values.notna() & (values % 1 != 0)
+                reject(fractional, f"{col} is not a whole number")
+                values = values.where(~fractional).astype('Int64')
+            df[col] = values
+        elif col in DATE_COLUMNS:
+            parsed = pd.to_datetime(df[col].where(~blank), errors='coerce', format='mixed')
+            reject(parsed.isna() & ~blank, f"{col} is not a date")
+            df[col] = parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), None)
+        else:
+            df[col] = df[col].where(~blank, None).astype(object)
+            df.loc[df[col].notna(), col] = df.loc[df[col].notna(), col].astype(str)
+        if notnull and default is None and col != 'id':
+            reject(df[col].isna() & ~partial, f"{col} is required")
+    
+    df = _derive(table, df)
+    if table == 'practice_tracker' and {'questions', 'correct'} <= set(df.columns):
+        reject((df['questions'] < 0) | (df['correct'] < 0), "questions and correct can't be negative")
+        reject(df['correct'] > df['questions'], "correct is more than questions")
+    
+    rejected = errors[errors.ne('')]
+    return df.drop(index=rejected.index), rejected
+
+
+def _with_defaults(df, columns):
+    """Fill blanks (and absent columns) with each column's DEFAULT"""
+    df = df.copy()
+    for col, (affinity, _, default) in columns.items():
+        if col == 'id' or default is None:
+            continue
+        value = _default_value(default, affinity)
+        df[col] = df[col].fillna(value) if col in df.columns else value
+    return df
+
+
+def _rows(df) -> list:
+    """Frame rows as tuples of plain Python values, NaN as None"""
+    values = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in df.columns]
+    return list(zip(*values))
+
+
+# =============================================================================
+# BULK LOAD
+# =============================================================================
+
+def load_frame(conn, table: str, df: pd.DataFrame, on_conflict: str = 'skip') -> dict:
+    """Write a coerced frame with executemany; the caller owns the transaction
+    
+    Rows without an id, or whose id isn't in the table yet, are inserted.
+    Rows whose id already exists are left alone (``skip``), overwritten
+    column by column (``replace``) or have their non-blank cells written over
+    the stored row (``merge``).
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {on_conflict}")
+    columns = table_columns(conn, table)
+    result = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    if df.empty:
+        return result
+    
+    if 'id' in df.columns:
+        df = df.drop_duplicates('id', keep='last') if df['id'].notna().all() else pd.concat([
+            df[df['id'].isna()], df[df['id'].notna()].drop_duplicates('id', keep='last')])
+        existing = {row[0] for row in conn.execute(f"SELECT id FROM {table}")}
+        clash = df['id'].isin(existing)
+    else:
+        clash = pd.Series(False, index=df.index)
+    
+    new = _with_defaults(df[~clash], columns)
+    if 'id' in new.columns and new['id'].isna().any():
+        # executemany needs one column list, so id-less rows go in separately
+        batches = [new[new['id'].notna()], new[new['id'].isna()].drop(columns='id')]
+    else:
+        batches = [new]
+    for batch in batches:
+        if batch.empty:
+            continue
+        names = ', '.join(batch.columns)
+        marks = ', '.join('?' * len(batch.columns))
+        conn.executemany(f"INSERT INTO {table} ({names}) VALUES ({marks})", _rows(batch))
+        result['inserted'] += len(batch)
+    
+    existing_rows = df[clash]
+    if on_conflict == 'skip' or existing_rows.empty:
+        result['skipped'] += len(existing_rows)
+        return result
+    
+    if on_conflict == 'replace':
+        # created_at isn't something a backup without it should reset
+        existing_rows = _with_defaults(existing_rows, {
+            c: spec for c, spec in columns.items() if c != 'created_at' or c in existing_rows.columns})
+        assignments = [f"{c} = ?" for c in existing_rows.columns if c != 'id']
+    else:
+        assignments = [f"{c} = COALESCE(?, {c})" for c in existing_rows.columns if c != 'id']
+    if 'updated_at' in columns and 'updated_at' not in existing_rows.columns:
+        assignments.append("updated_at = CURRENT_TIMESTAMP")
+    ordered = existing_rows[[c for c in existing_rows.columns if c != 'id'] + ['id']]
+    conn.executemany(f"UPDATE {table} SET {', '.join(assignments)} WHERE id = ?", _rows(ordered))
+    result['updated'] += len(ordered)
+    return result
+
+
+def frame_days(df) -> list:
+    """Distinct days (YYYY-MM-DD) in a frame's date column, as coerce_frame reads it"""
+    if df is None:
+        return []
+    columns = [_column_name(c) for c in df.columns]
+    if 'date' not in columns:
+        return []
+    parsed = pd.to_datetime(df.iloc[:, columns.index('date')], errors='coerce', format='mixed')
+    return sorted(parsed.dropna().dt.strftime('%Y-%m-%d').unique())
+
+
+def import_frames(conn, frames: dict, on_conflict: str = 'skip', strict: bool = False,
+                  after_load=None) -> dict:
+    """Validate and load ``{table: DataFrame}`` in a single transaction
+    
+    Returns ``{table: {'inserted', 'updated', 'skipped', 'rejected', 'errors'}}``.
+    Rows that fail validation are left out and listed under ``errors``, or
+    abort the whole import when ``strict`` is set. ``after_load(cursor)`` runs
+    in the same transaction once every table is written, so follow-up writes
+    commit or roll back with the rows.
+    """
+    unknown = [t for t in frames if t not in IMPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Can't import into: {', '.join(unknown)}")
+    
+    cleaned = {}
+    for table, df in frames.items():
+        existing_ids = None
+        if on_conflict == 'merge':
+            existing_ids = [row[0] for row in conn.execute(f"SELECT id FROM {table}")]
+        clean, rejected = coerce_frame(table, df, table_columns(conn, table), existing_ids)
+        if strict and len(rejected):
+            row, message = next(iter(rejected.items()))
+            raise ValueError(f"{table} row {row + 1}: {message}")
+        cleaned[table] = (clean, rejected)
+    
+    report = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table, (clean, rejected) in cleaned.items():
+            result = load_frame(conn, table, clean, on_conflict)
+            result['rejected'] = len(rejected)
+            result['errors'] = [(row + 1, message) for row, message in rejected.head(MAX_REPORTED_ERRORS).items()]
+            report[table] = result
+        if after_load is not None:
+            after_load(conn.cursor())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return report
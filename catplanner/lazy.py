@@ -0,0 +1,25 @@
+# lazy.py - deferred imports of heavy optional-at-startup modules
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access
+    
+    Keeps pandas (and, through it, openpyxl) out of the import of the data
+    layer, so commands that never build a DataFrame start quickly.
+    """
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            # importlib holds the import lock, so concurrent first uses are safe
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+    
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,221 @@
+# metrics.py - call timings for Database methods, HTML builders and page runs
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+# =============================================================================
+# TIMINGS
+# =============================================================================
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+DEFAULT_RUN_HISTORY = 50
+
+
+def _rows_of(value):
+    """Rows in a query result, or None for scalars and dicts"""
+    if isinstance(value, (list, tuple)) or hasattr(value, 'memory_usage'):
+        return len(value)
+    return None
+
+
+class Timing:
+    """Call count, latency histogram, rows and bytes for one instrumented name"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    
+    def add(self, seconds: float, rows: int = None, nbytes: int = None):
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows or 0
+        self.bytes += nbytes or 0
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, seconds * 1000)] += 1
+    
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile call"""
+        target = self.calls * q / 100
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max * 1000
+    
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.calls if self.calls else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': self.max * 1000,
+            'rows': self.rows,
+            'bytes': self.bytes,
+        }
+
+
+class Metrics:
+    """Process-wide registry of timings and recent page runs
+    
+    ``record`` aggregates one call under ``(kind, name)``. Between
+    ``begin_run`` and ``end_run`` the calls made on the same thread (one
+    Streamlit rerun) are also counted against that run, which is what shows a
+    query running twice on one page. Every record can be appended to a JSONL
+    trace file (``CATPLANNER_TRACE_FILE``).
+    """
+    
+    def __init__(self, enabled: bool = None, trace_path: str = None, history: int = DEFAULT_RUN_HISTORY):
+        self.enabled = enabled if enabled is not None else os.environ.get("CATPLANNER_METRICS", "1") != "0"
+        self.trace_path = trace_path or os.environ.get("CATPLANNER_TRACE_FILE")
+        self._timings = {}
+        self._runs = deque(maxlen=history)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._trace = None
+    
+    def record(self, kind: str, name: str, seconds: float, rows: int = None, nbytes: int = None,
+               nested: bool = False):
+        """Add one call to the aggregates (and to this thread's page run)
+        
+        ``nested`` calls (made from inside another timed call) are counted
+        but their time is already part of the caller's.
+        """
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run['last'] = time.perf_counter()
+        with self._lock:
+            timing = self._timings.get((kind, name))
+            if timing is None:
+                timing = self._timings[(kind, name)] = Timing()
+            timing.add(seconds, rows, nbytes)
+            if run is not None:
+                run['calls'][name] += 1
+                if not nested:
+                    run[f'{kind}_ms'] = run.get(f'{kind}_ms', 0.0) + seconds * 1000
+                    run['bytes'] += nbytes or 0
+        self._write_trace({'kind': kind, 'name': name, 'ms': round(seconds * 1000, 3), 'rows': rows,
+                           'bytes': nbytes, 'page': run['page'] if run else None})
+    
+    def begin_run(self, page: str):
+        """Start counting this thread's calls against a page run
+        
+        A run still open on this thread was cut short before its end_run
+        (st.rerun() and st.stop() end a Streamlit run early); it is ended as
+        of its last recorded call and kept in the history.
+        """
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            self.end_run(ended=run['last'])
+        now = time.perf_counter()
+        self._local.run = {'page': page, 'started': now, 'last': now, 'calls': Counter(), 'bytes': 0}
+    
+    def end_run(self, ended: float = None) -> dict:
+        """Finish this thread's page run and keep it in the history"""
+        run = getattr(self._local, 'run', None)
+        if run is None:
+            return None
+        self._local.run = None
+        elapsed = (ended or time.perf_counter()) - run.pop('started')
+        del run['last']
+        self.record('page', run['page'], elapsed, nbytes=run['bytes'])
+        run['ms'] = elapsed * 1000
+        run['calls'] = dict(run['calls'])
+        with self._lock:
+            self._runs.append(run)
+        self._write_trace({'kind': 'run', **run})
+        return run
+    
+    def timings(self, kind: str = None) -> list:
+        """Aggregates as dicts, slowest total first"""
+        with self._lock:
+            rows = [{'kind': k, 'name': n, **t.as_dict()} for (k, n), t in self._timings.items()
+                    if kind is None or k == kind]
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+    
+    def histogram(self, kind: str, name: str) -> dict:
+        """Calls per latency bucket, labelled by upper bound"""
+        with self._lock:
+            timing = self._timings.get((kind, name))
+            buckets = list(timing.buckets) if timing else [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        labels = [f"≤{bound:g}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]:g}ms"]
+        return dict(zip(labels, buckets))
+    
+    def runs(self) -> list:
+        """Recent page runs, newest first"""
+        with self._lock:
+            return list(reversed(self._runs))
+    
+    def reset(self):
+        """Forget every aggregate and run"""
+        with self._lock:
+            self._timings.clear()
+            self._runs.clear()
+    
+    def _write_trace(self, event: dict):
+        if not self.trace_path:
+            return
+        line = json.dumps({'ts': round(time.time(), 6), **event}, default=str, ensure_ascii=False)
+        with self._lock:
+            if self._trace is None:
+                self._trace = open(self.trace_path, 'a', encoding='utf-8', buffering=1)
+            self._trace.write(line + '\n')
+
+
+METRICS = Metrics()
+
+# =============================================================================
+# INSTRUMENTATION
+# =============================================================================
+
+
+def timed(kind: str, name: str = None):
+    """Record each call of a function in ``METRICS``
+    
+    Rows are counted for DataFrame and list results; ``kind='html'`` counts
+    the UTF-8 bytes of the returned markup instead.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            local = METRICS._local
+            depth = getattr(local, 'depth', 0)
+            local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                local.depth = depth
+            if kind == 'html':
+                METRICS.record(kind, label, elapsed, nbytes=len(result.encode('utf-8')), nested=depth > 0)
+            else:
+                METRICS.record(kind, label, elapsed, rows=_rows_of(result), nested=depth > 0)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_methods(*skip):
+    """Class decorator applying ``timed('query')`` to every public method"""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or attr in skip or not callable(value):
+                continue
+            setattr(cls, attr, timed('query', f"{cls.__name__}.{attr}")(value))
+        return cls
+    return decorator
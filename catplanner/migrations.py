@@ -0,0 +1,510 @@
+# migrations.py - versioned schema migrations for the CAT Planner database
+import sqlite3
+
+# =============================================================================
+# MIGRATIONS
+# =============================================================================
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _initial_schema(cursor):
+    """Tables shipped before versioning existed (IF NOT EXISTS adopts old files)"""
+    # Syllabus table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS syllabus (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            section TEXT NOT NULL,
+            main_topic TEXT NOT NULL,
+            sub_topics TEXT,
+            practice_focus TEXT,
+            confidence INTEGER DEFAULT 50,
+            priority TEXT DEFAULT 'Medium',
+            studied INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Difficulty mapping table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS difficulty (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            section TEXT NOT NULL,
+            topic_category TEXT NOT NULL,
+            level TEXT DEFAULT 'Moderate',
+            studied INTEGER DEFAULT 0,
+            mastery INTEGER DEFAULT 50,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Study plan table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS study_plan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            week_number INTEGER NOT NULL,
+            week_label TEXT NOT NULL,
+            target TEXT NOT NULL,
+            completed INTEGER DEFAULT 0,
+            start_date TEXT,
+            end_date TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Practice tracker table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS practice_tracker (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            section TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            questions INTEGER DEFAULT 0,
+            correct INTEGER DEFAULT 0,
+            wrong INTEGER DEFAULT 0,
+            accuracy REAL DEFAULT 0,
+            time_taken TEXT,
+            reviewed INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Mock tests table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mock_tests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            test_name TEXT NOT NULL,
+            varc_score REAL DEFAULT 0,
+            varc_percentile REAL DEFAULT 0,
+            dilr_score REAL DEFAULT 0,
+            dilr_percentile REAL DEFAULT 0,
+            qa_score REAL DEFAULT 0,
+            qa_percentile REAL DEFAULT 0,
+            total_score REAL DEFAULT 0,
+            overall_percentile REAL DEFAULT 0,
+            time_taken TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # User settings table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT UNIQUE NOT NULL,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Daily goals table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            goal_type TEXT NOT NULL,
+            target_value INTEGER DEFAULT 0,
+            achieved_value INTEGER DEFAULT 0,
+            completed INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _history_indexes(cursor):
+    """Indexes for the history tables that grow without bound"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_date
+        ON practice_tracker (date)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_section_topic
+        ON practice_tracker (section, topic, questions, correct, accuracy)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mock_tests_date
+        ON mock_tests (date, overall_percentile)
+    ''')
+
+
+def _stats_summary(cursor):
+    """Trigger-maintained aggregates behind get_dashboard_stats"""
+    # scope is 'syllabus:<section>', 'study_plan', 'practice_tracker' or
+    # 'mock_tests'. flag_sum counts studied/completed/reviewed rows and
+    # value_sum adds up confidence/accuracy/overall_percentile.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_summary (
+            scope TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            flag_sum INTEGER NOT NULL DEFAULT 0,
+            value_sum REAL NOT NULL DEFAULT 0,
+            questions_sum INTEGER NOT NULL DEFAULT 0,
+            correct_sum INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # table -> (scope, flag, value, questions, correct, watched columns);
+    # {row} is NEW or OLD inside the trigger body
+    sources = {
+        'syllabus': ("'syllabus:' || {row}.section", "{row}.studied", "{row}.confidence", "0", "0",
+                     "section, studied, confidence"),
+        'study_plan': ("'study_plan'", "{row}.completed", "0", "0", "0", "completed"),
+        'practice_tracker': ("'practice_tracker'", "{row}.reviewed", "{row}.accuracy",
+                             "{row}.questions", "{row}.correct", "reviewed, accuracy, questions, correct"),
+        'mock_tests': ("'mock_tests'", "0", "{row}.overall_percentile", "0", "0", "overall_percentile"),
+    }
+    
+    def apply_delta(exprs, row, sign):
+        scope, flag, value, questions, correct = (e.format(row=row) for e in exprs)
+        return f'''
+            INSERT INTO stats_summary (scope, row_count, flag_sum, value_sum, questions_sum, correct_sum)
+            VALUES ({scope}, {sign}1, {sign}COALESCE({flag}, 0), {sign}COALESCE({value}, 0),
+                    {sign}COALESCE({questions}, 0), {sign}COALESCE({correct}, 0))
+            ON CONFLICT(scope) DO UPDATE SET
+                row_count = row_count + excluded.row_count,
+                flag_sum = flag_sum + excluded.flag_sum,
+                value_sum = value_sum + excluded.value_sum,
+                questions_sum = questions_sum + excluded.questions_sum,
+                correct_sum = correct_sum + excluded.correct_sum;
+        '''
+    
+    for table, (*exprs, watched) in sources.items():
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table}
+            BEGIN {apply_delta(exprs, "NEW", "+")} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table}
+            BEGIN {apply_delta(exprs, "OLD", "-")} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_update AFTER UPDATE OF {watched} ON {table}
+            BEGIN {apply_delta(exprs, "OLD", "-")} {apply_delta(exprs, "NEW", "+")} END
+        ''')
+    
+    # MAX(overall_percentile) can't be maintained on delete; an index makes it a seek
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mock_tests_percentile
+        ON mock_tests (overall_percentile)
+    ''')
+    
+    # Backfill from existing history
+    cursor.execute("DELETE FROM stats_summary")
+    cursor.execute('''
+        INSERT INTO stats_summary (scope, row_count, flag_sum, value_sum, questions_sum, correct_sum)
+        SELECT 'syllabus:' || section, COUNT(*), COALESCE(SUM(studied), 0),
+               COALESCE(SUM(confidence), 0), 0, 0
+        FROM syllabus GROUP BY section
+        UNION ALL
+        SELECT 'study_plan', COUNT(*), COALESCE(SUM(completed), 0), 0, 0, 0 FROM study_plan
+        UNION ALL
+        SELECT 'practice_tracker', COUNT(*), COALESCE(SUM(reviewed), 0), COALESCE(SUM(accuracy), 0),
+               COALESCE(SUM(questions), 0), COALESCE(SUM(correct), 0)
+        FROM practice_tracker
+        UNION ALL
+        SELECT 'mock_tests', COUNT(*), 0, COALESCE(SUM(overall_percentile), 0), 0, 0 FROM mock_tests
+    ''')
+
+
+def _practice_section_date_index(cursor):
+    """Keyset pagination filtered by section"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_section_date
+        ON practice_tracker (section, date)
+    ''')
+
+
+def _practice_rollup(cursor, table: str, keys: dict):
+    """Create a trigger-maintained practice_tracker rollup grouped by ``keys``
+    
+    ``keys`` maps each grouping column to its expression over a practice row
+    (``{row}`` is NEW or OLD). A session moves between groups when one of
+    its key columns is edited; groups left with no sessions are dropped.
+    """
+    columns = ", ".join(keys)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            {" ".join(f"{name} TEXT NOT NULL," for name in keys)}
+            sessions INTEGER NOT NULL DEFAULT 0,
+            questions INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            reviewed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY ({columns})
+        ) WITHOUT ROWID
+    ''')
+    
+    def apply_delta(row, sign):
+        values = ", ".join(expr.format(row=row) for expr in keys.values())
+        return f'''
+            INSERT INTO {table} ({columns}, sessions, questions, correct, reviewed)
+            VALUES ({values}, {sign}1,
+                    {sign}COALESCE({row}.questions, 0), {sign}COALESCE({row}.correct, 0),
+                    {sign}COALESCE({row}.reviewed, 0))
+            ON CONFLICT({columns}) DO UPDATE SET
+                sessions = sessions + excluded.sessions,
+                questions = questions + excluded.questions,
+                correct = correct + excluded.correct,
+                reviewed = reviewed + excluded.reviewed;
+        '''
+    
+    match_old = " AND ".join(f"{name} = {expr.format(row='OLD')}" for name, expr in keys.items())
+    drop_empty = f"DELETE FROM {table} WHERE {match_old} AND sessions = 0;"
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON practice_tracker
+        BEGIN {apply_delta("NEW", "+")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON practice_tracker
+        BEGIN {apply_delta("OLD", "-")} {drop_empty} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_update
+        AFTER UPDATE OF date, section, topic, questions, correct, reviewed ON practice_tracker
+        BEGIN {apply_delta("OLD", "-")} {apply_delta("NEW", "+")} {drop_empty} END
+    ''')
+    
+    # Backfill from existing history
+    groups = ", ".join(expr.format(row='practice_tracker') for expr in keys.values())
+    cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(f'''
+        INSERT INTO {table} ({columns}, sessions, questions, correct, reviewed)
+        SELECT {groups}, COUNT(*), COALESCE(SUM(questions), 0),
+               COALESCE(SUM(correct), 0), COALESCE(SUM(reviewed), 0)
+        FROM practice_tracker GROUP BY {groups}
+    ''')
+
+
+def _practice_daily(cursor):
+    """Trigger-maintained per-day practice totals behind the trend analytics"""
+    _practice_rollup(cursor, 'practice_daily', {
+        'day': "substr({row}.date, 1, 10)", 'section': "{row}.section", 'topic': "{row}.topic",
+    })
+
+
+def _practice_topics(cursor):
+    """Trigger-maintained all-time practice totals per section and topic"""
+    # Question-weighted accuracy is SUM(correct) / SUM(questions) over these
+    _practice_rollup(cursor, 'practice_topics', {'section': "{row}.section", 'topic': "{row}.topic"})
+
+
+def _review_schedule(cursor):
+    """SM-2 review state per practised topic, indexed by due date"""
+    from .review import rebuild_schedule
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_schedule (
+            section TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            interval_days INTEGER NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            due_date TEXT NOT NULL,
+            last_reviewed TEXT,
+            last_quality INTEGER,
+            last_accuracy REAL,
+            PRIMARY KEY (section, topic)
+        ) WITHOUT ROWID
+    ''')
+    # Holds (due_date, section, topic), so the due queue is an ordered range scan
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_review_schedule_due ON review_schedule (due_date)
+    ''')
+    # Replay the existing history, one review per practised day
+    rebuild_schedule(cursor)
+
+
+def _goal_triggers(cursor, expressions: dict, watched: str = "date, section, topic, questions, time_taken"):
+    """(Re)create the triggers adding practice rows into daily_goals.achieved_value
+    
+    ``expressions`` maps each goal type to what one practice row adds to it
+    (``{row}`` is NEW or OLD) and ``watched`` lists the practice_tracker
+    columns they read. Only goal rows that already exist for the session's
+    day are touched; goals.ensure_day creates them.
+    """
+    def apply_delta(row, sign):
+        cases = " ".join(f"WHEN '{goal}' THEN {expr.format(row=row)}" for goal, expr in expressions.items())
+        delta = f"{sign}(CASE goal_type {cases} ELSE 0 END)"
+        return f'''
+            UPDATE daily_goals SET achieved_value = achieved_value {delta},
+                                   completed = achieved_value {delta} >= target_value
+            WHERE date = substr({row}.date, 1, 10);
+        '''
+    
+    for event in ('insert', 'delete', 'update'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_daily_goals_{event}")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_daily_goals_insert AFTER INSERT ON practice_tracker
+        BEGIN {apply_delta("NEW", "+")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_daily_goals_delete AFTER DELETE ON practice_tracker
+        BEGIN {apply_delta("OLD", "-")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_daily_goals_update
+        AFTER UPDATE OF {watched} ON practice_tracker
+        BEGIN {apply_delta("OLD", "-")} {apply_delta("NEW", "+")} END
+    ''')
+    
+    # Recount rows written before the triggers (e.g. imported)
+    cases = " ".join(f"WHEN '{goal}' THEN {expr.format(row='p')}" for goal, expr in expressions.items())
+    cursor.execute(f'''
+        UPDATE daily_goals SET achieved_value = (
+            SELECT COALESCE(SUM(CASE daily_goals.goal_type {cases} ELSE 0 END), 0)
+            FROM practice_tracker p
+            WHERE p.date >= daily_goals.date AND p.date < date(daily_goals.date, '+1 day')
+        )
+    ''')
+    cursor.execute("UPDATE daily_goals SET completed = achieved_value >= target_value")
+
+
+def _daily_goal_rollups(cursor):
+    """One daily_goals row per (date, goal_type), kept current by triggers"""
+    cursor.execute('''
+        DELETE FROM daily_goals WHERE id NOT IN (SELECT MIN(id) FROM daily_goals GROUP BY date, goal_type)
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_goals_date_type ON daily_goals (date, goal_type)
+    ''')
+    _goal_triggers(cursor, {
+        'questions': "COALESCE({row}.questions, 0)",
+        'sessions': "1",
+        'rc_sets': "({row}.topic LIKE '%RC%' OR {row}.topic LIKE '%Reading Comprehension%')",
+        'minutes': "MAX(CAST(COALESCE({row}.time_taken, '') AS INTEGER), 0)",
+    })
+
+
+def _time_seconds(cursor):
+    """Parsed time_taken as integer seconds, behind the pace analytics"""
+    from .durations import DURATION_TABLES, backfill
+    
+    for table in DURATION_TABLES:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if 'time_seconds' not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN time_seconds INTEGER")
+        backfill(cursor, table)
+    # Covers the pace queries, and only holds sessions that were timed
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_pace
+        ON practice_tracker (section, topic, time_seconds, questions, correct)
+        WHERE time_seconds > 0 AND questions > 0
+    ''')
+    # Minutes goals now count parsed durations, to the nearest minute per session
+    _goal_triggers(cursor, {
+        'questions': "COALESCE({row}.questions, 0)",
+        'sessions': "1",
+        'rc_sets': "({row}.topic LIKE '%RC%' OR {row}.topic LIKE '%Reading Comprehension%')",
+        'minutes': "(COALESCE({row}.time_seconds, 0) + 30) / 60",
+    }, watched="date, section, topic, questions, time_seconds")
+
+
+def _goal_counting(cursor):
+    """Goal triggers from goals.GOAL_EXPRESSIONS, with RC matched case-sensitively
+    
+    Replaces the triggers of migrations 8 and 9, whose RC rule (LIKE '%RC%')
+    also counted "Percentages" and "Circles & Triangles", and recounts every
+    daily_goals row. Goal triggers are built from goals.GOAL_EXPRESSIONS
+    from here on; the copies above are what those releases shipped.
+    """
+    from .goals import GOAL_EXPRESSIONS, GOAL_WATCHED_COLUMNS
+    _goal_triggers(cursor, GOAL_EXPRESSIONS, GOAL_WATCHED_COLUMNS)
+
+
+def _page_read_indexes(cursor):
+    """Indexes behind the page reads that still scanned or sorted"""
+    # get_syllabus/get_difficulty filter and order by section (the rowid
+    # breaks ties); the dashboard's weakest topics order by confidence
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_syllabus_section ON syllabus (section)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_syllabus_confidence ON syllabus (confidence)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_difficulty_section ON difficulty (section)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_study_plan_week ON study_plan (week_number)")
+    # A topic search reads each matching topic's sessions newest first
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_topic_date ON practice_tracker (section, topic, date)
+    ''')
+
+
+def _practice_daily_topic_index(cursor):
+    """Covering (section, topic, day) index for per-topic windows"""
+    # practice_trends sums each topic's recent days in practice_topics order,
+    # so no day range is grouped through a temp B-tree
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_practice_daily_topic
+        ON practice_daily (section, topic, day, sessions, questions, correct)
+    ''')
+
+
+# Ordered (version, description, apply) triples. Never edit or reorder a
+# released migration; append a new one instead.
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "practice_tracker and mock_tests indexes", _history_indexes),
+    (3, "stats_summary aggregates", _stats_summary),
+    (4, "practice_tracker section/date index", _practice_section_date_index),
+    (5, "practice_daily aggregates", _practice_daily),
+    (6, "practice_topics aggregates", _practice_topics),
+    (7, "review_schedule for spaced repetition", _review_schedule),
+    (8, "daily_goals progress triggers", _daily_goal_rollups),
+    (9, "time_seconds duration columns", _time_seconds),
+    (10, "case-sensitive RC goal counting", _goal_counting),
+    (11, "indexes for page reads", _page_read_indexes),
+    (12, "practice_daily topic/day index", _practice_daily_topic_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    """Version recorded in settings, 0 for a new or pre-versioning database"""
+    try:
+        row = conn.execute(
+            "SELECT value FROM settings WHERE key = ?", (SCHEMA_VERSION_KEY,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
+
+
+def migrate(conn, seed=None) -> list:
+    """Apply pending migrations in one transaction and return their versions
+    
+    ``seed(cursor)`` runs in the same transaction when the database is created
+    from scratch, so default data is only inserted once. A database that is
+    already current costs a single SELECT.
+    """
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return []
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the lock
+        current = get_schema_version(conn)
+        cursor = conn.cursor()
+        applied = []
+        for version, _, apply in MIGRATIONS:
+            if version > current:
+                apply(cursor)
+                applied.append(version)
+        if current == 0 and seed is not None:
+            seed(cursor)
+        if applied:
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (SCHEMA_VERSION_KEY, str(SCHEMA_VERSION)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
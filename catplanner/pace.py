@@ -0,0 +1,115 @@
+# pace.py - speed analytics for CAT Planner
+#
+# Built on the parsed time_seconds columns. Practice pace is read through
+# idx_practice_pace, a partial covering index holding only timed sessions:
+# totals are grouped in SQL, and pace bands and the speed frontier (the
+# sessions no faster session matched on accuracy) are computed with numpy.
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Accuracy is compared across this many equal-count pace bands per section
+PACE_BANDS = 5
+
+# Both read idx_practice_pace in index order: no table lookups, no sort
+PACE_TOTALS_QUERY = '''
+    SELECT section, topic, COUNT(*) AS sessions, SUM(time_seconds) AS seconds,
+           SUM(questions) AS questions, SUM(correct) AS correct
+    FROM practice_tracker WHERE time_seconds > 0 AND questions > 0
+    GROUP BY section, topic
+'''
+PACE_SESSIONS_QUERY = '''
+    SELECT time_seconds, questions, correct FROM practice_tracker
+    WHERE section = ? AND time_seconds > 0 AND questions > 0
+'''
+
+
+def speed_frontier(seconds_per_unit, score):
+    """Mask of the points on the speed/score frontier
+    
+    A point is on the frontier when every faster point scored lower, so
+    the frontier is the best score reached at each pace. Ties on pace keep
+    the better score.
+    """
+    seconds_per_unit = np.asarray(seconds_per_unit, dtype=float)
+    score = np.asarray(score, dtype=float)
+    if not len(score):
+        return np.zeros(0, dtype=bool)
+    order = np.lexsort((-score, seconds_per_unit))
+    ranked = score[order]
+    best_faster = np.maximum.accumulate(np.concatenate([[-np.inf], ranked[:-1]]))
+    mask = np.zeros(len(score), dtype=bool)
+    mask[order] = ranked > best_faster
+    return mask
+
+
+def _with_rates(totals):
+    totals['minutes'] = totals['seconds'] / 60
+    totals['questions_per_minute'] = totals['questions'] / totals['minutes']
+    totals['seconds_per_question'] = totals['seconds'] / totals['questions']
+    totals['accuracy'] = totals['correct'] / totals['questions'] * 100
+    return totals.drop(columns=['seconds', 'correct'])
+
+
+def _section_bands(section, sessions):
+    """Accuracy over PACE_BANDS equal-count slices of one section's sessions, fastest first"""
+    seconds, questions, correct = sessions.T
+    pace = seconds / questions
+    order = np.argsort(pace, kind='stable')
+    bands = []
+    for band, rows in enumerate(np.array_split(order, min(PACE_BANDS, len(order))), start=1):
+        bands.append({'section': section, 'band': band, 'sessions': len(rows),
+                      'questions': int(questions[rows].sum()),
+                      'fastest': float(pace[rows].min()), 'slowest': float(pace[rows].max()),
+                      'accuracy': float(correct[rows].sum() / questions[rows].sum() * 100)})
+    return bands
+
+
+def practice_pace(conn) -> dict:
+    """Pace per section and topic, accuracy by pace band, and the speed frontier
+    
+    ``bands`` splits each section's timed sessions into PACE_BANDS
+    equal-count groups, fastest first, with their question-weighted
+    accuracy; ``frontier`` lists the sessions on each section's
+    seconds-per-question/accuracy frontier, fastest first. Untimed sessions
+    are left out throughout.
+    """
+    topics = pd.read_sql_query(PACE_TOTALS_QUERY, conn)
+    if topics.empty:
+        empty = pd.DataFrame()
+        return {'timed_sessions': 0, 'sections': empty, 'topics': empty, 'bands': empty, 'frontier': empty}
+    sections = topics.drop(columns='topic').groupby('section', as_index=False).sum()
+    
+    # Per-session numbers only, fetched as plain tuples straight into arrays
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    bands, frontier = [], []
+    for section in sections['section']:
+        sessions = np.array(cursor.execute(PACE_SESSIONS_QUERY, (section,)).fetchall(), dtype=float)
+        bands.extend(_section_bands(section, sessions))
+        seconds, questions, correct = sessions.T
+        pace, accuracy = seconds / questions, correct / questions * 100
+        best = speed_frontier(pace, accuracy)
+        frontier.append(pd.DataFrame({'section': section, 'seconds_per_question': pace[best],
+                                      'accuracy': accuracy[best], 'questions': questions[best].astype(int)}))
+    
+    return {
+        'timed_sessions': int(sections['sessions'].sum()),
+        'sections': _with_rates(sections),
+        'topics': _with_rates(topics),
+        'bands': pd.DataFrame(bands),
+        'frontier': pd.concat(frontier).sort_values(['section', 'seconds_per_question']).reset_index(drop=True),
+    }
+
+
+def mock_pace(conn):
+    """Timed mocks with score per minute and whether each is on the speed frontier"""
+    df = pd.read_sql_query('''
+        SELECT date, test_name, total_score, overall_percentile, time_seconds FROM mock_tests
+        WHERE time_seconds > 0 ORDER BY date
+    ''', conn)
+    df['minutes'] = df['time_seconds'] / 60
+    df['score_per_minute'] = df['total_score'] / df['minutes']
+    df['on_frontier'] = speed_frontier(df['time_seconds'], df['total_score'])
+    return df.drop(columns='time_seconds')
@@ -0,0 +1,115 @@
+# projection.py - next-mock percentile projection for CAT Planner
+#
+# Two least-squares fits per section over the user's own mocks: a score trend
+# over time, and a score -> percentile mapping. The next mock's score is
+# projected from the trend and mapped to a percentile, with a prediction
+# interval combining the uncertainty of both fits.
+from datetime import date
+
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# (name, score column, percentile column)
+PROJECTED_SECTIONS = (
+    ('VARC', 'varc_score', 'varc_percentile'),
+    ('DILR', 'dilr_score', 'dilr_percentile'),
+    ('QA', 'qa_score', 'qa_percentile'),
+    ('Overall', 'total_score', 'overall_percentile'),
+)
+
+# Fewer mocks than this leave no residual to estimate the spread from
+MIN_MOCKS = 3
+
+CONFIDENCE = 0.95
+
+# Two-sided 95% Student t quantiles by degrees of freedom; past the table
+# the normal quantile is close enough
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+        9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+
+
+def _t_quantile(dof: int) -> float:
+    """95% t quantile, rounded towards fewer degrees of freedom (wider)"""
+    if dof > 30:
+        return 1.960
+    return _T95[max(k for k in _T95 if k <= dof)]
+
+
+class _LinearFit:
+    """Ordinary least squares y = intercept + slope * x with prediction spread"""
+    
+    def __init__(self, x, y):
+        self.n = len(x)
+        self.x_mean = x.mean()
+        self.sxx = float(((x - self.x_mean) ** 2).sum())
+        if self.sxx > 0:
+            design = np.column_stack([np.ones_like(x), x])
+            (self.intercept, self.slope), *_ = np.linalg.lstsq(design, y, rcond=None)
+        else:
+            # All x equal (e.g. every mock on one day): the best line is flat
+            self.intercept, self.slope = y.mean(), 0.0
+        residuals = y - self.predict(x)
+        self.dof = max(self.n - 2, 1)
+        self.residual_std = float(np.sqrt((residuals ** 2).sum() / self.dof))
+    
+    def predict(self, x):
+        return self.intercept + self.slope * x
+    
+    def prediction_var(self, x0: float) -> float:
+        """Variance of a new observation at ``x0``"""
+        leverage = 1 / self.n + ((x0 - self.x_mean) ** 2 / self.sxx if self.sxx > 0 else 0)
+        return self.residual_std ** 2 * (1 + leverage)
+
+
+def fit_projection(rows) -> dict:
+    """Project the next mock from ``rows`` of mock_tests (oldest first)
+    
+    Returns the number of mocks, the expected date of the next one and, per
+    section, the projected score and percentile with 95% intervals. With
+    fewer than MIN_MOCKS mocks ``sections`` is empty.
+    """
+    projection = {'n_mocks': len(rows), 'confidence': CONFIDENCE, 'next_date': None, 'sections': {}}
+    if len(rows) < MIN_MOCKS:
+        return projection
+    
+    days = np.array([date.fromisoformat(r['date'][:10]).toordinal() for r in rows], dtype=float)
+    # The next mock is expected after the usual gap between mocks
+    gap = max(float(np.median(np.diff(days))), 1.0)
+    next_day = days[-1] + gap
+    projection['next_date'] = date.fromordinal(int(next_day)).isoformat()
+    t = (days - days[0]) / 7  # weeks since the first mock
+    next_t = (next_day - days[0]) / 7
+    
+    for name, score_col, pct_col in PROJECTED_SECTIONS:
+        scores = np.array([r[score_col] or 0 for r in rows], dtype=float)
+        percentiles = np.array([r[pct_col] or 0 for r in rows], dtype=float)
+        trend = _LinearFit(t, scores)
+        mapping = _LinearFit(scores, percentiles)
+        
+        score = float(trend.predict(next_t))
+        score_var = trend.prediction_var(next_t)
+        percentile = float(mapping.predict(score))
+        # Spread of the mapping at that score plus the score's own spread
+        # carried through the mapping's slope
+        pct_var = mapping.prediction_var(score) + mapping.slope ** 2 * score_var
+        score_margin = _t_quantile(trend.dof) * float(np.sqrt(score_var))
+        pct_margin = _t_quantile(min(trend.dof, mapping.dof)) * float(np.sqrt(pct_var))
+        
+        projection['sections'][name] = {
+            'score': score,
+            'score_interval': (score - score_margin, score + score_margin),
+            'score_per_week': float(trend.slope),
+            'percentile': float(np.clip(percentile, 0, 100)),
+            'percentile_interval': (float(np.clip(percentile - pct_margin, 0, 100)),
+                                    float(np.clip(percentile + pct_margin, 0, 100))),
+            'percentile_per_mark': float(mapping.slope),
+        }
+    return projection
+
+
+def mock_projection(conn) -> dict:
+    """Fit the projection over every mock in the database"""
+    columns = ", ".join(dict.fromkeys(c for _, *cols in PROJECTED_SECTIONS for c in cols))
+    rows = conn.execute(f"SELECT date, {columns} FROM mock_tests ORDER BY date").fetchall()
+    return fit_projection(rows)
@@ -0,0 +1,96 @@
+# render.py - HTML builders for CAT Planner pages
+from datetime import date, timedelta
+
+import numpy as np
+
+from .metrics import timed
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+FLAG_COLUMNS = ['studied', 'completed', 'reviewed']
+BADGE_COLUMNS = ['level', 'priority']
+SCORE_COLUMNS = ['confidence', 'mastery', 'accuracy']
+
+def get_badge_html(text, badge_type="default"):
+    badge_class = f"badge-{str(badge_type).lower()}"
+    return f'<span class="badge {badge_class}">{text}</span>'
+
+@timed('html')
+def render_progress_bar(percentage, color="#667eea"):
+    return f'''
+    <div class="progress-bar-container">
+        <div class="progress-bar-fill" style="width: {min(percentage, 100)}%; background: {color};"></div>
+    </div>
+    '''
+
+def _format_column(col, series) -> list:
+    """Format a whole column at once; returns one HTML string per row"""
+    values = series.to_numpy(dtype=object)
+    
+    if col in FLAG_COLUMNS:
+        return np.where(values.astype(bool), '✅', '⬜').tolist()
+    
+    if col in BADGE_COLUMNS:
+        text = np.array([str(v) for v in values], dtype=object)
+        lower = np.char.lower(text.astype(str)).astype(object)
+        return ('<span class="badge badge-' + lower + '">' + text + '</span>').tolist()
+    
+    if col in SCORE_COLUMNS:
+        numbers = series.to_numpy(dtype=float)
+        color = np.select([numbers >= 75, numbers >= 50], ['#38ef7d', '#f7b733'], '#ef4444').astype(object)
+        pct = np.char.mod('%.0f', numbers).astype(object)
+        return ('<span style="color:' + color + '; font-weight:600;">' + pct + '%</span>').tolist()
+    
+    if 'percentile' in col.lower():
+        return np.char.mod('%.1f%%ile', series.to_numpy(dtype=float)).tolist()
+    
+    return [str(v) for v in series.tolist()]
+
+@timed('html')
+def render_styled_table(df, exclude_cols=None):
+    """Render styled HTML table, formatting column by column"""
+    if exclude_cols is None:
+        exclude_cols = ['id', 'created_at', 'updated_at', 'notes']
+    
+    display_df = df.drop(columns=[c for c in exclude_cols if c in df.columns], errors='ignore')
+    
+    header = ''.join(f'<th>{col.replace("_", " ").title()}</th>' for col in display_df.columns)
+    columns = [_format_column(col, display_df[col]) for col in display_df.columns]
+    if columns:
+        body = ''.join('<tr><td>' + '</td><td>'.join(cells) + '</td></tr>' for cells in zip(*columns))
+    else:
+        body = '<tr></tr>' * len(display_df)
+    
+    return f'<table class="styled-table"><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>'
+
+HEATMAP_COLORS = ['rgba(255,255,255,0.06)', '#1e3a5f', '#2b6cb0', '#4facfe', '#00f2fe']
+
+@timed('html')
+def render_heatmap(history):
+    """Render a GitHub-style grid of questions per day (weeks as columns)"""
+    start = date.fromisoformat(history['start'])
+    end = date.fromisoformat(history['end'])
+    totals = history['questions']
+    # Shade by quartile of the active days, so the scale fits the user
+    values = sorted(totals.values())
+    cuts = [values[int(len(values) * q)] for q in (0.25, 0.5, 0.75)] if values else []
+    
+    columns = []
+    day = start
+    while day <= end:
+        cells = []
+        for _ in range(7):
+            if day > end:
+                cells.append('<div style="width: 12px; height: 12px;"></div>')
+            else:
+                count = totals.get(day.isoformat(), 0)
+                level = 0 if not count else 1 + sum(count > c for c in cuts)
+                cells.append(
+                    f'<div title="{day.isoformat()}: {count} questions" style="width: 12px; height: 12px; '
+                    f'border-radius: 3px; background: {HEATMAP_COLORS[level]};"></div>'
+                )
+            day += timedelta(days=1)
+        columns.append(f'<div style="display: flex; flex-direction: column; gap: 3px;">{"".join(cells)}</div>')
+    return f'<div style="display: flex; gap: 3px; overflow-x: auto; padding: 5px 0;">{"".join(columns)}</div>'
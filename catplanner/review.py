@@ -0,0 +1,142 @@
+# review.py - spaced-repetition review queue for CAT Planner
+#
+# Every practised (section, topic) has an SM-2 schedule in review_schedule:
+# practising it grades it from the day's accuracy and pushes its due date
+# out (or back to tomorrow on a poor day). The due queue is a range scan of
+# idx_review_schedule_due, so serving it costs O(log n + k) for k due topics.
+from datetime import date, timedelta
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# Lowest accuracy (%) earning each SM-2 quality grade, best first
+QUALITY_THRESHOLDS = ((90, 5), (75, 4), (60, 3), (40, 2), (20, 1), (0, 0))
+
+# A grade below this is a lapse: the topic starts over at a 1-day interval
+PASS_QUALITY = 3
+
+QUALITY_LABELS = {5: "Easy", 4: "Good", 3: "Hard", 2: "Shaky", 1: "Forgot", 0: "Blackout"}
+
+
+def quality_from_accuracy(accuracy: float) -> int:
+    """SM-2 grade (0-5) for a session accuracy in percent"""
+    for threshold, quality in QUALITY_THRESHOLDS:
+        if (accuracy or 0) >= threshold:
+            return quality
+    return 0
+
+
+def sm2(repetitions: int, interval: int, ease: float, quality: int) -> tuple:
+    """One SM-2 step: the next (repetitions, interval in days, ease)"""
+    if quality < PASS_QUALITY:
+        repetitions, interval = 0, 1
+    else:
+        repetitions += 1
+        interval = 1 if repetitions == 1 else 6 if repetitions == 2 else round(interval * ease)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return repetitions, interval, ease
+
+
+def _grade(cursor, section: str, topic: str, day: str, accuracy: float, quality: int = None,
+           force: bool = False):
+    """Apply one review of a topic on ``day`` to its schedule
+    
+    Practice grades a topic at most once a day; a later session on the same
+    day only counts if it is a lapse. ``force`` always applies the review.
+    """
+    quality = quality_from_accuracy(accuracy) if quality is None else quality
+    row = cursor.execute(
+        "SELECT repetitions, interval_days, ease, last_reviewed FROM review_schedule WHERE section = ? AND topic = ?",
+        (section, topic)
+    ).fetchone()
+    if row is None:
+        state = (0, 0, INITIAL_EASE)
+    elif not force and row['last_reviewed'] and row['last_reviewed'] >= day and quality >= PASS_QUALITY:
+        return
+    else:
+        state = (row['repetitions'], row['interval_days'], row['ease'])
+    repetitions, interval, ease = sm2(*state, quality)
+    due = (date.fromisoformat(day) + timedelta(days=interval)).isoformat()
+    cursor.execute('''
+        INSERT INTO review_schedule (section, topic, repetitions, interval_days, ease, due_date,
+                                     last_reviewed, last_quality, last_accuracy)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(section, topic) DO UPDATE SET
+            repetitions = excluded.repetitions, interval_days = excluded.interval_days,
+            ease = excluded.ease, due_date = excluded.due_date,
+            last_reviewed = MAX(COALESCE(last_reviewed, ''), excluded.last_reviewed),
+            last_quality = excluded.last_quality, last_accuracy = excluded.last_accuracy
+    ''', (section, topic, repetitions, interval, ease, due, day, quality, accuracy))
+
+
+def record_practice(cursor, day: str, section: str, topic: str, accuracy: float):
+    """Grade a topic after a practice session (caller commits)"""
+    _grade(cursor, section, topic, day[:10], accuracy)
+
+
+def rebuild_schedule(cursor):
+    """Replay every topic's history, one review per practised day"""
+    cursor.execute("DELETE FROM review_schedule")
+    rows = cursor.execute('''
+        SELECT day, section, topic, questions, correct FROM practice_daily
+        WHERE sessions > 0 ORDER BY section, topic, day
+    ''').fetchall()
+    for day, section, topic, questions, correct in rows:
+        _grade(cursor, section, topic, day, correct / questions * 100 if questions else 0)
+
+
+def sync_topics(cursor, today: date = None):
+    """Schedule practised topics that have no schedule yet (e.g. imported), due today"""
+    cursor.execute('''
+        INSERT INTO review_schedule (section, topic, repetitions, interval_days, ease, due_date, last_accuracy)
+        SELECT section, topic, 0, 0, ?, ?, CASE WHEN questions > 0 THEN correct * 100.0 / questions END
+        FROM practice_topics p
+        WHERE NOT EXISTS (SELECT 1 FROM review_schedule r WHERE r.section = p.section AND r.topic = p.topic)
+    ''', (INITIAL_EASE, (today or date.today()).isoformat()))
+
+
+def mark_reviewed(cursor, topics, quality: int = None, today: date = None) -> int:
+    """Review ``topics`` [(section, topic), ...] today in one batch (caller commits)
+    
+    Each topic is graded with ``quality``, or from its last practice
+    accuracy, and its unreviewed sessions are flagged reviewed. Returns the
+    number of sessions flagged.
+    """
+    day = (today or date.today()).isoformat()
+    topics = list(dict.fromkeys(tuple(t) for t in topics))
+    for section, topic in topics:
+        row = cursor.execute("SELECT last_accuracy FROM review_schedule WHERE section = ? AND topic = ?",
+                             (section, topic)).fetchone()
+        accuracy = row['last_accuracy'] if row and row['last_accuracy'] is not None else 0
+        # An explicit review always counts, even on a day already graded
+        _grade(cursor, section, topic, day, accuracy, quality, force=True)
+    cursor.executemany(
+        "UPDATE practice_tracker SET reviewed = 1 WHERE section = ? AND topic = ? AND NOT reviewed", topics
+    )
+    # rowcount sums the batch and, unlike total_changes, leaves out trigger writes
+    return max(cursor.rowcount, 0)
+
+
+# CROSS JOIN keeps review_schedule outermost, so idx_review_schedule_due
+# yields the due rows already in order
+REVIEW_QUEUE_QUERY = '''
+    SELECT r.section, r.topic, r.due_date, r.interval_days, r.repetitions, r.ease,
+           r.last_reviewed, r.last_accuracy, p.sessions, p.questions
+    FROM review_schedule r CROSS JOIN practice_topics p ON p.section = r.section AND p.topic = r.topic
+    WHERE r.due_date <= ?
+    ORDER BY r.due_date, r.section, r.topic
+    LIMIT ?
+'''
+
+
+def review_counts(conn, today: date = None) -> dict:
+    """Topics due now and over the next week (index range counts)"""
+    today = today or date.today()
+    count = '''
+        SELECT COUNT(*) FROM review_schedule r
+        CROSS JOIN practice_topics p ON p.section = r.section AND p.topic = r.topic
+        WHERE r.due_date <= ?
+    '''
+    due = conn.execute(count, (today.isoformat(),)).fetchone()[0]
+    week = conn.execute(count, ((today + timedelta(days=7)).isoformat(),)).fetchone()[0]
+    return {'due': due, 'next_7_days': week - due}
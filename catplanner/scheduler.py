@@ -0,0 +1,279 @@
+# scheduler.py - adaptive study plan for CAT Planner
+#
+# Splits every syllabus topic into its sub-topics, scores each by weakness
+# (confidence, practice accuracy, difficulty mastery and mock percentiles)
+# and greedily fills the weeks up to the exam with the highest-scoring work,
+# within the user's daily hours. A sub-topic's score decays as hours are
+# given to it, so weak topics recur across weeks instead of taking one whole.
+import heapq
+import math
+from datetime import date, timedelta
+
+DEFAULT_DAILY_HOURS = 3.0
+DEFAULT_PLAN_WEEKS = 12
+
+# Settings read by the planner (exam_date is an ISO date)
+PLAN_SETTINGS = {'exam_date': "exam_date", 'daily_hours': "plan.daily_hours"}
+# "1" to replan whenever PLAN_INPUT_TABLES change (checked by the app)
+AUTO_REBALANCE_SETTING = "plan.auto_rebalance"
+
+PRIORITY_WEIGHTS = {'High': 1.5, 'Medium': 1.0, 'Low': 0.6}
+
+# Hours per sub-topic: BASE_HOURS when mastered, up to BASE + EXTRA when not
+BASE_HOURS = 1.0
+EXTRA_HOURS = 5.0
+# Largest slice of one sub-topic given out at a time
+BLOCK_HOURS = 2.0
+# A topic's blocks lose half their score after this many hours in one week,
+# so a week spreads over several topics
+TOPIC_WEEK_HOURS = 4.0
+# Questions of practice after which accuracy counts as much as confidence
+PRACTICE_PRIOR_QUESTIONS = 50
+# Share of the mastery estimate that comes from section-wide signals
+SECTION_SHARE = 0.25
+# Even a mastered topic keeps this much weight, for revision
+MIN_WEAKNESS = 0.2
+
+MOCK_HOURS = 3.0  # a full mock plus its analysis
+MOCK_PHASE = 0.4  # final share of the weeks with a weekly mock
+
+
+class StudyUnit:
+    """One sub-topic competing for study hours"""
+    
+    __slots__ = ('section', 'topic', 'sub_topic', 'weight', 'hours', 'remaining')
+    
+    def __init__(self, section: str, topic: str, sub_topic: str, weight: float, hours: float):
+        self.section = section
+        self.topic = topic
+        self.sub_topic = sub_topic
+        self.weight = weight
+        self.hours = hours
+        self.remaining = hours
+    
+    def score(self) -> float:
+        """Priority of the next block: weight, tapering as hours are assigned"""
+        return self.weight * (0.5 + 0.5 * self.remaining / self.hours)
+
+
+def _split_sub_topics(text: str, fallback: str) -> list:
+    parts = [p.strip() for p in (text or "").split(",")]
+    return [p for p in parts if p] or [fallback]
+
+
+def build_units(topics, practice: dict = None, section_signals: dict = None) -> list:
+    """StudyUnits for syllabus ``topics`` (dict-like rows)
+    
+    ``practice`` maps (section, topic) -> (questions, correct) and
+    ``section_signals`` maps section -> a 0-1 mastery estimate from
+    difficulty mastery and mock percentiles.
+    """
+    practice = {(s, t.lower()): v for (s, t), v in (practice or {}).items()}
+    section_signals = section_signals or {}
+    units = []
+    for row in topics:
+        section, topic = row['section'], row['main_topic']
+        mastery = (row['confidence'] or 0) / 100
+        # Blend in practice accuracy, trusting it more the more questions back it
+        questions, correct = practice.get((section, topic.lower()), (0, 0))
+        if questions:
+            prior = PRACTICE_PRIOR_QUESTIONS
+            mastery = (mastery * prior + correct) / (prior + questions)
+        if section in section_signals:
+            mastery = (1 - SECTION_SHARE) * mastery + SECTION_SHARE * section_signals[section]
+        weakness = min(max(1 - mastery, 0), 1)
+        
+        weight = PRIORITY_WEIGHTS.get(row['priority'], 1.0) * max(weakness, MIN_WEAKNESS)
+        hours = BASE_HOURS + EXTRA_HOURS * weakness
+        if row['studied']:
+            hours /= 2
+        # Whole half-hours keep the blocks and day splits tidy
+        hours = max(round(hours * 2) / 2, 0.5)
+        sub_topics = _split_sub_topics(row['sub_topics'], topic)
+        for sub_topic in sub_topics:
+            units.append(StudyUnit(section, topic, sub_topic, weight, hours))
+    return units
+
+
+def _hours(hours: float) -> str:
+    return f"{round(hours * 2) / 2:g}h"
+
+
+def _week_target(tasks: list, mocks: int) -> str:
+    """One-line summary of a week's allocations"""
+    by_topic = {}
+    for task in tasks:
+        entry = by_topic.setdefault(task['topic'], [0.0, []])
+        entry[0] += task['hours']
+        if task['sub_topic'] != task['topic'] and task['sub_topic'] not in entry[1]:
+            entry[1].append(task['sub_topic'])
+    ranked = sorted(by_topic.items(), key=lambda item: -item[1][0])
+    parts = []
+    for topic, (hours, subs) in ranked[:3]:
+        detail = f" ({', '.join(subs[:2])}{', …' if len(subs) > 2 else ''})" if subs else ""
+        parts.append(f"{topic}{detail} {_hours(hours)}")
+    if len(ranked) > 3:
+        parts.append(f"+{len(ranked) - 3} more")
+    if mocks:
+        parts.append(f"{mocks} mock{'s' if mocks > 1 else ''}")
+    return " • ".join(parts) or "Revision"
+
+
+def _split_days(tasks: list, days: int, daily_hours: float) -> list:
+    """Lay a week's tasks out over its days, in order, ``daily_hours`` a day"""
+    plan = [[] for _ in range(days)]
+    day, used = 0, 0.0
+    for task in tasks:
+        left = task['hours']
+        while left > 1e-9 and day < days:
+            take = min(left, daily_hours - used)
+            plan[day].append((task['topic'], task['sub_topic'], take))
+            left -= take
+            used += take
+            if daily_hours - used < 1e-9:
+                day, used = day + 1, 0.0
+    return plan
+
+
+def build_schedule(units: list, start: date, exam: date, daily_hours: float = DEFAULT_DAILY_HOURS) -> list:
+    """Allocate ``units`` to the weeks from ``start`` to ``exam``
+    
+    Each week takes the highest-scoring blocks off a heap until its hours
+    run out; the final MOCK_PHASE of the weeks reserves time for one mock a
+    week and the last week for two. Returns one dict per week with its
+    dates, tasks, per-day layout and a one-line target.
+    """
+    span = max((exam - start).days, 1)
+    n_weeks = max(-(-span // 7), 1)
+    mock_from = n_weeks - max(round(n_weeks * MOCK_PHASE), 1)
+    
+    weeks = []
+    for index in range(n_weeks):
+        week_start = start + timedelta(days=7 * index)
+        week_end = min(week_start + timedelta(days=6), exam)
+        days = (week_end - week_start).days + 1
+        mocks = 0 if index < mock_from else 2 if index == n_weeks - 1 else 1
+        capacity = max(math.floor((daily_hours * days - mocks * MOCK_HOURS) * 2) / 2, 0)
+        
+        # Max-heap on score, rebuilt each week since the topic taper resets;
+        # seq keeps ties in syllabus order
+        heap = [(-unit.score(), seq, unit) for seq, unit in enumerate(units) if unit.remaining > 1e-9]
+        heapq.heapify(heap)
+        seq = len(units)
+        topic_hours, tasks = {}, {}
+        while heap and capacity > 1e-9:
+            key, _, unit = heapq.heappop(heap)
+            # Scores only fall within a week, so a stale key is re-pushed
+            # with its current score until the top of the heap is fresh
+            current = unit.score() / (1 + topic_hours.get(unit.topic, 0) / TOPIC_WEEK_HOURS)
+            if current < -key - 1e-12:
+                seq += 1
+                heapq.heappush(heap, (-current, seq, unit))
+                continue
+            block = min(BLOCK_HOURS, unit.remaining, capacity)
+            capacity -= block
+            unit.remaining -= block
+            topic_hours[unit.topic] = topic_hours.get(unit.topic, 0) + block
+            task = tasks.setdefault(id(unit), {'section': unit.section, 'topic': unit.topic,
+                                               'sub_topic': unit.sub_topic, 'hours': 0.0})
+            task['hours'] += block
+            if unit.remaining > 1e-9:
+                seq += 1
+                heapq.heappush(heap, (-unit.score() / (1 + topic_hours[unit.topic] / TOPIC_WEEK_HOURS), seq, unit))
+        tasks = list(tasks.values())
+        
+        week_tasks = tasks + [{'section': 'Mock', 'topic': 'Mock test', 'sub_topic': 'Mock test',
+                               'hours': MOCK_HOURS} for _ in range(mocks)]
+        weeks.append({
+            'week_number': index + 1,
+            'start_date': week_start.isoformat(),
+            'end_date': week_end.isoformat(),
+            'target': _week_target(tasks, mocks),
+            'tasks': week_tasks,
+            'days': _split_days(week_tasks, days, daily_hours),
+        })
+    return weeks
+
+
+def format_days(week: dict) -> str:
+    """Day-by-day tasks of a planned week as text (stored in study_plan.notes)"""
+    start = date.fromisoformat(week['start_date'])
+    lines = []
+    for offset, tasks in enumerate(week['days']):
+        if tasks:
+            day = (start + timedelta(days=offset)).strftime("%a %d %b")
+            lines.append(f"{day}: " + "; ".join(
+                f"{topic} – {sub} {_hours(hours)}" if sub != topic else f"{topic} {_hours(hours)}"
+                for topic, sub, hours in tasks
+            ))
+    return "\n".join(lines)
+
+# =============================================================================
+# STUDY PLAN TABLE
+# =============================================================================
+
+# Tables whose changes can move the plan
+PLAN_INPUT_TABLES = ('syllabus', 'difficulty', 'practice_tracker', 'mock_tests')
+
+RECENT_MOCKS = 3
+
+
+def plan_settings(conn, today: date) -> tuple:
+    """(exam date, daily hours) from settings, with defaults"""
+    rows = conn.execute("SELECT key, value FROM settings WHERE key IN (?, ?)",
+                        tuple(PLAN_SETTINGS.values())).fetchall()
+    values = {row['key']: row['value'] for row in rows}
+    try:
+        exam = date.fromisoformat(values[PLAN_SETTINGS['exam_date']])
+    except (KeyError, TypeError, ValueError):
+        exam = today + timedelta(weeks=DEFAULT_PLAN_WEEKS)
+    try:
+        daily_hours = float(values[PLAN_SETTINGS['daily_hours']])
+    except (KeyError, TypeError, ValueError):
+        daily_hours = DEFAULT_DAILY_HOURS
+    return exam, daily_hours
+
+
+def section_signals(conn) -> dict:
+    """0-1 mastery per section from difficulty mastery and recent mock percentiles"""
+    signals = {}
+    for row in conn.execute("SELECT section, AVG(mastery) AS mastery FROM difficulty GROUP BY section"):
+        signals.setdefault(row['section'], []).append((row['mastery'] or 0) / 100)
+    mocks = conn.execute(f'''
+        SELECT varc_percentile, dilr_percentile, qa_percentile FROM mock_tests
+        ORDER BY date DESC LIMIT {RECENT_MOCKS}
+    ''').fetchall()
+    for section in ('VARC', 'DILR', 'QA'):
+        values = [row[f'{section.lower()}_percentile'] for row in mocks]
+        values = [v for v in values if v is not None]
+        if values:
+            signals.setdefault(section, []).append(sum(values) / len(values) / 100)
+    return {section: sum(v) / len(v) for section, v in signals.items()}
+
+
+def rebalance(conn, today: date = None) -> list:
+    """Replace the study plan's unfinished weeks with a fresh schedule (caller commits)
+    
+    Completed weeks are kept as they are; the new weeks run from ``today``
+    to the exam and are numbered after them. Returns the planned weeks.
+    """
+    today = today or date.today()
+    exam, daily_hours = plan_settings(conn, today)
+    topics = conn.execute(
+        "SELECT section, main_topic, sub_topics, confidence, priority, studied FROM syllabus ORDER BY section, id"
+    ).fetchall()
+    practice = {(row['section'], row['topic']): (row['questions'], row['correct'])
+                for row in conn.execute("SELECT section, topic, questions, correct FROM practice_topics")}
+    units = build_units(topics, practice, section_signals(conn))
+    weeks = build_schedule(units, today, max(exam, today + timedelta(days=1)), daily_hours)
+    
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM study_plan WHERE NOT completed")
+    cursor.execute("SELECT COALESCE(MAX(week_number), 0) FROM study_plan")
+    first = cursor.fetchone()[0] + 1
+    cursor.executemany('''
+        INSERT INTO study_plan (week_number, week_label, target, start_date, end_date, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(first + i, f"Week {first + i}", week['target'], week['start_date'], week['end_date'], format_days(week))
+          for i, week in enumerate(weeks)])
+    return weeks
@@ -0,0 +1,138 @@
+# schema.py - dialect-neutral table definitions and compiled statements
+from functools import lru_cache
+
+# =============================================================================
+# TABLES
+# =============================================================================
+
+# SQLAlchemy Core mirror of the user tables created in migrations.py. The
+# migrations stay the source of truth for the physical schema; these are used
+# to build statements that don't depend on string formatting or one dialect.
+# SQLAlchemy is imported on first use so reads never pay for it.
+
+
+@lru_cache(maxsize=None)
+def tables() -> dict:
+    """SQLAlchemy Table objects of the user tables, by name"""
+    from sqlalchemy import Column, Float, Integer, MetaData, Table, Text
+    
+    metadata = MetaData()
+    
+    syllabus = Table(
+        'syllabus', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('section', Text, nullable=False),
+        Column('main_topic', Text, nullable=False),
+        Column('sub_topics', Text),
+        Column('practice_focus', Text),
+        Column('confidence', Integer),
+        Column('priority', Text),
+        Column('studied', Integer),
+        Column('notes', Text),
+        Column('created_at', Text),
+        Column('updated_at', Text),
+    )
+    
+    difficulty = Table(
+        'difficulty', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('section', Text, nullable=False),
+        Column('topic_category', Text, nullable=False),
+        Column('level', Text),
+        Column('studied', Integer),
+        Column('mastery', Integer),
+        Column('notes', Text),
+        Column('created_at', Text),
+        Column('updated_at', Text),
+    )
+    
+    study_plan = Table(
+        'study_plan', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('week_number', Integer, nullable=False),
+        Column('week_label', Text, nullable=False),
+        Column('target', Text, nullable=False),
+        Column('completed', Integer),
+        Column('start_date', Text),
+        Column('end_date', Text),
+        Column('notes', Text),
+        Column('created_at', Text),
+        Column('updated_at', Text),
+    )
+    
+    practice_tracker = Table(
+        'practice_tracker', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Text, nullable=False),
+        Column('section', Text, nullable=False),
+        Column('topic', Text, nullable=False),
+        Column('questions', Integer),
+        Column('correct', Integer),
+        Column('wrong', Integer),
+        Column('accuracy', Float),
+        Column('time_taken', Text),
+        Column('time_seconds', Integer),
+        Column('reviewed', Integer),
+        Column('notes', Text),
+        Column('created_at', Text),
+        Column('updated_at', Text),
+    )
+    
+    mock_tests = Table(
+        'mock_tests', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Text, nullable=False),
+        Column('test_name', Text, nullable=False),
+        Column('varc_score', Float),
+        Column('varc_percentile', Float),
+        Column('dilr_score', Float),
+        Column('dilr_percentile', Float),
+        Column('qa_score', Float),
+        Column('qa_percentile', Float),
+        Column('total_score', Float),
+        Column('overall_percentile', Float),
+        Column('time_taken', Text),
+        Column('time_seconds', Integer),
+        Column('notes', Text),
+        Column('created_at', Text),
+    )
+    
+    return {table.name: table for table in metadata.sorted_tables}
+
+# =============================================================================
+# COMPILED STATEMENTS
+# =============================================================================
+
+
+@lru_cache(maxsize=256)
+def update_statement(table: str, columns: tuple) -> tuple:
+    """``(sql, parameter order)`` for ``UPDATE table SET columns... WHERE id = :row_id``
+    
+    Compiled once per column set and reused; ``updated_at`` is stamped when
+    the table has it. Unknown columns raise ValueError instead of reaching
+    the SQL text.
+    """
+    from sqlalchemy import bindparam, func, update
+    from sqlalchemy.dialects import sqlite
+    
+    t = tables().get(table)
+    if t is None:
+        raise ValueError(f"Unknown table: {table}")
+    unknown = [c for c in columns if c not in t.c or c == 'id']
+    if unknown:
+        raise ValueError(f"Unknown {table} column(s): {', '.join(unknown)}")
+    
+    values = {c: bindparam(c) for c in columns}
+    if 'updated_at' in t.c and 'updated_at' not in columns:
+        values['updated_at'] = func.current_timestamp()
+    # sqlite3 takes positional "?" parameters
+    dialect = sqlite.dialect(paramstyle='qmark')
+    compiled = update(t).where(t.c.id == bindparam('row_id')).values(values).compile(dialect=dialect)
+    return str(compiled), compiled.positiontup
+
+
+def bind_update(table: str, id: int, values: dict) -> tuple:
+    """``(sql, params)`` updating one row of ``table`` with ``values``"""
+    sql, order = update_statement(table, tuple(values))
+    bound = {**values, 'row_id': id}
+    return sql, [bound[name] for name in order]
@@ -0,0 +1,274 @@
+# storage.py - SQLite connection management for CAT Planner
+import atexit
+import functools
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# =============================================================================
+# STORAGE TUNING
+# =============================================================================
+
+# Defaults for the PRAGMAs applied to every pooled connection. Each key can be
+# overridden by a ``storage.<key>`` row in the settings table or by a
+# ``CATPLANNER_<KEY>`` environment variable (the environment wins).
+STORAGE_DEFAULTS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,
+    'busy_timeout': 5000,
+    'busy_retries': 5,
+    'checkpoint_interval': 300,
+}
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+SETTINGS_PREFIX = "storage."
+
+
+def _coerce_storage_value(key: str, value) -> object:
+    """Validate a tuning value (PRAGMAs can't take bound parameters)"""
+    if key in ('journal_mode', 'synchronous'):
+        value = str(value).upper()
+        allowed = JOURNAL_MODES if key == 'journal_mode' else SYNCHRONOUS_MODES
+        if value not in allowed:
+            raise ValueError(f"Invalid {key}: {value!r} (expected one of {sorted(allowed)})")
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {key}: {value!r} (expected an integer)") from None
+
+
+def load_storage_config(settings: dict = None, overrides: dict = None) -> dict:
+    """Resolve tuning from defaults, ``storage.*`` settings, environment and explicit overrides"""
+    config = dict(STORAGE_DEFAULTS)
+    settings = settings or {}
+    for key in STORAGE_DEFAULTS:
+        if SETTINGS_PREFIX + key in settings:
+            config[key] = settings[SETTINGS_PREFIX + key]
+        env_value = os.environ.get(f"CATPLANNER_{key.upper()}")
+        if env_value is not None:
+            config[key] = env_value
+    config.update(overrides or {})
+    return {key: _coerce_storage_value(key, value) for key, value in config.items()}
+
+
+def apply_pragmas(conn: sqlite3.Connection, config: dict):
+    """Apply tuning PRAGMAs to a connection"""
+    conn.execute(f"PRAGMA busy_timeout = {config['busy_timeout']}")
+    conn.execute(f"PRAGMA journal_mode = {config['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {config['synchronous']}")
+    conn.execute(f"PRAGMA mmap_size = {config['mmap_size']}")
+    conn.execute(f"PRAGMA cache_size = {config['cache_size']}")
+
+
+def is_busy_error(error: Exception) -> bool:
+    """True for lock contention errors that are worth retrying"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(method):
+    """Retry a Database method with exponential backoff when SQLite reports a lock
+
+    Only the outermost call retries: a nested call runs inside its caller's
+    transaction, which has to be restarted as a whole.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        retries = self.pool.config['busy_retries']
+        for attempt in range(retries + 1):
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if attempt == retries or not is_busy_error(e) or self.pool.in_checkout():
+                    raise
+                self.pool.stats['busy_retries'] += 1
+                time.sleep(min(0.05 * 2 ** attempt, 1.0) * (0.5 + random.random()))
+    return wrapper
+
+# =============================================================================
+# CONNECTION POOL
+# =============================================================================
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections checked out per thread
+    
+    A thread holds at most one connection at a time; nested checkouts on the
+    same thread reuse it. Released connections go back to an idle list capped
+    at ``size`` so bursts of Streamlit sessions don't leave extra handles open.
+    Connections that sat idle longer than ``health_check_interval`` seconds are
+    probed with ``SELECT 1`` before being handed out again.
+    """
+    
+    def __init__(self, db_path: str, size: int = None,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 config: dict = None):
+        self.db_path = db_path
+        self.size = size or int(os.environ.get("CATPLANNER_POOL_SIZE", DEFAULT_POOL_SIZE))
+        self.health_check_interval = health_check_interval
+        self.config = config or load_storage_config()
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0, 'failed_checks': 0,
+                      'busy_retries': 0, 'checkpoints': 0}
+        self._last_checkpoint = time.monotonic()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, self.config)
+        self.stats['created'] += 1
+        return conn
+    
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Probe an idle connection before reuse"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self.stats['failed_checks'] += 1
+            return False
+    
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection that will not be reused"""
+        self.stats['discarded'] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle connection or open a new one"""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                item = self._idle.pop() if self._idle else None
+            
+            if item is None:
+                return self._connect()
+            
+            conn, last_used = item
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                self.stats['reused'] += 1
+                return conn
+            self._discard(conn)
+    
+    def in_checkout(self) -> bool:
+        """True while the current thread holds a connection"""
+        return getattr(self._local, 'conn', None) is not None
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Check out the current thread's connection"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            return conn
+        
+        conn = self._checkout()
+        local.conn = conn
+        local.depth = 1
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection once the outermost checkout on this thread ends"""
+        local = self._local
+        local.depth -= 1
+        if local.depth > 0:
+            return
+        local.conn = None
+        
+        # Never hand a half-finished transaction to the next caller
+        if conn.in_transaction:
+            conn.rollback()
+        self._maybe_checkpoint(conn)
+        self._checkin(conn)
+    
+    def _checkin(self, conn: sqlite3.Connection):
+        """Keep a released connection idle for reuse, or close it"""
+        with self._lock:
+            if not self._closed and len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._discard(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Context manager around acquire/release"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def configure(self, config: dict):
+        """Switch to new tuning and apply it to idle connections"""
+        with self._lock:
+            self.config = config
+            idle = list(self._idle)
+        for conn, _ in idle:
+            apply_pragmas(conn, config)
+    
+    def checkpoint(self, mode: str = "PASSIVE") -> tuple:
+        """Run a WAL checkpoint; returns (busy, log_frames, checkpointed_frames)"""
+        mode = mode.upper()
+        if mode not in {'PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'}:
+            raise ValueError(f"Invalid checkpoint mode: {mode!r}")
+        with self.connection() as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        self._last_checkpoint = time.monotonic()
+        self.stats['checkpoints'] += 1
+        return tuple(row)
+    
+    def _maybe_checkpoint(self, conn: sqlite3.Connection):
+        """Fold the WAL back into the main file every ``checkpoint_interval`` seconds"""
+        interval = self.config['checkpoint_interval']
+        if self.config['journal_mode'] != 'WAL' or interval <= 0:
+            return
+        if time.monotonic() - self._last_checkpoint < interval:
+            return
+        self._last_checkpoint = time.monotonic()
+        try:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self.stats['checkpoints'] += 1
+        except sqlite3.Error:
+            pass
+    
+    def status(self) -> dict:
+        """Pool counters for display"""
+        with self._lock:
+            idle = len(self._idle)
+        return {'size': self.size, 'idle': idle, **self.stats}
+    
+    def close(self):
+        """Checkpoint, close idle connections and refuse further checkouts"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+        atexit.unregister(self.close)
+        if idle and self.config['journal_mode'] == 'WAL':
+            try:
+                idle[0][0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+        for conn, _ in idle:
+            self._discard(conn)
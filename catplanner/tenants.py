@@ -0,0 +1,143 @@
+# tenants.py - one database file per user profile behind an LRU bound
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .database import DB_PATH, Database
+
+# =============================================================================
+# PROFILE DATABASES
+# =============================================================================
+
+DEFAULT_PROFILE = "default"
+DEFAULT_PROFILES_DIR = "profiles"
+DEFAULT_MAX_OPEN = 32
+DEFAULT_IDLE_GRACE = 30.0
+
+PROFILE_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+
+def validate_profile(profile: str) -> str:
+    """Return ``profile`` if it is safe to use as a file name"""
+    if not isinstance(profile, str) or not PROFILE_PATTERN.match(profile):
+        raise ValueError("Profile names use letters, digits, '-' and '_' (up to 64 characters)")
+    return profile
+
+
+class TenantManager:
+    """Opens one Database per profile and keeps at most ``max_open`` of them
+    
+    Every profile gets its own SQLite file, so queries, caches, triggers and
+    write locks never mix users. The default profile keeps using ``DB_PATH``
+    so a single-user install sees its existing data.
+    
+    The least recently used database is closed when the bound is exceeded,
+    unless it is leased or was used in the last ``idle_grace`` seconds (a
+    Streamlit run holding it without a lease); the bound is soft while every
+    open database is busy.
+    """
+    
+    def __init__(self, profiles_dir: str = None, max_open: int = None,
+                 idle_grace: float = DEFAULT_IDLE_GRACE, default_path: str = DB_PATH, **db_options):
+        self.profiles_dir = profiles_dir or os.environ.get("CATPLANNER_PROFILES_DIR", DEFAULT_PROFILES_DIR)
+        self.max_open = max_open or int(os.environ.get("CATPLANNER_MAX_PROFILES", DEFAULT_MAX_OPEN))
+        self.idle_grace = idle_grace
+        self.default_path = default_path
+        self.db_options = db_options
+        self.stats = {'hits': 0, 'opened': 0, 'evicted': 0}
+        self._open = OrderedDict()
+        self._leases = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+    
+    def path_for(self, profile: str) -> str:
+        """Database file of a profile"""
+        if validate_profile(profile) == DEFAULT_PROFILE:
+            return self.default_path
+        return os.path.join(self.profiles_dir, f"{profile}.db")
+    
+    def get(self, profile: str) -> Database:
+        """Open (or reuse) a profile's database"""
+        return self._checkout(profile, lease=False)
+    
+    @contextmanager
+    def lease(self, profile: str):
+        """Hold a profile's database open for the duration of a block"""
+        db = self._checkout(profile, lease=True)
+        try:
+            yield db
+        finally:
+            with self._lock:
+                self._leases[profile] -= 1
+                if not self._leases[profile]:
+                    del self._leases[profile]
+                evicted = self._evict()
+            self._close(evicted)
+    
+    def _checkout(self, profile: str, lease: bool) -> Database:
+        path = self.path_for(profile)
+        with self._lock:
+            db = self._open.get(profile)
+            if db is not None:
+                self._open.move_to_end(profile)
+                self._touch(profile, lease)
+                self.stats['hits'] += 1
+                return db
+        
+        # Open outside the lock: a first open runs migrations and seeding
+        if profile != DEFAULT_PROFILE:
+            os.makedirs(self.profiles_dir, exist_ok=True)
+        db = Database(path, **self.db_options)
+        
+        with self._lock:
+            existing = self._open.get(profile)
+            if existing is None:
+                self._open[profile] = db
+                self.stats['opened'] += 1
+            self._touch(profile, lease)
+            evicted = self._evict()
+        if existing is not None:
+            db.close()
+            db = existing
+        self._close(evicted)
+        return db
+    
+    def _touch(self, profile: str, lease: bool):
+        """Record a use (caller holds ``_lock``)"""
+        self._last_used[profile] = time.monotonic()
+        if lease:
+            self._leases[profile] = self._leases.get(profile, 0) + 1
+    
+    @staticmethod
+    def _close(databases):
+        for db in databases:
+            db.close()
+    
+    def _evict(self) -> list:
+        """Drop LRU databases over the bound (caller holds ``_lock``); returns them for closing"""
+        evicted = []
+        now = time.monotonic()
+        for profile in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            if profile in self._leases or now - self._last_used.get(profile, 0) < self.idle_grace:
+                continue
+            evicted.append(self._open.pop(profile))
+            self._last_used.pop(profile, None)
+            self.stats['evicted'] += 1
+        return evicted
+    
+    def status(self) -> dict:
+        """Counters for display"""
+        with self._lock:
+            return {'open': len(self._open), 'max_open': self.max_open, 'leased': len(self._leases), **self.stats}
+    
+    def close(self):
+        """Close every open database"""
+        with self._lock:
+            open_dbs, self._open = list(self._open.values()), OrderedDict()
+            self._last_used.clear()
+        self._close(open_dbs)
@@ -0,0 +1,139 @@
+# writequeue.py - write-behind queue for high-frequency row edits
+import atexit
+import os
+import threading
+
+from .schema import bind_update
+from .storage import retry_on_busy
+
+# =============================================================================
+# WRITE-BEHIND QUEUE
+# =============================================================================
+
+DEFAULT_FLUSH_SECONDS = 2.0
+
+# Tables (and columns) whose per-row edits may be deferred
+WRITE_BEHIND_COLUMNS = {
+    'syllabus': ('confidence', 'studied', 'priority', 'notes'),
+    'difficulty': ('level', 'mastery', 'studied', 'notes'),
+}
+
+
+class WriteBehindQueue:
+    """Coalesces per-row updates and writes them in one transaction
+    
+    Each ``enqueue`` merges into the pending changes for its row, so dragging
+    a slider through ten values costs one UPDATE. Pending rows are written
+    when ``flush_interval`` seconds have passed since the first unsaved edit,
+    when ``flush`` is called (page change, explicit save, close), or just
+    before any other write to the same table.
+    """
+    
+    def __init__(self, db, flush_interval: float = None):
+        self.db = db
+        self.pool = db.pool
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            float(os.environ.get("CATPLANNER_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+        self.stats = {'queued': 0, 'coalesced': 0, 'flushes': 0, 'rows_written': 0}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.close)
+    
+    def enqueue(self, table: str, id: int, **fields):
+        """Queue an update of one row"""
+        allowed = WRITE_BEHIND_COLUMNS.get(table)
+        if allowed is None:
+            raise ValueError(f"Writes to {table} can't be deferred")
+        unknown = set(fields) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown {table} column(s): {', '.join(sorted(unknown))}")
+        
+        with self._lock:
+            key = (table, int(id))
+            if key in self._pending:
+                self.stats['coalesced'] += 1
+            self._pending.setdefault(key, {}).update(fields)
+            self.stats['queued'] += 1
+            self._arm()
+    
+    def _arm(self):
+        """Start the flush timer if rows are waiting (caller holds ``_lock``)"""
+        if self._timer is None and self._pending and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def pending(self, table: str = None) -> int:
+        """Number of rows with unsaved changes"""
+        with self._lock:
+            return sum(1 for t, _ in self._pending if table is None or t == table)
+    
+    def overlay(self, table: str, df):
+        """Apply unsaved changes to a frame read from ``table``"""
+        with self._lock:
+            changes = {id: fields for (t, id), fields in self._pending.items() if t == table}
+        if not changes or df.empty:
+            return df
+        df = df.copy()
+        rows = df['id'].isin(list(changes))
+        for index, id in df.loc[rows, 'id'].items():
+            for col, value in changes[int(id)].items():
+                df.at[index, col] = value
+        return df
+    
+    def flush(self, tables=None) -> int:
+        """Write pending changes (only for ``tables`` if given); returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                batch = {k: v for k, v in self._pending.items() if tables is None or k[0] in tables}
+                for key in batch:
+                    del self._pending[key]
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._arm()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                # Put the batch back under any edits that arrived meanwhile
+                with self._lock:
+                    for key, fields in batch.items():
+                        self._pending[key] = {**fields, **self._pending.get(key, {})}
+                    self._arm()
+                raise
+            finally:
+                self.db.cache.invalidate(*{table for table, _ in batch})
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += len(batch)
+        return len(batch)
+    
+    @retry_on_busy
+    def _write(self, batch: dict):
+        # One executemany per (table, set of columns) so rows share a statement
+        groups = {}
+        for (table, id), fields in batch.items():
+            sql, params = bind_update(table, id, dict(sorted(fields.items())))
+            groups.setdefault(sql, []).append(params)
+        
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in groups.items():
+                    conn.executemany(sql, params)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def close(self):
+        """Cancel the timer and write whatever is pending"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        atexit.unregister(self.close)
+        self.flush()
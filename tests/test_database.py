@@ -0,0 +1,739 @@
+# test_database.py - connection pool, query cache, write-behind queue, profiles,
+# schema migrations, trigger-maintained rollups, imports, practice pages, query
+# plans, trends and durations
+#
+# Run from the repo root:
+#
+#     python -m pytest -q
+import random
+import sqlite3
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from benchmarks.check_backends import workload
+from catplanner.cache import QueryCache
+from catplanner.database import Database, plan_problems
+from catplanner.durations import parse_duration
+from catplanner.export import write_bundle
+from catplanner.migrations import MIGRATIONS, SCHEMA_VERSION, SCHEMA_VERSION_KEY, _initial_schema
+from catplanner.storage import ConnectionPool, retry_on_busy
+from catplanner.tenants import TenantManager
+from catplanner.writequeue import WriteBehindQueue
+
+DAY = "2026-10-17"
+ALL_VERSIONS = [version for version, _, _ in MIGRATIONS]
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "planner.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+def session_ids(db) -> list:
+    with db.get_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM practice_tracker ORDER BY id")]
+
+
+def progress(db, day: str = DAY) -> dict:
+    """goal type -> (achieved, completed)"""
+    return {g['goal_type']: (g['achieved'], g['completed']) for g in db.get_goal_progress(day)}
+
+
+def seed_history(db, rows: int, days: int = 365, topics_per_section: int = 5, seed: int = 42):
+    """Insert ``rows`` random practice sessions over the last ``days`` days, and some mocks"""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days - 1)
+    sessions = []
+    for _ in range(rows):
+        questions = rng.randint(5, 40)
+        correct = rng.randint(0, questions)
+        sessions.append((str(start + timedelta(days=rng.randrange(days))), rng.choice(["VARC", "DILR", "QA"]),
+                         f"Topic {rng.randrange(topics_per_section)}", questions, correct,
+                         questions - correct, correct / questions * 100))
+    with db.get_connection() as conn:
+        conn.executemany('''
+            INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', sessions)
+        conn.executemany("INSERT INTO mock_tests (date, test_name, overall_percentile) VALUES (?, ?, ?)",
+                         [(str(start + timedelta(days=7 * i)), f"Mock {i}", rng.uniform(60, 99))
+                          for i in range(days // 7)])
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+# =============================================================================
+# CONNECTION POOL
+# =============================================================================
+
+def test_pool_hands_each_thread_its_own_connection(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+    try:
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                assert inner is outer
+            assert pool.in_checkout()
+        assert not pool.in_checkout()
+        
+        # Four threads holding a connection at once need four; two stay idle
+        held, release = [], threading.Barrier(5)
+        
+        def hold():
+            with pool.connection() as conn:
+                held.append(conn)
+                release.wait()
+        
+        threads = [threading.Thread(target=hold) for _ in range(4)]
+        for t in threads:
+            t.start()
+        release.wait()
+        for t in threads:
+            t.join()
+        assert len({id(conn) for conn in held}) == 4
+        assert outer in held
+        assert pool.status()['idle'] == 2
+        assert pool.stats['discarded'] == 2
+    finally:
+        pool.close()
+
+
+class BusyStore:
+    """Minimal Database stand-in whose writes hit a lock ``busy`` times"""
+    
+    def __init__(self, tmp_path, busy: int):
+        self.pool = ConnectionPool(str(tmp_path / "busy.db"), size=1)
+        self.busy = busy
+        self.calls = {'outer': 0, 'inner': 0}
+    
+    @retry_on_busy
+    def inner(self):
+        self.calls['inner'] += 1
+        if self.busy:
+            self.busy -= 1
+            raise sqlite3.OperationalError("database is locked")
+    
+    @retry_on_busy
+    def outer(self):
+        self.calls['outer'] += 1
+        with self.pool.connection():
+            self.inner()
+
+
+def test_retry_on_busy_retries_only_the_outermost_call(tmp_path):
+    store = BusyStore(tmp_path, busy=2)
+    try:
+        store.outer()
+        # The nested call raised straight to the caller, which restarted it
+        assert store.calls == {'outer': 3, 'inner': 3}
+        assert store.pool.stats['busy_retries'] == 2
+        
+        store.busy = 1
+        store.inner()
+        assert store.calls['inner'] == 5
+        
+        store.busy, store.pool.config = 10, {**store.pool.config, 'busy_retries': 1}
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            store.outer()
+        assert store.calls['outer'] == 5
+    finally:
+        store.pool.close()
+
+
+# =============================================================================
+# QUERY CACHE
+# =============================================================================
+
+def test_cache_drops_entries_of_written_tables():
+    cache = QueryCache(max_entries=2)
+    cache.put('syllabus', ('syllabus',), cache.snapshot(('syllabus',)), [1])
+    cache.put('both', ('syllabus', 'difficulty'), cache.snapshot(('syllabus', 'difficulty')), [2])
+    assert cache.get('syllabus', ('syllabus',)) == (True, [1])
+    
+    cache.invalidate('difficulty')
+    assert cache.get('both', ('syllabus', 'difficulty')) == (False, None)
+    assert cache.get('syllabus', ('syllabus',)) == (True, [1])
+    
+    # A read that raced a write isn't stored
+    snapshot = cache.snapshot(('difficulty',))
+    cache.invalidate('difficulty')
+    cache.put('raced', ('difficulty',), snapshot, [3])
+    assert cache.get('raced', ('difficulty',)) == (False, None)
+    
+    # The least recently used entry goes first
+    cache.put('a', ('mock_tests',), cache.snapshot(('mock_tests',)), [4])
+    cache.get('syllabus', ('syllabus',))
+    cache.put('b', ('mock_tests',), cache.snapshot(('mock_tests',)), [5])
+    assert cache.get('a', ('mock_tests',)) == (False, None)
+    assert cache.get('syllabus', ('syllabus',)) == (True, [1])
+    assert cache.stats['evictions'] == 1
+
+
+def test_cached_getters_follow_writes(db):
+    first = db.get_syllabus()
+    first.loc[:, 'notes'] = "changed by the caller"
+    assert db.get_syllabus()['notes'].ne("changed by the caller").all()
+    hits = db.cache.stats['hits']
+    db.get_syllabus()
+    assert db.cache.stats['hits'] == hits + 1
+    
+    id = int(first['id'].iloc[0])
+    db.update_syllabus(id, notes="updated")
+    assert db.get_syllabus().set_index('id').at[id, 'notes'] == "updated"
+    assert db.cache.stats['hits'] == hits + 1
+
+
+def test_writes_flush_queued_edits_of_their_tables_first(db):
+    syllabus_id = int(db.get_syllabus()['id'].iloc[0])
+    difficulty_id = int(db.get_difficulty()['id'].iloc[0])
+    db.queue_update('syllabus', syllabus_id, confidence=3, notes="queued")
+    db.queue_update('difficulty', difficulty_id, mastery=40)
+    
+    # The direct write lands on top of the queued edit instead of under it
+    db.update_syllabus(syllabus_id, notes="saved")
+    assert db.writes.pending('syllabus') == 0
+    assert db.writes.pending('difficulty') == 1
+    row = db.get_syllabus().set_index('id').loc[syllabus_id]
+    assert (row['confidence'], row['notes']) == (3, "saved")
+
+
+# =============================================================================
+# WRITE-BEHIND QUEUE
+# =============================================================================
+
+def test_queued_edits_coalesce_and_overlay_reads(db):
+    queue = WriteBehindQueue(db, flush_interval=0)
+    try:
+        syllabus = db.get_syllabus()
+        id = int(syllabus['id'].iloc[0])
+        for confidence in range(10, 60, 10):
+            queue.enqueue('syllabus', id, confidence=confidence)
+        queue.enqueue('syllabus', id, notes="dragged")
+        assert queue.pending() == 1
+        assert queue.stats['coalesced'] == 5
+        
+        # Reads still see the stored row until the overlay is applied
+        before = syllabus.set_index('id').at[id, 'confidence']
+        assert db.get_syllabus().set_index('id').at[id, 'confidence'] == before
+        shown = queue.overlay('syllabus', db.get_syllabus()).set_index('id').loc[id]
+        assert (shown['confidence'], shown['notes']) == (50, "dragged")
+        
+        assert queue.flush() == 1
+        stored = db.get_syllabus().set_index('id').loc[id]
+        assert (stored['confidence'], stored['notes']) == (50, "dragged")
+        assert queue.pending() == 0
+        
+        with pytest.raises(ValueError, match="can't be deferred"):
+            queue.enqueue('practice_tracker', 1, questions=5)
+        with pytest.raises(ValueError, match="Unknown syllabus column"):
+            queue.enqueue('syllabus', id, section="QA")
+    finally:
+        queue.close()
+
+
+def test_failed_flush_keeps_edits_under_newer_ones(db, monkeypatch):
+    queue = WriteBehindQueue(db, flush_interval=0)
+    id = int(db.get_difficulty()['id'].iloc[0])
+    queue.enqueue('difficulty', id, mastery=30, notes="first")
+    
+    def locked(batch):
+        queue.enqueue('difficulty', id, mastery=60)
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(queue, '_write', locked)
+    with pytest.raises(sqlite3.OperationalError):
+        queue.flush()
+    assert queue.overlay('difficulty', db.get_difficulty()).set_index('id').loc[id, ['mastery', 'notes']].tolist() \
+        == [60, "first"]
+    monkeypatch.undo()
+    queue.close()
+    assert db.get_difficulty().set_index('id').loc[id, ['mastery', 'notes']].tolist() == [60, "first"]
+
+
+def test_queue_flushes_on_its_timer(db):
+    queue = WriteBehindQueue(db, flush_interval=0.05)
+    try:
+        id = int(db.get_difficulty()['id'].iloc[0])
+        queue.enqueue('difficulty', id, level="Hard")
+        deadline = time.monotonic() + 5
+        while not queue.stats['flushes'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert queue.pending() == 0
+        assert db.get_difficulty().set_index('id').at[id, 'level'] == "Hard"
+    finally:
+        queue.close()
+
+
+# =============================================================================
+# PROFILES
+# =============================================================================
+
+def is_closed(db) -> bool:
+    try:
+        with db.get_connection():
+            return False
+    except RuntimeError:
+        return True
+
+
+def test_leased_profile_survives_eviction(tmp_path):
+    tenants = TenantManager(str(tmp_path / "profiles"), max_open=2, idle_grace=0,
+                            default_path=str(tmp_path / "default.db"), pool_size=1)
+    try:
+        with tenants.lease("alice") as alice:
+            alice.add_practice_session(DAY, "QA", "Algebra", 10, 5)
+            bob = tenants.get("bob")
+            tenants.get("carol")
+            # alice is least recently used but leased, so bob goes instead
+            assert tenants.status()['open'] == 2
+            assert is_closed(bob)
+            assert len(alice.get_practice_tracker()) == 1
+        
+        tenants.get("dave")
+        assert tenants.stats['evicted'] == 2
+        assert is_closed(alice)
+        # Reopening a profile finds its file again
+        assert len(tenants.get("alice").get_practice_tracker()) == 1
+        assert sorted(p.name for p in (tmp_path / "profiles").glob("*.db")) == [
+            "alice.db", "bob.db", "carol.db", "dave.db"]
+    finally:
+        tenants.close()
+
+
+def test_recently_used_profiles_stay_open(tmp_path):
+    tenants = TenantManager(str(tmp_path / "profiles"), max_open=1, idle_grace=60,
+                            default_path=str(tmp_path / "default.db"), pool_size=1)
+    try:
+        assert tenants.get("default").db_path == str(tmp_path / "default.db")
+        tenants.get("bob")
+        assert (tenants.status()['open'], tenants.stats['evicted']) == (2, 0)
+        with pytest.raises(ValueError):
+            tenants.get("../bob")
+    finally:
+        tenants.close()
+
+
+# =============================================================================
+# MIGRATIONS
+# =============================================================================
+
+def test_migrate_from_empty(db):
+    assert db.applied_migrations == ALL_VERSIONS
+    assert db.schema_version() == SCHEMA_VERSION
+    assert db.get_dashboard_stats()['total_topics'] > 0
+    assert db.check_stats_consistency() == []
+
+
+def test_migrate_from_baseline(tmp_path):
+    # A database written by the app before schema versioning
+    path = str(tmp_path / "baseline.db")
+    conn = sqlite3.connect(path)
+    _initial_schema(conn.cursor())
+    conn.executemany('''
+        INSERT INTO practice_tracker (date, section, topic, questions, correct, wrong, accuracy, time_taken)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(DAY, "QA", "Algebra", 20, 15, 5, 75.0, "1:30"),
+          (DAY, "VARC", "RC Inference", 8, 6, 2, 75.0, "45"),
+          ("2026-10-16", "DILR", "Arrangements", 10, 4, 6, 40.0, "")])
+    conn.execute('''
+        INSERT INTO mock_tests (date, test_name, varc_score, varc_percentile, dilr_score, dilr_percentile,
+                                qa_score, qa_percentile, total_score, overall_percentile, time_taken)
+        VALUES (?, 'Mock 1', 30, 80, 25, 75, 35, 85, 90, 82, '2h')
+    ''', (DAY,))
+    conn.commit()
+    conn.close()
+    
+    db = Database(path, pool_size=2)
+    try:
+        assert db.applied_migrations == ALL_VERSIONS
+        assert db.schema_version() == SCHEMA_VERSION
+        assert db.check_stats_consistency() == []
+        with db.get_connection() as conn:
+            seconds = [row[0] for row in conn.execute("SELECT time_seconds FROM practice_tracker ORDER BY id")]
+            mock_seconds = conn.execute("SELECT time_seconds FROM mock_tests").fetchone()[0]
+        assert seconds == [5400, 2700, None]
+        assert mock_seconds == 7200
+        # Reopening a current database applies nothing
+        db.close()
+        db = Database(path, pool_size=2)
+        assert db.applied_migrations == []
+    finally:
+        db.close()
+
+
+# =============================================================================
+# STATS ROLLUPS
+# =============================================================================
+
+def test_session_writes_keep_stats_consistent(db):
+    db.add_practice_session(DAY, "QA", "Algebra", 20, 15, "30 min")
+    db.add_practice_session(DAY, "VARC", "RC Abstract", 8, 5, "20")
+    db.add_practice_session("2026-10-16", "DILR", "Arrangements", 10, 4)
+    assert db.check_stats_consistency() == []
+    
+    first, second, third = session_ids(db)
+    db.update_practice_session(first, questions=25, correct=20)
+    db.update_practice_session(second, section="QA", topic="Geometry", date="2026-10-15")
+    assert db.check_stats_consistency() == []
+    
+    db.delete_practice_session(third)
+    assert db.check_stats_consistency() == []
+    db.delete_practice_session(first)
+    db.delete_practice_session(second)
+    assert db.check_stats_consistency() == []
+
+
+def test_reset_keeps_rollups_and_triggers(db):
+    seed_history(db, 2000)
+    db.set_goal_target('questions', 20)
+    with db.get_connection() as conn:
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall()
+    db.reset_all_data()
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall() \
+            == triggers
+        assert conn.execute("SELECT COUNT(*) FROM practice_daily").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM review_schedule").fetchone()[0] == 0
+    assert db.check_stats_consistency() == []
+    assert db.get_dashboard_stats()['total_topics'] > 0
+    
+    # The recreated triggers keep counting new sessions
+    db.add_practice_session(DAY, "QA", "Algebra", 20, 15)
+    assert db.check_stats_consistency() == []
+    assert progress(db)['questions'] == (20, True)
+
+
+# =============================================================================
+# DAILY GOALS
+# =============================================================================
+
+def test_goal_counters_follow_session_writes(db):
+    for goal_type, target in (('questions', 30), ('sessions', 2), ('rc_sets', 1), ('minutes', 60)):
+        db.set_goal_target(goal_type, target)
+    
+    db.add_practice_session(DAY, "QA", "Algebra", 20, 15, "30 min")
+    assert progress(db) == {'questions': (20, False), 'sessions': (1, False),
+                            'rc_sets': (0, False), 'minutes': (30, False)}
+    
+    db.add_practice_session(DAY, "VARC", "RC Inference", 12, 9, "1:00")
+    assert progress(db) == {'questions': (32, True), 'sessions': (2, True),
+                            'rc_sets': (1, True), 'minutes': (90, True)}
+    
+    first, second = session_ids(db)
+    db.update_practice_session(second, topic="Para Jumbles", time_taken="10 min")
+    assert progress(db) == {'questions': (32, True), 'sessions': (2, True),
+                            'rc_sets': (0, False), 'minutes': (40, False)}
+    
+    # Moving a session to another day moves its contribution with it
+    db.update_practice_session(first, date="2026-10-16")
+    assert progress(db)['questions'] == (12, False)
+    assert progress(db, "2026-10-16")['questions'] == (20, False)
+    
+    db.delete_practice_session(second)
+    assert progress(db) == {'questions': (0, False), 'sessions': (0, False),
+                            'rc_sets': (0, False), 'minutes': (0, False)}
+
+
+@pytest.mark.parametrize("topic, counts", [
+    ("RC Inference", 1),
+    ("Abstract RCs", 1),
+    ("Reading Comprehension", 1),
+    ("Percentages", 0),
+    ("Circles & Triangles", 0),
+    ("rc practice", 0),
+])
+def test_rc_goal_matches_rc_as_a_word(db, topic, counts):
+    db.set_goal_target('rc_sets', 5)
+    db.add_practice_session(DAY, "VARC", topic, 10, 8)
+    assert progress(db)['rc_sets'] == (counts, False)
+
+
+def test_rc_goal_recounted_on_upgrade(tmp_path):
+    # A database migrated by the release whose RC rule was LIKE '%RC%'
+    path = str(tmp_path / "version9.db")
+    conn = sqlite3.connect(path)
+    for _, _, apply in MIGRATIONS[:9]:
+        apply(conn.cursor())
+    conn.executemany("INSERT INTO settings (key, value) VALUES (?, ?)",
+                     [(SCHEMA_VERSION_KEY, "9"), ("goal.rc_sets", "3")])
+    conn.execute('''
+        INSERT INTO daily_goals (date, goal_type, target_value, achieved_value, completed)
+        VALUES (?, 'rc_sets', 3, 0, 0)
+    ''', (DAY,))
+    conn.executemany('''
+        INSERT INTO practice_tracker (date, section, topic, questions, correct) VALUES (?, ?, ?, 10, 8)
+    ''', [(DAY, "QA", "Percentages"), (DAY, "QA", "Circles & Triangles"), (DAY, "VARC", "Reading Comprehension")])
+    conn.commit()
+    assert conn.execute("SELECT achieved_value FROM daily_goals").fetchone()[0] == 3
+    conn.close()
+    
+    db = Database(path, pool_size=2)
+    try:
+        assert db.applied_migrations == ALL_VERSIONS[9:]
+        assert progress(db)['rc_sets'] == (1, False)
+    finally:
+        db.close()
+
+
+def test_imported_days_get_goal_rows(db):
+    db.set_goal_target('questions', 20)
+    frame = pd.DataFrame({'Date': [DAY, DAY, "2026-10-16"], 'Section': ["QA", "QA", "DILR"],
+                          'Topic': ["Algebra", "Geometry", "Arrangements"],
+                          'Questions': [15, 10, 5], 'Correct': [10, 8, 2]})
+    db.import_data({'practice_tracker': frame})
+    assert progress(db)['questions'] == (25, True)
+    assert progress(db, "2026-10-16")['questions'] == (5, False)
+    assert db.check_stats_consistency() == []
+
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+def sessions(db) -> list:
+    with db.get_connection() as conn:
+        return [tuple(row) for row in conn.execute(
+            "SELECT id, topic, questions, correct, notes FROM practice_tracker ORDER BY id")]
+
+
+@pytest.mark.parametrize("policy, stored", [
+    # The stored row stays, is overwritten, or takes only the non-blank cells
+    ('skip', (1, "Algebra", 20, 15, "first")),
+    ('replace', (1, "Algebra", 30, 25, None)),
+    ('merge', (1, "Algebra", 30, 25, "first")),
+])
+def test_import_conflict_policies(db, policy, stored):
+    db.add_practice_session(DAY, "QA", "Algebra", 20, 15, notes="first")
+    frame = pd.DataFrame({'ID': ["1", ""], 'Date': [DAY, DAY], 'Section': ["QA", "QA"],
+                          'Topic': ["Algebra", "Geometry"], 'Questions': ["30", "10"],
+                          'Correct': ["25", "5"], 'Notes': ["", "second"]})
+    report = db.import_data({'practice_tracker': frame}, on_conflict=policy)
+    counts = {k: report['practice_tracker'][k] for k in ('inserted', 'updated', 'skipped')}
+    assert counts == {'inserted': 1, 'updated': int(policy != 'skip'), 'skipped': int(policy == 'skip')}
+    assert sessions(db) == [stored, (2, "Geometry", 10, 5, "second")]
+    assert db.check_stats_consistency() == []
+
+
+def test_import_rejects_invalid_rows(db):
+    frame = pd.DataFrame({'Date': [DAY, "someday", DAY], 'Section': ["QA", "QA", "QA"],
+                          'Topic': ["Algebra", "Geometry", "Arithmetic"],
+                          'Questions': ["10", "10", "5"], 'Correct': ["5", "5", "8"]})
+    with pytest.raises(ValueError, match="practice_tracker row 2: date is not a date"):
+        db.import_data({'practice_tracker': frame}, strict=True)
+    assert sessions(db) == []
+    
+    report = db.import_data({'practice_tracker': frame})['practice_tracker']
+    assert (report['inserted'], report['rejected']) == (1, 2)
+    assert report['errors'] == [(2, "date is not a date"), (3, "correct is more than questions")]
+    assert [row[1] for row in sessions(db)] == ["Algebra"]
+
+
+def test_import_rolls_back_with_follow_up_writes(db, monkeypatch):
+    def fail(cursor):
+        raise sqlite3.OperationalError("review sync failed")
+    
+    monkeypatch.setattr("catplanner.review.sync_topics", fail)
+    frame = pd.DataFrame({'Date': [DAY], 'Section': ["QA"], 'Topic': ["Algebra"], 'Questions': [10], 'Correct': [5]})
+    with pytest.raises(sqlite3.OperationalError):
+        db.import_data({'practice_tracker': frame})
+    assert sessions(db) == []
+    assert progress(db) == {}
+
+
+@pytest.mark.parametrize("fmt", ['csv', 'jsonl', 'parquet'])
+def test_exported_bundle_imports_back(db, tmp_path, fmt):
+    db.add_practice_session(DAY, "QA", "Algebra", 20, 15, "30 min", "first")
+    db.add_practice_session(DAY, "DILR", "Arrangements", 10, 4, notes="second")
+    bundle = tmp_path / "backup.zip"
+    write_bundle(db, str(bundle), fmt=fmt)
+    
+    restored = Database(str(tmp_path / "restored.db"), pool_size=2)
+    try:
+        report = restored.import_data(str(bundle))
+        assert report['practice_tracker']['inserted'] == 2
+        assert sessions(restored) == sessions(db)
+        assert restored.get_dashboard_stats() == db.get_dashboard_stats()
+    finally:
+        restored.close()
+
+
+# =============================================================================
+# PRACTICE PAGES
+# =============================================================================
+
+def pages(db, size: int, **filters) -> list:
+    """Every page of get_practice_tracker, following the (date, id) cursor"""
+    result, before = [], None
+    while True:
+        page = db.get_practice_tracker(limit=size, before=before, **filters)
+        if page.empty:
+            return result
+        result.append(list(zip(page['date'], page['id'])))
+        before = (page['date'].iloc[-1], int(page['id'].iloc[-1]))
+
+
+@pytest.mark.parametrize("filters", [{}, {'section': "QA"}, {'topic': "algebra"}])
+def test_pages_cover_sessions_sharing_a_date(db, filters):
+    for i in range(7):
+        db.add_practice_session(DAY, "QA", "Algebra", 10, i)
+    db.add_practice_session("2026-10-16", "QA", "Algebra", 10, 5)
+    db.add_practice_session(DAY, "DILR", "Algebra Sets", 10, 5)
+    db.add_practice_session("2026-10-18", "QA", "Algebra", 10, 5)
+    
+    expected = db.get_practice_tracker(**filters)
+    assert expected['date'].is_monotonic_decreasing
+    paged = pages(db, 3, **filters)
+    # Rows on the same date continue by id across page breaks, none twice
+    assert [row for page in paged for row in page] == list(zip(expected['date'], expected['id']))
+    assert all(len(page) == 3 for page in paged[:-1])
+
+
+# =============================================================================
+# QUERY PLANS
+# =============================================================================
+
+def test_read_queries_use_indexes(db):
+    seed_history(db, 5000)
+    assert db.check_query_plans() == []
+
+
+def test_dropped_indexes_fail_the_plan_check(db):
+    seed_history(db, 5000)
+    with db.get_connection() as conn:
+        conn.execute("DROP INDEX idx_practice_date")
+        conn.execute("DROP INDEX idx_review_schedule_due")
+        conn.commit()
+    problems = {(p['sql'].split(" FROM ")[1].split()[0], p['problem']) for p in db.check_query_plans()}
+    # The recent sessions sort every row; the review queue scans the schedule
+    assert ("practice_tracker", "USE TEMP B-TREE FOR ORDER BY") in problems
+    assert ("review_schedule", "SCAN r") in problems
+
+
+@pytest.mark.parametrize("sql, plan, problems", [
+    # Unbounded or filtered walks of an index are still full scans
+    ("SELECT * FROM practice_tracker ORDER BY date DESC",
+     ["SCAN practice_tracker USING INDEX idx_practice_date"], 1),
+    ("SELECT * FROM practice_tracker WHERE topic LIKE '%a%' ORDER BY date DESC LIMIT 20",
+     ["SCAN practice_tracker USING INDEX idx_practice_date"], 1),
+    ("SELECT * FROM practice_tracker ORDER BY date DESC LIMIT 20",
+     ["SCAN practice_tracker USING INDEX idx_practice_date"], 0),
+    ("SELECT section, SUM(questions) FROM practice_tracker GROUP BY section",
+     ["SCAN practice_tracker USING COVERING INDEX idx_practice_section_topic"], 0),
+    ("SELECT * FROM practice_tracker WHERE section = 'QA'",
+     ["SEARCH practice_tracker USING INDEX idx_practice_section_date (section=?)"], 0),
+    # Small tables may be scanned, but not sorted in a temp B-tree
+    ("SELECT * FROM syllabus WHERE section = 'QA'", ["SCAN syllabus"], 0),
+    ("SELECT * FROM syllabus ORDER BY section", ["SCAN syllabus", "USE TEMP B-TREE FOR ORDER BY"], 1),
+    # Aliases resolve to their table
+    ("SELECT * FROM review_schedule r JOIN practice_topics p ON p.topic = r.topic",
+     ["SCAN p", "SEARCH r USING PRIMARY KEY (section=? AND topic=?)"], 0),
+    ("SELECT * FROM daily_goals g JOIN practice_topics p ON p.topic = g.goal_type",
+     ["SCAN g", "SEARCH p USING PRIMARY KEY (section=? AND topic=?)"], 1),
+])
+def test_plan_problems(sql, plan, problems):
+    assert len(plan_problems(sql, plan)) == problems
+
+
+def test_topic_search_pages_newest_first(db):
+    for day, section, topic in [("2026-10-01", "QA", "Algebra"), ("2026-10-03", "DILR", "Algebra Sets"),
+                                ("2026-10-02", "QA", "Algebra"), ("2026-10-04", "QA", "Geometry")]:
+        db.add_practice_session(day, section, topic, 10, 5)
+    first = db.get_practice_tracker(limit=2, topic="algebra")
+    assert first['date'].tolist() == ["2026-10-03", "2026-10-02"]
+    last = first.iloc[-1]
+    rest = db.get_practice_tracker(limit=2, topic="algebra", before=(last['date'], int(last['id'])))
+    assert rest['date'].tolist() == ["2026-10-01"]
+    assert db.get_practice_tracker(limit=2, topic="algebra", section="DILR")['topic'].tolist() == ["Algebra Sets"]
+    assert db.get_practice_tracker(topic="nothing").empty
+
+
+# =============================================================================
+# STORAGE BACKENDS
+# =============================================================================
+
+@pytest.fixture(scope="module")
+def pool_snapshot(tmp_path_factory):
+    """benchmarks.check_backends' workload on the built-in pool, to compare the engines against"""
+    db = Database(str(tmp_path_factory.mktemp("pool") / "pool.db"))
+    try:
+        return workload(db, rows=500, threads=4)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("target", ["file", "memory"])
+def test_sqlalchemy_backend_matches_pool(tmp_path, pool_snapshot, target):
+    db = Database("sqlite:///" + str(tmp_path / "engine.db") if target == "file" else "sqlite://")
+    try:
+        assert workload(db, rows=500, threads=4) == pool_snapshot
+        assert db.check_stats_consistency() == []
+    finally:
+        db.close()
+
+
+# =============================================================================
+# TRENDS
+# =============================================================================
+
+def test_trend_windows_match_sessions(db):
+    seed_history(db, 2000, days=60, topics_per_section=8)
+    trends = db.get_practice_trends(days=30)
+    with db.get_connection() as conn:
+        sessions = pd.read_sql_query("SELECT date, section, topic, questions, correct FROM practice_tracker", conn)
+    today = date.today()
+    for window in (7, 30):
+        recent = sessions[sessions['date'] >= str(today - timedelta(days=window - 1))]
+        totals = recent.groupby(['section', 'topic'])[['questions', 'correct']].sum().reset_index()
+        topics = trends['topics'].merge(totals, on=['section', 'topic'], how='left').fillna(0)
+        assert (topics[f'questions_{window}d'] == topics['questions']).all()
+        expected = (topics['correct'] / topics['questions'] * 100).where(topics['questions'] > 0, 0)
+        assert topics[f'accuracy_{window}d'].sub(expected).abs().max() < 1e-9
+        qa_today = trends['sections'].query("section == 'QA'").iloc[-1]
+        assert qa_today[f'questions_{window}d'] == recent.loc[recent['section'] == "QA", 'questions'].sum()
+    # Topics without practice in the last month are left out
+    assert trends['topics']['questions_30d'].gt(0).all()
+
+
+def test_trends_within_target_at_realistic_topic_count(db):
+    # 100k sessions over a year across 900 topics, the size the dashboard
+    # has to stay under 50 ms at
+    seed_history(db, 100_000, days=365, topics_per_section=300)
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        trends = db.get_practice_trends()
+        timings.append(time.perf_counter() - started)
+    assert len(trends['topics']) == 900
+    assert statistics.median(timings) < 0.050
+
+
+# =============================================================================
+# DURATIONS
+# =============================================================================
+
+@pytest.mark.parametrize("text, seconds", [
+    ("30 min", 1800),
+    ("2h 45m", 9900),
+    ("1.5 hours", 5400),
+    ("90s", 90),
+    ("  20 MINS ", 1200),
+    ("1:30", 5400),
+    ("1:30:15", 5415),
+    ("45", 2700),
+    ("7.5", 450),
+    (45, 2700),
+    (0.5, 30),
+])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "soon", "0", "0:00", 0, -5, float("nan"), "1:75"])
+def test_parse_duration_without_a_duration(text):
+    assert parse_duration(text) is None